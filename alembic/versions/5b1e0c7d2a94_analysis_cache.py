@@ -0,0 +1,36 @@
+"""analysis cache
+
+Revision ID: 5b1e0c7d2a94
+Revises: 0031f3895892
+Create Date: 2025-07-02 12:10:41.402113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "5b1e0c7d2a94"
+down_revision: Union[str, None] = "0031f3895892"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analysis_cache",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index(
+        "ix_analysis_cache_created_at", "analysis_cache", ["created_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_analysis_cache_created_at", table_name="analysis_cache")
+    op.drop_table("analysis_cache")
@@ -0,0 +1,46 @@
+"""resume files
+
+Revision ID: 9e4f27c1b3d8
+Revises: 5b1e0c7d2a94
+Create Date: 2025-07-03 18:42:07.551290
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "9e4f27c1b3d8"
+down_revision: Union[str, None] = "5b1e0c7d2a94"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "resume_files",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("path", sa.String(length=512), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("sha256"),
+    )
+    op.create_table(
+        "resume_file_aliases",
+        sa.Column("file_unique_id", sa.String(length=64), nullable=False),
+        sa.Column("resume_file_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["resume_file_id"], ["resume_files.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("file_unique_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("resume_file_aliases")
+    op.drop_table("resume_files")
@@ -0,0 +1,57 @@
+"""applications
+
+Revision ID: d7b2e94a0c16
+Revises: c3a8d61f5e20
+Create Date: 2025-07-09 16:03:27.190485
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "d7b2e94a0c16"
+down_revision: Union[str, None] = "c3a8d61f5e20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "applications",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("vacancy_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("username", sa.String(length=64), nullable=True),
+        sa.Column("resume_file_id", sa.Integer(), nullable=True),
+        sa.Column("rating", sa.SmallInteger(), nullable=False),
+        sa.Column(
+            "result",
+            sa.JSON().with_variant(postgresql.JSONB(), "postgresql"),
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["vacancy_id"], ["vacancies.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["resume_file_id"], ["resume_files.id"], ondelete="SET NULL"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_applications_user_id", "applications", ["user_id"], unique=False
+    )
+    op.create_index(
+        "ix_applications_vacancy_rating",
+        "applications",
+        ["vacancy_id", sa.text("rating DESC"), "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_applications_vacancy_rating", table_name="applications")
+    op.drop_index("ix_applications_user_id", table_name="applications")
+    op.drop_table("applications")
@@ -0,0 +1,37 @@
+"""vacancy indexes
+
+Revision ID: e1c5a7390b42
+Revises: d7b2e94a0c16
+Create Date: 2025-07-11 10:27:51.664019
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "e1c5a7390b42"
+down_revision: Union[str, None] = "d7b2e94a0c16"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # активные вакансии компании — для join в пагинации и списков компании
+    op.create_index(
+        "ix_vacancies_company_id", "vacancies", ["company_id"], unique=False
+    )
+    op.create_index(
+        "ix_vacancies_active_company",
+        "vacancies",
+        ["company_id", "id"],
+        unique=False,
+        postgresql_where=sa.text("is_active IS true"),  # как в запросах
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vacancies_active_company", table_name="vacancies")
+    op.drop_index("ix_vacancies_company_id", table_name="vacancies")
@@ -9,7 +9,7 @@ from aiogram.types import (
 )
 
 from bot.handlers.resume_fsm import ResumeFSM
-from bot.keyboards import vacancy_inline_kb
+from bot.keyboards import vacancy_inline_kb, vacancy_page_kb
 from services import VacancyService
 
 router = Router(name="candidate")
@@ -80,3 +80,28 @@ async def back_to_vacancies(cb: CallbackQuery) -> None:
     else:
         await cb.message.answer("Пока нет открытых вакансий.")
     await cb.answer()
+
+
+#  Листание списка вакансий «◀️ Назад» / «Далее ▶️»
+
+
+@router.callback_query(F.data.startswith("vpage_"))
+async def turn_vacancy_page(cb: CallbackQuery) -> None:
+    # callback_data приходит от клиента: старые или подделанные кнопки не роняют
+    # хендлер, а просят открыть список заново
+    _, direction, raw = (cb.data.split("_", 2) + ["", ""])[:3]
+    if direction not in ("prev", "next") or not raw.isdecimal():
+        await cb.answer("Список устарел — откройте его заново", show_alert=True)
+        return
+
+    cursor = int(raw)
+    kb = (
+        await vacancy_page_kb(after=cursor)
+        if direction == "next"
+        else await vacancy_page_kb(before=cursor)
+    )
+    try:
+        await cb.message.edit_reply_markup(reply_markup=kb)
+    except Exception:
+        pass  # «message is not modified» при двойном нажатии
+    await cb.answer()
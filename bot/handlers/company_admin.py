@@ -12,6 +12,7 @@ from aiogram.types import (
 )
 
 from bot.keyboards import hr_main_kb, vacancy_inline_kb, company_inline_kb
+from db.uow import commit
 from services import CompanyService, VacancyService
 
 router = Router(name="company_admin")
@@ -50,6 +51,7 @@ async def save_company_title(m: Message, state: FSMContext) -> None:
         return
 
     await CompanyService.create_company(owner_id=m.from_user.id, title=m.text)
+    await commit()
     await m.answer("Компания создана ✅", reply_markup=await hr_main_kb(m.from_user.id))
     await state.clear()
 
@@ -60,8 +62,7 @@ class EditCompany(StatesGroup):
 
 @router.message(F.text == "✏️ Редактировать компании")
 async def start_edit_companies(m: Message, state: FSMContext) -> None:
-    companies = await CompanyService.companies_for_user(m.from_user.id)
-    if not companies:
+    if not await CompanyService.company_count(m.from_user.id):
         await m.answer("У вас пока нет компаний.")
         return
 
@@ -88,6 +89,7 @@ async def save_new_company_title(m: Message, state: FSMContext) -> None:
 
     comp_id = (await state.get_data())["company_id"]
     await CompanyService.update_title(company_id=comp_id, title=m.text)
+    await commit()
     await m.answer(
         "Название компании обновлено ✅", reply_markup=await hr_main_kb(m.from_user.id)
     )
@@ -101,8 +103,7 @@ class CreateVacancy(StatesGroup):
 
 @router.message(F.text == "➕ Создать вакансию")
 async def start_create_vacancy(m: Message, state: FSMContext) -> None:
-    companies = await CompanyService.companies_for_user(m.from_user.id)
-    if not companies:
+    if not await CompanyService.company_count(m.from_user.id):
         await m.answer("Сначала создайте компанию (/newcompany).")
         return
 
@@ -131,11 +132,15 @@ async def receive_vacancy_description(m: Message, state: FSMContext) -> None:
     title = data["title"]
     description = "" if m.text.strip() == "-" else m.text.strip()
 
-    companies = await CompanyService.companies_for_user(m.from_user.id)
+    company_id = await CompanyService.first_company_id(m.from_user.id)
+    if company_id is None:
+        await m.answer("Сначала создайте компанию (/newcompany).")
+        await state.clear()
+        return
     await VacancyService.create(
-        company_id=companies[0].id, title=title, description=description
+        company_id=company_id, title=title, description=description
     )
-
+    await commit()
     await m.answer("Вакансия создана ✅", reply_markup=await hr_main_kb(m.from_user.id))
     await state.clear()
 
@@ -147,10 +152,7 @@ class EditVacancy(StatesGroup):
 
 @router.message(F.text == "✏️ Редактировать вакансии")
 async def start_edit_vacancy(m: Message, state: FSMContext) -> None:
-    companies = await CompanyService.companies_for_user(m.from_user.id)
-    if not companies or not any(
-        any(v.is_active for v in c.vacancies) for c in companies
-    ):
+    if not await CompanyService.has_active_vacancy(m.from_user.id):
         await m.answer("Нет активных вакансий для редактирования.")
         return
 
@@ -209,6 +211,7 @@ async def save_new_title(m: Message, state: FSMContext) -> None:
 
     vac_id = (await state.get_data())["vacancy_id"]
     await VacancyService.update_title(vacancy_id=vac_id, title=m.text)
+    await commit()
     await m.answer(
         "Название обновлено ✅", reply_markup=await hr_main_kb(m.from_user.id)
     )
@@ -233,6 +236,7 @@ async def save_new_description(m: Message, state: FSMContext) -> None:
     vac_id = (await state.get_data())["vacancy_id"]
     description = "" if m.text.strip() == "-" else m.text.strip()
     await VacancyService.update_description(vacancy_id=vac_id, description=description)
+    await commit()
     await m.answer(
         "Описание обновлено ✅", reply_markup=await hr_main_kb(m.from_user.id)
     )
@@ -249,6 +253,7 @@ async def delete_vacancy(cb: CallbackQuery) -> None:
         return
 
     await VacancyService.deactivate(vacancy_id=vac_id)
+    await commit()
     await cb.message.answer(
         "Вакансия удалена ✅", reply_markup=await hr_main_kb(cb.from_user.id)
     )
@@ -5,10 +5,13 @@ import json
 import uuid
 from pathlib import Path
 
-from openai import AsyncOpenAI
-from settings.config import setup
+import aiofiles
 
-openai_client = AsyncOpenAI(api_key=setup.openai_api_key)
+from bot.utils.audit import audit_sink
+from bot.utils.metrics import stage_seconds
+from bot.utils.openai_client import openai_client
+from bot.utils.openai_scheduler import Priority, estimate_tokens, openai_scheduler
+from bot.utils.prompts import SCORE, prefix_cache_stats, vacancy_key
 
 
 #  вспомогательные функции
@@ -21,27 +24,25 @@ def extract_text(file_path: str) -> str:
     return ""
 
 
-def _prompt(cv_text: str, vacancy_text: str) -> str:
-    return (
-        "Ты — HR-бот. Нужно оценить, насколько резюме подходит под вакансию.\n\n"
-        "=== ВАКАНСИЯ ===\n"
-        f"{vacancy_text}\n\n"
-        "=== РЕЗЮМЕ КАНДИДАТА ===\n"
-        f"{cv_text}\n\n"
-        "Сначала оцени соответствие в процентах (0-100), затем одним словом тег "
-        "из списка: Junior, Middle, Senior, Lead. Верни JSON: "
-        '{"rating": 85, "tag": "Middle"}.'
-    )
-
-
-async def analyse_resume(cv_text: str, vacancy_text: str) -> dict:
-    resp = await openai_client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": _prompt(cv_text, vacancy_text)}],
-        temperature=0.2,
-        max_tokens=400,
-        response_format={"type": "json_object"},
+async def analyse_resume(
+    cv_text: str,
+    vacancy_text: str,
+    *,
+    priority: Priority = Priority.INTERACTIVE,
+) -> dict:
+    messages = SCORE.messages(vacancy=vacancy_text, resume=cv_text)
+    resp = await openai_scheduler.run(
+        lambda: openai_client().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=0.2,
+            max_tokens=400,
+            response_format={"type": "json_object"},
+        ),
+        tokens=estimate_tokens(*(m["content"] for m in messages)) + 400,
+        priority=priority,
     )
+    prefix_cache_stats.record(vacancy_key(vacancy_text), resp.usage)
     return json.loads(resp.choices[0].message.content)
 
 
@@ -49,24 +50,31 @@ async def process_resume(
     *,
     file_path: str,
     resume_text: str,
+    vacancy_id: int,
     vacancy_name: str,
     vacancy_text: str,
     user_id: int,
 ) -> dict:
-    result = await analyse_resume(resume_text, vacancy_text)
-
-    out_path = Path(file_path).with_suffix(".json")
-    out_path.write_text(json.dumps(result, ensure_ascii=False, indent=2))
-
-    log_line = {
-        "id": uuid.uuid4().hex,
-        "user_id": user_id,
-        "vacancy": vacancy_name,
-        "created_at": dt.datetime.utcnow().isoformat(),
-        **result,
-    }
-    (out_path.parent / "resume_audit.log").open("a", encoding="utf-8").write(
-        json.dumps(log_line, ensure_ascii=False) + "\n"
-    )
+    with stage_seconds.time(stage="openai"):
+        result = await analyse_resume(resume_text, vacancy_text)
+
+    with stage_seconds.time(stage="write_result"):
+        # файл резюме общий для всех откликов с тем же содержимым —
+        # результат ключуем ещё и вакансией, иначе отклики затирают друг друга
+        src = Path(file_path)
+        out_path = src.with_name(f"{src.stem}.vacancy-{vacancy_id}.json")
+        async with aiofiles.open(out_path, "w", encoding="utf-8") as fh:
+            await fh.write(json.dumps(result, ensure_ascii=False, indent=2))
+
+    with stage_seconds.time(stage="audit"):
+        await audit_sink.write(
+            {
+                "id": uuid.uuid4().hex,
+                "user_id": user_id,
+                "vacancy": vacancy_name,
+                "created_at": dt.datetime.utcnow().isoformat(),
+                **result,
+            }
+        )
 
     return result
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import pathlib
-import uuid
-from typing import Dict
+from functools import partial
 
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
@@ -17,18 +17,23 @@ from aiogram.types import (
     Message,
 )
 
-from bot.utils.resume_tools import (
-    analyse_resume,
-    extract_text,
-)
-from services import VacancyService
+from bot.keyboards import recommendations_kb
+from bot.utils.analysis_queue import AnalysisJob, analysis_queue
+from bot.utils.extract_pool import extraction_pool
+from bot.utils.matcher import matcher
+from bot.utils.metrics import stage_seconds
+from bot.utils.openai_scheduler import Priority
+from bot.utils.prefilter import prefilter, prefilter_stats
+from bot.utils.resume_store import fetch_resume, resume_text
+from bot.utils.resume_tools import analyse_resume, cached_analysis
+from bot.utils.token_store import tips_store
+from services import ApplicationService, VacancyService
+from services.errors import InvalidResumeError
 from settings.config import setup
 
 router = Router(name="resume_fsm")
 log = logging.getLogger(__name__)
 
-_tips_cache: Dict[str, str] = {}
-
 
 class ResumeFSM(StatesGroup):
     waiting_for_file = State()
@@ -38,6 +43,54 @@ def _humanize_missing(text: str | None) -> str:
     return text.strip() if text and text.strip() else "—"
 
 
+async def _safe_edit(msg: Message, text: str) -> None:
+    try:
+        await msg.edit_text(text)
+    except Exception:
+        pass  # «message is not modified» и т. п.
+
+
+async def _reject(processing: Message, cv_text: str, vacancy_id: int) -> None:
+    """Отказ + до трёх других вакансий, которые подходят резюме лучше."""
+    text = "К сожалению, ваш опыт пока недостаточен для этой вакансии."
+    try:
+        cards = await matcher.recommend(cv_text, k=3, exclude=vacancy_id)
+    except Exception:
+        log.exception("matcher.recommend failed")
+        cards = []
+    if cards:
+        await processing.edit_text(
+            f"{text}\n\nВозможно, вам подойдут:",
+            reply_markup=recommendations_kb(cards),
+        )
+    else:
+        await processing.edit_text(text)
+
+
+async def _await_analysis(job: AnalysisJob, processing: Message) -> dict:
+    """Ждём результат, обновляя в сообщении место в очереди и ETA."""
+    shown = None
+    try:
+        while True:
+            pos = analysis_queue.position(job)
+            text = (
+                f"⏳ Резюме в очереди: {pos}-е место, "
+                f"примерно {analysis_queue.eta(job):.0f} сек."
+                if pos > 0
+                else "⏳ Анализируем резюме…"
+            )
+            if text != shown:
+                await _safe_edit(processing, text)
+                shown = text
+
+            done, _ = await asyncio.wait({job.future}, timeout=5)
+            if done:
+                return job.future.result()
+    finally:
+        if not job.future.done():
+            job.future.cancel()
+
+
 @router.message(ResumeFSM.waiting_for_file, F.document)
 async def handle_resume(m: Message, state: FSMContext) -> None:
     vac_id = (await state.get_data()).get("vacancy_id")
@@ -48,31 +101,69 @@ async def handle_resume(m: Message, state: FSMContext) -> None:
     if ext not in {".txt", ".pdf", ".doc", ".docx"}:
         await processing.edit_text("Поддерживаются только PDF, DOC/DOCX или TXT.")
         return
+    if doc.file_size and doc.file_size > extraction_pool.max_bytes:
+        await processing.edit_text(
+            f"Файл слишком большой (максимум "
+            f"{extraction_pool.max_bytes // (1024 * 1024)} МБ)."
+        )
+        return
 
-    dst = pathlib.Path(setup.data_dir) / f"{uuid.uuid4().hex}{ext}"
     try:
-        tg_file = await m.bot.get_file(doc.file_id)
-        await m.bot.download_file(tg_file.file_path, destination=str(dst))
+        with stage_seconds.time(stage="download"):
+            stored = await fetch_resume(m.bot, doc)
     except Exception as exc:
         log.exception("download_file failed")
         await processing.edit_text(f"Не удалось скачать файл: {exc}")
         return
 
     try:
-        cv_text = extract_text(dst)
+        with stage_seconds.time(stage="extract_text"):
+            cv_text = await resume_text(stored)
     except Exception as exc:
         log.exception("extract_text failed")
         await processing.edit_text(f"Не удалось прочитать файл: {exc}")
         return
 
-    vacancy = await VacancyService.by_id(vac_id)
+    with stage_seconds.time(stage="db_lookup"):
+        vacancy = await VacancyService.by_id(vac_id)
     if not vacancy:
         await processing.edit_text("Вакансия не найдена.")
         await state.clear()
         return
 
     try:
-        meta = await analyse_resume(cv_text, vacancy.description or vacancy.title)
+        with stage_seconds.time(stage="prefilter"):
+            verdict = await prefilter.check(cv_text, vacancy)
+    except InvalidResumeError as exc:
+        prefilter_stats.invalid += 1
+        await processing.edit_text(f"Не получилось обработать резюме. {exc}")
+        return
+    vacancy_text = vacancy.description or vacancy.title
+    if not verdict.passed:
+        prefilter_stats.rejected += 1
+        # выборочно проверяем отказ моделью — для оценки ложных отказов
+        prefilter_stats.audit(
+            verdict.score,
+            partial(
+                analyse_resume, cv_text, vacancy_text, priority=Priority.BACKGROUND
+            ),
+        )
+        with stage_seconds.time(stage="telegram_send"):
+            await _reject(processing, cv_text, vacancy.id)
+        await state.clear()
+        return
+
+    try:
+        # вместе с ожиданием в очереди; сам запрос — openai_request_seconds
+        with stage_seconds.time(stage="analysis"):
+            meta = await cached_analysis(cv_text, vacancy_text)
+            if meta is None:
+                if analysis_queue.full:
+                    await _safe_edit(
+                        processing, "⏳ Много откликов, ждём места в очереди…"
+                    )
+                job = await analysis_queue.submit(cv_text, vacancy_text, m.from_user.id)
+                meta = await _await_analysis(job, processing)
     except Exception as exc:
         log.exception("analyse_resume failed")
         await processing.edit_text(f"Ошибка обработки: {exc}")
@@ -80,10 +171,24 @@ async def handle_resume(m: Message, state: FSMContext) -> None:
         return
 
     rating = float(meta.get("rating", 0))
+    prefilter_stats.record(verdict.score, rating)
+
+    try:
+        with stage_seconds.time(stage="db_save"):
+            await ApplicationService.add(
+                vacancy_id=vacancy.id,
+                user_id=m.from_user.id,
+                username=m.from_user.username,
+                resume_file_id=stored.id,
+                result=meta,
+            )
+    except Exception:
+        log.exception("saving application failed")  # отклик не теряем из-за БД
 
     if rating >= 40:
-        token = uuid.uuid4().hex
-        _tips_cache[token] = meta.get("interview_tips", "—")
+        token = await tips_store.put(
+            meta.get("interview_tips", "—"), bot_id=m.bot.id, user_id=m.from_user.id
+        )
 
         caption = (
             "Спасибо! Мы свяжемся с вами после рассмотрения вашего резюме.\n\n"
@@ -102,16 +207,16 @@ async def handle_resume(m: Message, state: FSMContext) -> None:
                 ]
             ]
         )
-        await m.answer_photo(
-            photo=FSInputFile("data/static/thanks_rake.png"),
-            caption=caption,
-            reply_markup=kb,
-        )
-        await processing.delete()
+        with stage_seconds.time(stage="telegram_send"):
+            await m.answer_photo(
+                photo=FSInputFile("data/static/thanks_rake.png"),
+                caption=caption,
+                reply_markup=kb,
+            )
+            await processing.delete()
     else:
-        await processing.edit_text(
-            "К сожалению, ваш опыт пока недостаточен для этой вакансии."
-        )
+        with stage_seconds.time(stage="telegram_send"):
+            await _reject(processing, cv_text, vacancy.id)
 
     await state.clear()
 
@@ -134,7 +239,8 @@ async def handle_resume(m: Message, state: FSMContext) -> None:
             f"📱 @{username}"
         )
         try:
-            await m.bot.send_message(setup.summary_chat_id, summary)
+            with stage_seconds.time(stage="summary_send"):
+                await m.bot.send_message(setup.summary_chat_id, summary)
         except Exception:
             pass
 
@@ -147,7 +253,9 @@ async def skip_tips(cb: CallbackQuery) -> None:
         pass
 
     await cb.message.answer("Хорошо, всего доброго!")
-    _tips_cache.pop(cb.data.split("_", 2)[2], None)
+    await tips_store.pop(
+        cb.data.split("_", 2)[2], bot_id=cb.bot.id, user_id=cb.from_user.id
+    )
     await cb.answer()
 
 
@@ -159,7 +267,7 @@ async def send_tips(cb: CallbackQuery) -> None:
         pass
 
     token = cb.data.split("_", 1)[1]
-    tips = _tips_cache.pop(token, None)
+    tips = await tips_store.pop(token, bot_id=cb.bot.id, user_id=cb.from_user.id)
     if tips:
         await cb.message.answer(f"💡 Советы от AI-ассистента:\n\n{tips}")
     else:
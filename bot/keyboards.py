@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from typing import List
+from typing import Sequence
 
 from aiogram.types import (
     InlineKeyboardButton,
@@ -12,7 +12,8 @@ from aiogram.types import (
 )
 
 from services import CompanyService, VacancyService
-from db.models import Vacancy
+from services.read_models import VacancyCard
+from services.vacancy_service import CatalogSnapshot, VacancyPage
 
 
 def role_choice_kb() -> ReplyKeyboardMarkup:
@@ -24,16 +25,14 @@ def role_choice_kb() -> ReplyKeyboardMarkup:
 
 
 async def hr_main_kb(owner_id: int) -> ReplyKeyboardMarkup:
-    companies = await CompanyService.companies_for_user(owner_id)
-    have_companies = bool(companies)
-    have_vacancies = any(any(v.is_active for v in c.vacancies) for c in companies)
+    state = await CompanyService.menu_state(owner_id)
 
     rows: list[list[KeyboardButton]] = []
 
-    if have_companies:
+    if state.has_company:
         rows.append([KeyboardButton(text="➕ Создать вакансию")])
         rows.append([KeyboardButton(text="✏️ Редактировать компании")])
-        if have_vacancies:
+        if state.has_active_vacancy:
             rows.append([KeyboardButton(text="✏️ Редактировать вакансии")])
     else:
         rows.append([KeyboardButton(text="🏢 Создать компанию")])
@@ -46,7 +45,7 @@ def remove_kb() -> ReplyKeyboardRemove:
 
 
 async def company_inline_kb(owner_id: int) -> InlineKeyboardMarkup:
-    companies = await CompanyService.companies_for_user(owner_id)
+    companies = await CompanyService.summaries_for_user(owner_id)
     rows: list[list[InlineKeyboardButton]] = [
         [
             InlineKeyboardButton(
@@ -62,51 +61,141 @@ async def company_inline_kb(owner_id: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
-async def vacancy_inline_kb(
-    *,
-    owner_id: int | None = None,
-    mode: str = "view",
-) -> InlineKeyboardMarkup:
-    rows: list[list[InlineKeyboardButton]] = []
+# готовые клавиатуры списка вакансий: строятся один раз на снимок каталога,
+# ключ — (mode, owner_id) для HR и ("page", курсор) для страниц кандидата;
+# курсор приходит из callback_data, поэтому кэшируются только курсоры
+# вакансий из снимка — их не больше двух на вакансию
+_vacancy_kb_cache: dict[tuple[str, int | str], InlineKeyboardMarkup] = {}
+_vacancy_kb_snapshot: CatalogSnapshot | None = None
 
-    if owner_id is not None:
-        # HR-режим
-        mapping = await CompanyService.companies_with_vacancies(owner_id)
-        for company_name, vacancies in mapping.items():
-            rows.append(
-                [InlineKeyboardButton(text=f"🏢 {company_name}", callback_data="noop")]
-            )
-            for v in vacancies:
-                prefix = "edit_" if mode == "edit" else "vac_"
-                rows.append(
-                    [
-                        InlineKeyboardButton(
-                            text=f"— {v.title}", callback_data=f"{prefix}{v.id}"
-                        )
-                    ]
-                )
-    else:
-        vacancies: List[Vacancy] = await VacancyService.all_active()
-        grouped: dict[str, list[Vacancy]] = defaultdict(list)
-        for v in vacancies:
-            grouped[v.company.title].append(v)
 
-        for company_name in sorted(grouped.keys()):
+def _vacancy_rows(
+    groups: list[tuple[str, Sequence[VacancyCard]]], prefix: str
+) -> list[list[InlineKeyboardButton]]:
+    rows: list[list[InlineKeyboardButton]] = []
+    for company_name, vacancies in groups:
+        rows.append(
+            [InlineKeyboardButton(text=f"🏢 {company_name}", callback_data="noop")]
+        )
+        for v in vacancies:
             rows.append(
-                [InlineKeyboardButton(text=f"🏢 {company_name}", callback_data="noop")]
+                [
+                    InlineKeyboardButton(
+                        text=f"— {v.title}", callback_data=f"{prefix}{v.id}"
+                    )
+                ]
             )
-            for v in grouped[company_name]:
-                rows.append(
-                    [
-                        InlineKeyboardButton(
-                            text=f"— {v.title}", callback_data=f"vac_{v.id}"
-                        )
-                    ]
-                )
+    return rows
+
 
+def _render_vacancy_kb(
+    snap: CatalogSnapshot, owner_id: int, mode: str
+) -> InlineKeyboardMarkup:
+    # HR-режим: свои компании по порядку создания
+    groups = [
+        (items[0].company.title, sorted(items, key=lambda v: v.id))
+        for _, items in sorted(snap.by_company.items())
+        if items[0].company.owner_id == owner_id
+    ]
+    rows = _vacancy_rows(groups, "edit_" if mode == "edit" else "vac_")
     if not rows:
         rows.append(
             [InlineKeyboardButton(text="Нет открытых вакансий", callback_data="noop")]
         )
 
     return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+def _render_vacancy_page(page: VacancyPage) -> InlineKeyboardMarkup:
+    groups: dict[str, list[VacancyCard]] = defaultdict(list)
+    for v in page.cards:  # уже по (компания, id)
+        groups[v.company.title].append(v)
+    rows = _vacancy_rows(list(groups.items()), "vac_")
+
+    if not rows:
+        rows.append(
+            [InlineKeyboardButton(text="Нет открытых вакансий", callback_data="noop")]
+        )
+
+    # курсор — id крайней вакансии страницы: в callback_data (≤ 64 байт)
+    # название компании не помещается, его подтягивает VacancyService.page
+    nav: list[InlineKeyboardButton] = []
+    if page.has_prev and page.cards:
+        nav.append(
+            InlineKeyboardButton(
+                text="◀️ Назад", callback_data=f"vpage_prev_{page.cards[0].id}"
+            )
+        )
+    if page.has_next and page.cards:
+        nav.append(
+            InlineKeyboardButton(
+                text="Далее ▶️", callback_data=f"vpage_next_{page.cards[-1].id}"
+            )
+        )
+    if nav:
+        rows.append(nav)
+
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+async def _kb_cache() -> (
+    tuple[CatalogSnapshot, dict[tuple[str, int | str], InlineKeyboardMarkup]]
+):
+    """Кэш клавиатур, сброшенный, если каталог с прошлого раза изменился."""
+    global _vacancy_kb_snapshot
+
+    snap = await VacancyService.snapshot()
+    if snap is not _vacancy_kb_snapshot:
+        _vacancy_kb_cache.clear()
+        _vacancy_kb_snapshot = snap
+    return snap, _vacancy_kb_cache
+
+
+async def vacancy_page_kb(
+    *, after: int | None = None, before: int | None = None
+) -> InlineKeyboardMarkup:
+    """Страница публичного списка вакансий (keyset-пагинация)."""
+    snap, cache = await _kb_cache()
+    cursor = after if after is not None else before
+    if cursor is not None and cursor not in snap.by_id:
+        # чужой или устаревший курсор — строим, но не кэшируем
+        page = await VacancyService.page(after=after, before=before)
+        return _render_vacancy_page(page)
+
+    key = ("page", f"{after}:{before}")
+    kb = cache.get(key)
+    if kb is None:
+        page = await VacancyService.page(after=after, before=before)
+        kb = cache[key] = _render_vacancy_page(page)
+    return kb
+
+
+async def vacancy_inline_kb(
+    *,
+    owner_id: int | None = None,
+    mode: str = "view",
+) -> InlineKeyboardMarkup:
+    if owner_id is None:
+        return await vacancy_page_kb()
+
+    snap, cache = await _kb_cache()
+    key = (mode, owner_id)
+    kb = cache.get(key)
+    if kb is None:
+        kb = cache[key] = _render_vacancy_kb(snap, owner_id, mode)
+    return kb
+
+
+def recommendations_kb(cards: Sequence[VacancyCard]) -> InlineKeyboardMarkup:
+    """«Возможно, вам подойдут»: кнопки ведут на карточки вакансий."""
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    text=f"— {v.title} ({v.company.title})",
+                    callback_data=f"vac_{v.id}",
+                )
+            ]
+            for v in cards
+        ]
+    )
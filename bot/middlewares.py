@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject
+
+from bot.utils.metrics import handler_errors, handler_seconds
+from db.uow import UnitOfWork, release_connection
+
+
+class ConcurrencyLimitMiddleware(BaseMiddleware):
+    """
+    Не больше ``limit`` апдейтов в обработке одновременно; остальные ждут.
+    Ставится outer-middleware на ``dp.update`` — и для polling, и для webhook.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._sem = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.waiting = 0
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        self.waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            return await handler(event, data)
+        finally:
+            self.in_flight -= 1
+            self._sem.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+        }
+
+
+class HandlerTimingMiddleware(BaseMiddleware):
+    """
+    Время хендлеров роутера -> ``bot_handler_seconds{router, event}``.
+    Outer-middleware роутера видит и апдейты, которые ушли дальше по
+    цепочке (ни один фильтр не совпал) — их не считаем.
+    """
+
+    def __init__(self, router: str, event: str) -> None:
+        self.labels = {"router": router, "event": event}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            result = await handler(event, data)
+        except Exception:
+            handler_errors.inc(**self.labels)
+            handler_seconds.observe(time.perf_counter() - started, **self.labels)
+            raise
+        if result is not UNHANDLED:
+            handler_seconds.observe(time.perf_counter() - started, **self.labels)
+        return result
+
+
+class DbSessionMiddleware(BaseMiddleware):
+    """
+    Одна сессия БД на апдейт: сервисы внутри хендлера (и клавиатуры)
+    работают в ней, коммит — после хендлера или раньше, перед первым
+    запросом к Telegram (``ReleaseDbConnection``). Сессия доступна
+    хендлерам как ``session``.
+
+    Вешается только на роутеры с короткими хендлерами: анализ резюме
+    минутами держал бы соединение в открытой транзакции.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        async with UnitOfWork() as uow:
+            data["session"] = uow.session
+            return await handler(event, data)
+
+
+class ReleaseDbConnection(BaseRequestMiddleware):
+    """
+    Middleware сессии бота: перед запросом к Telegram коммитит транзакцию
+    UoW хендлера — пул соединений не ждёт ответа сети. Пользователь
+    к тому же видит только уже сохранённое.
+    """
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        await release_connection()
+        return await make_request(bot, method)
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from bot.utils.metrics import analysis_cache_lookups
+from db.connection import async_session
+from db.dialects import insert
+from db.models import AnalysisCacheEntry
+from settings.config import setup
+
+log = logging.getLogger(__name__)
+
+_WS = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _WS.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+def make_key(resume: str, vacancy: str, *, prompt_version: str, model: str) -> str:
+    """Ключ кэша: sha256 от нормализованных текстов, версии промпта и модели."""
+    h = hashlib.sha256()
+    for part in (_normalize(resume), _normalize(vacancy), prompt_version, model):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Двухуровневый кэш анализов: LRU в памяти перед таблицей analysis_cache.
+    Ошибки БД не ломают анализ — кэш работает по принципу «best effort».
+    """
+
+    _PRUNE_EVERY = 100  # чистим таблицу раз в N записей
+
+    def __init__(self, *, max_items: int, ttl: int, db_max_rows: int) -> None:
+        self.max_items = max_items
+        self.ttl = ttl
+        self.db_max_rows = db_max_rows
+
+        self._mem: OrderedDict[str, tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._puts = 0
+
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._mem),
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    # ─────────────── память ───────────────
+    def _mem_get(self, key: str) -> Dict[str, Any] | None:
+        item = self._mem.get(key)
+        if item is None:
+            return None
+        stored_at, result = item
+        if time.time() - stored_at > self.ttl:
+            del self._mem[key]
+            return None
+        self._mem.move_to_end(key)
+        return result
+
+    def _mem_put(self, key: str, result: Dict[str, Any], stored_at: float) -> None:
+        self._mem[key] = (stored_at, result)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+            self.evictions += 1
+
+    # ─────────────── БД ───────────────
+    async def _db_get(self, key: str) -> AnalysisCacheEntry | None:
+        border = dt.datetime.utcnow() - dt.timedelta(seconds=self.ttl)
+        try:
+            async with async_session() as s:
+                res = await s.execute(
+                    select(AnalysisCacheEntry).where(
+                        AnalysisCacheEntry.key == key,
+                        AnalysisCacheEntry.created_at >= border,
+                    )
+                )
+                return res.scalar_one_or_none()
+        except SQLAlchemyError:
+            log.warning("analysis cache: read failed", exc_info=True)
+            return None
+
+    async def _db_put(self, rows: Dict[str, Dict[str, Any]]) -> None:
+        # upsert с явным created_at: повторная запись просроченного ключа
+        # должна его «оживить», а default срабатывает только при INSERT
+        stmt = insert(AnalysisCacheEntry)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AnalysisCacheEntry.key],
+            set_={
+                "result": stmt.excluded.result,
+                "created_at": stmt.excluded.created_at,
+            },
+        )
+        now = dt.datetime.utcnow()
+        params = [
+            {"key": key, "result": result, "created_at": now}
+            for key, result in rows.items()
+        ]
+        try:
+            async with async_session() as s:
+                await s.execute(stmt, params)  # одна транзакция на весь набор
+                await s.commit()
+        except SQLAlchemyError:
+            log.warning("analysis cache: write failed", exc_info=True)
+            return
+
+        before = self._puts // self._PRUNE_EVERY
+        self._puts += len(params)
+        if self._puts // self._PRUNE_EVERY != before:
+            await self.prune()
+
+    async def prune(self) -> None:
+        """Удалить просроченные записи и всё сверх db_max_rows (старые первыми)."""
+        border = dt.datetime.utcnow() - dt.timedelta(seconds=self.ttl)
+        try:
+            async with async_session() as s:
+                await s.execute(
+                    delete(AnalysisCacheEntry).where(
+                        AnalysisCacheEntry.created_at < border
+                    )
+                )
+                oldest_kept = (
+                    select(AnalysisCacheEntry.created_at)
+                    .order_by(AnalysisCacheEntry.created_at.desc())
+                    .offset(self.db_max_rows - 1)
+                    .limit(1)
+                    .scalar_subquery()
+                )
+                await s.execute(
+                    delete(AnalysisCacheEntry).where(
+                        AnalysisCacheEntry.created_at < oldest_kept
+                    )
+                )
+                await s.commit()
+        except SQLAlchemyError:
+            log.warning("analysis cache: prune failed", exc_info=True)
+
+    # ─────────────── API ───────────────
+    async def get(self, key: str) -> Dict[str, Any] | None:
+        result = self._mem_get(key)
+        if result is not None:
+            self.hits += 1
+            analysis_cache_lookups.inc(result="memory")
+            return result
+
+        row = await self._db_get(key)
+        if row is not None:
+            self.hits += 1
+            self.db_hits += 1
+            analysis_cache_lookups.inc(result="db")
+            stored_at = row.created_at.replace(tzinfo=dt.timezone.utc).timestamp()
+            self._mem_put(key, row.result, stored_at)
+            return row.result
+
+        self.misses += 1
+        analysis_cache_lookups.inc(result="miss")
+        return None
+
+    async def put(self, key: str, result: Dict[str, Any]) -> None:
+        await self.put_many({key: result})
+
+    async def put_many(self, rows: Dict[str, Dict[str, Any]]) -> None:
+        """Записать пачку результатов одним upsert (``batch_scoring``)."""
+        if not rows:
+            return
+        now = time.time()
+        for key, result in rows.items():
+            self._mem_put(key, result, now)
+        await self._db_put(rows)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        *,
+        lookup: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Вернуть результат из кэша или посчитать его. Одновременные запросы
+        с одним ключом (двойное нажатие «Откликнуться») ждут один вызов.
+        ``lookup=False`` — вызывающий уже сделал ``get`` и получил промах:
+        второй поиск не нужен и не должен считаться ещё одним промахом.
+
+        Вычисление идёт отдельной задачей: отмена вызвавшего его запроса
+        не отменяет ответ для остальных ждущих, а результат всё равно
+        попадает в кэш.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.hits += 1
+            analysis_cache_lookups.inc(result="inflight")
+        else:
+            task = asyncio.ensure_future(self._compute(key, compute, lookup))
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._computed, key))
+        return await asyncio.shield(task)
+
+    async def _compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        lookup: bool,
+    ) -> Dict[str, Any]:
+        result = await self.get(key) if lookup else None
+        if result is None:
+            result = await compute()
+            await self.put(key, result)
+        return result
+
+    async def shutdown(self) -> None:
+        """Отменить вычисления, которых уже никто не дождётся (остановка бота)."""
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _computed(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            # все ждущие могли быть отменены — тогда ошибку никто не прочтёт
+            log.debug("analysis cache: compute failed for %s", key[:12])
+
+
+analysis_cache = AnalysisCache(
+    max_items=setup.analysis_cache_size,
+    ttl=setup.analysis_cache_ttl,
+    db_max_rows=setup.analysis_cache_db_rows,
+)
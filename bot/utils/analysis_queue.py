@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict
+
+from bot.utils.resume_tools import analyse_resume
+from settings.config import setup
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class AnalysisJob:
+    resume_text: str
+    vacancy_text: str
+    user_id: int
+    ticket: int = 0
+    future: asyncio.Future = field(default=None, repr=False)  # type: ignore[assignment]
+
+
+class AnalysisQueue:
+    """
+    Очередь анализа резюме: фиксированный пул воркеров и ограниченная
+    очередь, чтобы всплеск откликов не превращался в лавину запросов к OpenAI.
+    """
+
+    def __init__(
+        self,
+        analyse: Callable[[str, str], Awaitable[Dict[str, Any]]],
+        *,
+        workers: int,
+        maxsize: int,
+    ) -> None:
+        self._analyse = analyse
+        self.workers = max(1, workers)
+        self._queue: asyncio.Queue[AnalysisJob] = asyncio.Queue(maxsize=maxsize)
+        self._tasks: list[asyncio.Task] = []
+
+        self._issued = 0  # выдано билетов
+        self._started = 0  # взято в работу
+        self._avg_duration = 20.0  # EWMA длительности анализа, сек.
+
+    # ─────────────── метрики ───────────────
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def position(self, job: AnalysisJob) -> int:
+        """Место в очереди: 1 — следующая, 0 — уже в работе."""
+        return max(0, job.ticket - self._started)
+
+    def eta(self, job: AnalysisJob) -> float:
+        """Оценка ожидания в секундах до готового результата."""
+        ahead = max(0, self.position(job) - 1)
+        return (ahead // self.workers + 1) * self._avg_duration
+
+    # ─────────────── жизненный цикл ───────────────
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"analysis-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def shutdown(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ─────────────── API ───────────────
+    async def submit(
+        self, resume_text: str, vacancy_text: str, user_id: int
+    ) -> AnalysisJob:
+        """
+        Поставить задачу в очередь. Если очередь заполнена — ждём места
+        (backpressure); результат — ``await job.future``. Кэш анализов
+        вызывающий проверяет сам (``cached_analysis``) до постановки.
+        """
+        self.start()
+        job = AnalysisJob(resume_text, vacancy_text, user_id)
+        job.future = asyncio.get_running_loop().create_future()
+        await self._queue.put(job)
+        # билет выдаём после put: пока ждали места, позиция не считалась
+        self._issued += 1
+        job.ticket = self._issued
+        return job
+
+    @property
+    def full(self) -> bool:
+        return self._queue.full()
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self._started += 1
+            if job.future.done():  # отклик отменили, пока ждал в очереди
+                self._queue.task_done()
+                continue
+
+            started = time.monotonic()
+            try:
+                result = await self._analyse(job.resume_text, job.vacancy_text)
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.cancel()
+                raise
+            except Exception as exc:
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                elapsed = time.monotonic() - started
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * elapsed
+                self._queue.task_done()
+
+
+analysis_queue = AnalysisQueue(
+    partial(analyse_resume, lookup=False),  # промах уже учтён в handle_resume
+    workers=setup.analysis_workers,
+    maxsize=setup.analysis_queue_size,
+)
@@ -0,0 +1,218 @@
+"""
+Журнал аудита резюме (JSON Lines).
+
+Обработчики кладут записи в очередь, фоновая задача пишет их пачками через
+aiofiles в один открытый файл. Файл ротируется по размеру и возрасту,
+старые сегменты сжимаются в ``.gz``; при остановке очередь дописывается.
+Первая строка сегмента — служебная ``{"segment": {"started_at": ...}}``:
+по ней считается возраст, в том числе после рестарта процесса.
+У каждого воркера вебхука свой файл (``resume_audit.w<N>.log``): ротация
+чужого файла из соседнего процесса потеряла бы записи.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import gzip
+import json
+import logging
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import aiofiles
+from aiofiles.threadpool.text import AsyncTextIOWrapper
+
+from settings.config import setup
+
+log = logging.getLogger(__name__)
+
+SEGMENT_KEY = "segment"  # ключ служебной записи в начале сегмента
+
+
+def _gzip(path: Path) -> None:
+    with path.open("rb") as src, gzip.open(f"{path}.gz", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    path.unlink()
+
+
+class AuditSink:
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_bytes: int,
+        max_age: float,
+        batch_size: int,
+        flush_interval: float,
+        queue_size: int,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self._task: asyncio.Task | None = None
+        self._fh: AsyncTextIOWrapper | None = None
+        self._size = 0
+        self._header_size = 0
+        self._started_at = 0.0
+        self._gzip_tasks: set[asyncio.Task] = set()
+
+        self.written = 0
+        self.batches = 0
+        self.rotations = 0
+
+    # ─────────────── жизненный цикл ───────────────
+    def start(self, worker: int | None = None) -> None:
+        """``worker`` — номер процесса при нескольких воркерах вебхука."""
+        if worker is not None and self._fh is None:
+            self.path = self.path.with_name(
+                f"{self.path.stem}.w{worker}{self.path.suffix}"
+            )
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="audit-sink")
+
+    async def shutdown(self) -> None:
+        """Дописать всё, что в очереди, и закрыть файл."""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self._close()
+        if self._gzip_tasks:
+            await asyncio.gather(*self._gzip_tasks)
+
+    async def write(self, record: Dict[str, Any]) -> None:
+        """Поставить запись в очередь; ждёт, только если очередь переполнена."""
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        await self._queue.put(line)
+
+    # ─────────────── файл ───────────────
+    async def _read_header(self) -> tuple[float, int] | None:
+        """Начало сегмента и длина служебной строки, если она есть."""
+        async with aiofiles.open(self.path, "rb") as fh:
+            first = await fh.readline()
+        try:
+            started_at = float(json.loads(first)[SEGMENT_KEY]["started_at"])
+        except (ValueError, TypeError, KeyError):
+            return None
+        return started_at, len(first)
+
+    async def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = await aiofiles.open(self.path, "a", encoding="utf-8")
+        self._size = self.path.stat().st_size
+        # возраст — от начала сегмента, а не от процесса: рестарт не сбрасывает
+        # его. Время файла не годится: mtime меняется на каждой записи
+        header = await self._read_header() if self._size else None
+        if header is not None:
+            self._started_at, self._header_size = header
+            return
+        # файл без служебной строки (записан до её появления) — отсчёт с рестарта
+        self._started_at = time.time()
+        self._header_size = 0
+        if self._size == 0:
+            line = json.dumps({SEGMENT_KEY: {"started_at": self._started_at}}) + "\n"
+            await self._fh.write(line)
+            await self._fh.flush()
+            self._size = self._header_size = len(line.encode("utf-8"))
+
+    async def _close(self) -> None:
+        if self._fh is not None:
+            await self._fh.close()
+            self._fh = None
+
+    def _needs_rotation(self, incoming: int) -> bool:
+        if self._size <= self._header_size:
+            return False  # в сегменте ещё нет записей
+        too_big = self._size + incoming > self.max_bytes
+        too_old = time.time() - self._started_at > self.max_age
+        return too_big or too_old
+
+    async def _rotate(self) -> None:
+        await self._close()
+        stamp = dt.datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        segment = self.path.with_name(f"{self.path.name}.{stamp}")
+        n = 1
+        while segment.exists() or Path(f"{segment}.gz").exists():
+            segment = self.path.with_name(f"{self.path.name}.{stamp}-{n}")
+            n += 1
+        self.path.rename(segment)
+        self.rotations += 1
+
+        # сжатие — в потоке и в фоне, запись в новый файл не ждёт
+        task = asyncio.create_task(asyncio.to_thread(_gzip, segment))
+        self._gzip_tasks.add(task)
+        task.add_done_callback(self._gzip_tasks.discard)
+        await self._open()
+
+    async def _flush(self, lines: List[str]) -> None:
+        data = "".join(lines)
+        if self._fh is None:
+            await self._open()
+        if self._needs_rotation(len(data.encode("utf-8"))):
+            await self._rotate()
+        await self._fh.write(data)
+        await self._fh.flush()
+        self._size += len(data.encode("utf-8"))
+        self.written += len(lines)
+        self.batches += 1
+
+    # ─────────────── фоновая задача ───────────────
+    async def _collect(self) -> List[str]:
+        """Пачка: первая запись + всё, что успеет прийти за flush_interval."""
+        lines = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(lines) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                lines.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return lines
+
+    async def _run(self) -> None:
+        while True:
+            lines = await self._collect()
+            try:
+                await self._flush(lines)
+            except Exception:
+                # задача должна жить: без task_done() shutdown() зависнет на join()
+                log.exception("audit: failed to write %d records", len(lines))
+                try:
+                    await self._close()  # откроем заново на следующей пачке
+                except Exception:
+                    self._fh = None
+            finally:
+                for _ in lines:
+                    self._queue.task_done()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "rotations": self.rotations,
+        }
+
+
+audit_sink = AuditSink(
+    setup.data_dir / "resume_audit.log",
+    max_bytes=setup.audit_max_bytes,
+    max_age=setup.audit_max_age,
+    batch_size=setup.audit_batch_size,
+    flush_interval=setup.audit_flush_interval,
+    queue_size=setup.audit_queue_size,
+)
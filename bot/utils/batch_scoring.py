@@ -0,0 +1,421 @@
+"""
+Пакетный пересчёт рейтингов через OpenAI Batch API (≈ вдвое дешевле
+онлайн-запросов, результат — в пределах 24 ч).
+
+    python -m bot.utils.batch_scoring --vacancy-id 3
+    python -m bot.utils.batch_scoring --vacancy-id 3 --online  # сразу, без 24 ч
+    python -m bot.utils.batch_scoring --vacancy-id 3 --local   # без сети
+
+Запросы строятся тем же ``request_body`` (PROMPT_TEMPLATE), что и онлайн-анализ,
+результаты разбираются ``parse_analysis`` и попадают в кэш анализов — повторный
+отклик с тем же резюме на ту же вакансию отвечается без OpenAI. Ответы
+заглушки ``--local`` в кэш не пишутся.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Protocol, Tuple
+
+from openai import AsyncOpenAI
+
+from bot.utils.analysis_cache import analysis_cache, make_key
+from bot.utils.openai_scheduler import (
+    COMPLETION_RESERVE,
+    Priority,
+    estimate_tokens,
+    openai_scheduler,
+)
+from bot.utils.resume_tools import (
+    MODEL,
+    PROMPT_VERSION,
+    parse_analysis,
+    request_body,
+)
+from services import ResumeFileService, VacancyService
+from settings.config import setup
+
+log = logging.getLogger(__name__)
+
+ENDPOINT = "/v1/chat/completions"
+MAX_REQUESTS_PER_BATCH = 50_000  # ограничения Batch API на входной файл
+MAX_BATCH_BYTES = 200 * 1024 * 1024
+TERMINAL = {"completed", "failed", "expired", "cancelled"}
+
+
+@dataclass
+class ScoringItem:
+    custom_id: str
+    resume_text: str
+    vacancy_text: str
+
+
+@dataclass
+class BatchReport:
+    results: Dict[str, Dict[str, Any]]
+    errors: Dict[str, str]
+
+
+def _request_line(it: ScoringItem) -> bytes:
+    line = {
+        "custom_id": it.custom_id,
+        "method": "POST",
+        "url": ENDPOINT,
+        "body": request_body(it.resume_text, it.vacancy_text),
+    }
+    return (json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def build_jsonl(items: Iterable[ScoringItem]) -> bytes:
+    """Входной JSONL для Batch API: одна строка — один chat.completions-запрос."""
+    return b"".join(_request_line(it) for it in items)
+
+
+def split_batches(
+    items: Iterable[ScoringItem],
+    *,
+    max_requests: int = MAX_REQUESTS_PER_BATCH,
+    max_bytes: int = MAX_BATCH_BYTES,
+) -> Iterator[Tuple[List[ScoringItem], bytes]]:
+    """Нарезать задания на входные файлы в пределах лимитов по числу и байтам."""
+    chunk: List[ScoringItem] = []
+    lines: List[bytes] = []
+    size = 0
+    for it in items:
+        line = _request_line(it)
+        if len(line) > max_bytes:
+            raise ValueError(f"{it.custom_id}: запрос больше {max_bytes} байт")
+        if chunk and (len(chunk) >= max_requests or size + len(line) > max_bytes):
+            yield chunk, b"".join(lines)
+            chunk, lines, size = [], [], 0
+        chunk.append(it)
+        lines.append(line)
+        size += len(line)
+    if chunk:
+        yield chunk, b"".join(lines)
+
+
+def parse_output(data: bytes) -> BatchReport:
+    """Разобрать выходной JSONL Batch API в результаты анализа и ошибки."""
+    report = BatchReport(results={}, errors={})
+    for line in data.decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        cid = row["custom_id"]
+        resp = row.get("response") or {}
+        if row.get("error") or resp.get("status_code") != 200:
+            report.errors[cid] = json.dumps(
+                row.get("error") or resp.get("body"), ensure_ascii=False
+            )[:400]
+            continue
+        try:
+            raw = resp["body"]["choices"][0]["message"]["content"]
+            report.results[cid] = parse_analysis(raw)
+        except (KeyError, IndexError, ValueError) as exc:
+            report.errors[cid] = str(exc)[:400]
+    return report
+
+
+#  бэкенды
+
+
+class BatchBackend(Protocol):
+    async def submit(self, jsonl: bytes) -> str: ...
+
+    async def status(self, batch_id: str) -> str: ...
+
+    async def output(self, batch_id: str) -> bytes: ...
+
+
+class OpenAIBatchBackend:
+    def __init__(self, client: AsyncOpenAI | None = None) -> None:
+        self.client = client or AsyncOpenAI(
+            api_key=setup.openai_api_key, base_url=setup.openai_base_url
+        )
+        # batch_id → (output_file_id, error_file_id)
+        self._files: Dict[str, Tuple[str | None, str | None]] = {}
+
+    async def submit(self, jsonl: bytes) -> str:
+        f = await self.client.files.create(file=("batch.jsonl", jsonl), purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=f.id,
+            endpoint=ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def status(self, batch_id: str) -> str:
+        batch = await self.client.batches.retrieve(batch_id)
+        self._files[batch_id] = (batch.output_file_id, batch.error_file_id)
+        return batch.status
+
+    async def output(self, batch_id: str) -> bytes:
+        """Файл результатов и файл ошибок — строки у них одного формата."""
+        parts = []
+        for file_id in self._files.get(batch_id, ()):
+            if file_id:
+                content = await self.client.files.content(file_id)
+                data = content.content
+                parts.append(data if data.endswith(b"\n") else data + b"\n")
+        return b"".join(parts)
+
+
+class LocalBatchBackend:
+    """
+    Локальная замена Batch API: выполняет запросы сразу, ответ модели
+    даёт ``responder`` (по умолчанию — заглушка нужной схемы).
+    """
+
+    def __init__(
+        self,
+        responder: Callable[[Dict[str, Any]], str] | None = None,
+        *,
+        polls_until_done: int = 1,
+    ) -> None:
+        self.responder = responder or _stub_response
+        self.polls_until_done = polls_until_done
+        self._batches: Dict[str, tuple[bytes, int]] = {}
+
+    async def submit(self, jsonl: bytes) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex[:12]}"
+        self._batches[batch_id] = (jsonl, 0)
+        return batch_id
+
+    async def status(self, batch_id: str) -> str:
+        jsonl, polls = self._batches[batch_id]
+        polls += 1
+        self._batches[batch_id] = (jsonl, polls)
+        return "completed" if polls >= self.polls_until_done else "in_progress"
+
+    async def output(self, batch_id: str) -> bytes:
+        jsonl, _ = self._batches[batch_id]
+        out = io.StringIO()
+        for line in jsonl.decode("utf-8").splitlines():
+            req = json.loads(line)
+            content = self.responder(req["body"])
+            row = {
+                "id": f"resp_{uuid.uuid4().hex[:12]}",
+                "custom_id": req["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "model": req["body"]["model"],
+                        "choices": [
+                            {"message": {"role": "assistant", "content": content}}
+                        ],
+                    },
+                },
+                "error": None,
+            }
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+        return out.getvalue().encode("utf-8")
+
+
+class OnlineBatchBackend:
+    """
+    Тот же пересчёт обычными chat.completions-запросами — когда ждать
+    Batch API до 24 ч не хочется. Запросы идут через ``openai_scheduler``
+    с приоритетом BACKGROUND: в пределах RPM/TPM и после любых
+    кандидатских запросов того же процесса.
+    """
+
+    def __init__(
+        self, client: AsyncOpenAI | None = None, *, concurrency: int = 8
+    ) -> None:
+        self.client = client or AsyncOpenAI(
+            api_key=setup.openai_api_key,
+            base_url=setup.openai_base_url,
+            timeout=setup.openai_timeout,
+            max_retries=0,  # повторы делает планировщик
+        )
+        self.concurrency = concurrency
+        self._batches: Dict[str, bytes] = {}
+
+    async def submit(self, jsonl: bytes) -> str:
+        batch_id = f"batch_online_{uuid.uuid4().hex[:12]}"
+        self._batches[batch_id] = jsonl
+        return batch_id
+
+    async def status(self, batch_id: str) -> str:
+        return "completed"  # запросы выполняются в output()
+
+    async def output(self, batch_id: str) -> bytes:
+        requests = [
+            json.loads(line) for line in self._batches.pop(batch_id).splitlines()
+        ]
+        sem = asyncio.Semaphore(self.concurrency)
+        rows = await asyncio.gather(*(self._one(req, sem) for req in requests))
+        return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows).encode()
+
+    async def _one(self, req: Dict[str, Any], sem: asyncio.Semaphore) -> Dict[str, Any]:
+        body = req["body"]
+        tokens = estimate_tokens(*(m["content"] for m in body["messages"]))
+        async with sem:
+            try:
+                resp = await openai_scheduler.run(
+                    lambda: self.client.chat.completions.create(**body),
+                    tokens=tokens + COMPLETION_RESERVE,
+                    priority=Priority.BACKGROUND,
+                )
+            except Exception as exc:
+                return {"custom_id": req["custom_id"], "error": {"message": str(exc)}}
+        return {
+            "custom_id": req["custom_id"],
+            "response": {"status_code": 200, "body": resp.model_dump()},
+            "error": None,
+        }
+
+
+def _stub_response(body: Dict[str, Any]) -> str:
+    return json.dumps(
+        {
+            "rating": 50,
+            "strong": "—",
+            "weak": "—",
+            "matched_experience": "—",
+            "missing_experience": "—",
+            "water": "—",
+            "mismatches": "—",
+            "suspicious": "—",
+            "interview_questions": ["—", "—", "—"],
+            "interview_tips": "—",
+        },
+        ensure_ascii=False,
+    )
+
+
+#  конвейер
+
+
+async def run_batch(
+    items: List[ScoringItem],
+    backend: BatchBackend,
+    *,
+    poll_interval: float = 60.0,
+    timeout: float = 25 * 3600,
+) -> BatchReport:
+    """Отправить задания, дождаться завершения и собрать результаты."""
+    report = BatchReport(results={}, errors={})
+    for chunk, jsonl in split_batches(items):
+        batch_id = await backend.submit(jsonl)
+        log.info(
+            "batch %s submitted: %d requests, %d bytes",
+            batch_id,
+            len(chunk),
+            len(jsonl),
+        )
+
+        deadline = time.monotonic() + timeout
+        while (status := await backend.status(batch_id)) not in TERMINAL:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"batch {batch_id} не завершился за {timeout} сек.")
+            await asyncio.sleep(poll_interval)
+
+        if status != "completed":
+            for it in chunk:
+                report.errors[it.custom_id] = f"batch {status}"
+            continue
+
+        part = parse_output(await backend.output(batch_id))
+        report.results.update(part.results)
+        report.errors.update(part.errors)
+        for it in chunk:
+            if it.custom_id not in part.results and it.custom_id not in part.errors:
+                report.errors[it.custom_id] = "нет ни в файле результатов, ни в ошибках"
+    return report
+
+
+async def ingest(items: List[ScoringItem], report: BatchReport) -> int:
+    """Сложить результаты в кэш анализов одним upsert; вернуть число записей."""
+    rows = {
+        make_key(
+            it.resume_text, it.vacancy_text, prompt_version=PROMPT_VERSION, model=MODEL
+        ): report.results[it.custom_id]
+        for it in items
+        if it.custom_id in report.results
+    }
+    await analysis_cache.put_many(rows)
+    return len(rows)
+
+
+async def score_vacancy(
+    vacancy_id: int,
+    backend: BatchBackend,
+    *,
+    limit: int | None = None,
+    poll_interval: float = 60.0,
+    store: bool = True,
+) -> BatchReport:
+    """
+    Пересчитать все сохранённые резюме против одной вакансии.
+    ``store=False`` — не писать результаты в кэш анализов (заглушка).
+    """
+    vacancy = await VacancyService.by_id(vacancy_id)
+    if vacancy is None:
+        raise ValueError(f"Вакансия {vacancy_id} не найдена")
+    vacancy_text = vacancy.description or vacancy.title
+
+    files = await ResumeFileService.with_text(limit)
+    items = [
+        ScoringItem(f"{f.id}:{vacancy_id}", f.text or "", vacancy_text) for f in files
+    ]
+    report = await run_batch(items, backend, poll_interval=poll_interval)
+    stored = await ingest(items, report) if store else 0
+    log.info(
+        "vacancy %s: %d scored, %d stored, %d errors",
+        vacancy_id,
+        len(report.results),
+        stored,
+        len(report.errors),
+    )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пакетный пересчёт рейтингов")
+    parser.add_argument("--vacancy-id", type=int, required=True)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument(
+        "--poll", type=float, default=60.0, help="интервал опроса, сек."
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--online", action="store_true", help="обычными запросами, фоновый приоритет"
+    )
+    mode.add_argument("--local", action="store_true", help="без сети (заглушка)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    backend: BatchBackend
+    if args.local:
+        backend = LocalBatchBackend()
+    elif args.online:
+        backend = OnlineBatchBackend()
+    else:
+        backend = OpenAIBatchBackend()
+    report = asyncio.run(
+        score_vacancy(
+            args.vacancy_id,
+            backend,
+            limit=args.limit,
+            poll_interval=args.poll,
+            # фиктивный рейтинг заглушки не должен достаться живому кандидату
+            store=not args.local,
+        )
+    )
+    for cid, result in sorted(report.results.items()):
+        print(f"{cid}\t{result.get('rating', '—')}")
+    for cid, err in sorted(report.errors.items()):
+        print(f"{cid}\tERROR {err}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Set, TypeVar
+
+from settings.config import setup
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# fork из процесса с потоками (aiosqlite, to_thread) может зависнуть на
+# захваченной в родителе блокировке; воркеры форкаются из чистого forkserver
+_MP = mp.get_context("forkserver")
+
+
+def _warmup() -> int:
+    # тяжёлые парсеры импортируем заранее — первый отклик не платит за это
+    from bot.utils.extractors import preload
+
+    preload()
+    return os.getpid()
+
+
+def _consume(fut: asyncio.Future) -> None:
+    # результат брошенной задачи никому не нужен — не логируем его как потерянный
+    if not fut.cancelled():
+        fut.exception()
+
+
+@dataclass(eq=False)
+class _Worker:
+    executor: ProcessPoolExecutor
+    pid: int
+
+
+class ExtractionPool:
+    """
+    Пул процессов для парсинга резюме: pdfminer и python-docx
+    работают вне event loop и не тормозят остальные апдейты.
+
+    Каждый воркер — отдельный однопроцессный executor. Задача сначала
+    ждёт свободного воркера и только потом отдаётся ему, поэтому таймаут
+    считает время парсинга, а не очередь. Зависший воркер убивается и
+    заменяется один — остальные задачи это не задевает.
+    """
+
+    def __init__(self, *, workers: int, timeout: float, max_bytes: int) -> None:
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self._idle: asyncio.Queue[_Worker | None] = asyncio.Queue()
+        self._all: Set[_Worker] = set()
+        self._spawning: Set[asyncio.Task] = set()
+        self._started = False
+        self._in_flight = 0
+        self._busy = 0
+        self.recycled = 0  # сколько воркеров заменено после таймаута или падения
+
+    # ─────────────── метрики ───────────────
+    @property
+    def in_flight(self) -> int:
+        """Задачи, отправленные в пул и ещё не завершённые."""
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Сколько задач ждут свободного воркера."""
+        return self._in_flight - self._busy
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "recycled": self.recycled,
+        }
+
+    # ─────────────── жизненный цикл ───────────────
+    async def _spawn(self) -> _Worker:
+        # прогреваем: поднимаем процесс и импортируем парсеры; pid — чтобы
+        # убить именно этот процесс, если задача в нём зависнет
+        executor = ProcessPoolExecutor(max_workers=1, mp_context=_MP)
+        pid = await asyncio.get_running_loop().run_in_executor(executor, _warmup)
+        worker = _Worker(executor, pid)
+        self._all.add(worker)
+        return worker
+
+    async def start(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        workers = await asyncio.gather(*(self._spawn() for _ in range(self.workers)))
+        for worker in workers:
+            self._idle.put_nowait(worker)
+        log.info(
+            "extraction pool ready: %d workers %s",
+            self.workers,
+            sorted(w.pid for w in workers),
+        )
+
+    async def shutdown(self) -> None:
+        if not self._started:
+            return
+        self._started = False
+        for task in self._spawning:
+            task.cancel()
+        await asyncio.gather(*self._spawning, return_exceptions=True)
+        for worker in self._all:
+            worker.executor.shutdown(wait=False, cancel_futures=True)
+        self._all.clear()
+        idle, self._idle = self._idle, asyncio.Queue()
+        idle.put_nowait(None)  # будим ждущих воркера
+
+    def _replace(self, worker: _Worker) -> None:
+        """Убить процесс ``worker`` и поднять вместо него новый."""
+        self.recycled += 1
+        self._all.discard(worker)
+        try:
+            os.kill(worker.pid, signal.SIGKILL)
+        except ProcessLookupError:  # уже упал сам
+            pass
+        worker.executor.shutdown(wait=False)
+
+        task = asyncio.create_task(self._respawn())
+        self._spawning.add(task)
+        task.add_done_callback(self._spawning.discard)
+
+    async def _respawn(self) -> None:
+        try:
+            worker = await self._spawn()
+        except Exception:
+            log.exception("extraction pool: failed to start a worker")
+            return
+        self._idle.put_nowait(worker)
+
+    # ─────────────── выполнение ───────────────
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Выполнить ``fn(*args)`` в пуле. ``fn`` должна быть функцией
+        верхнего уровня модуля (pickle).
+        """
+        if not self._started:
+            await self.start()
+
+        self._in_flight += 1
+        try:
+            worker = await self._acquire()
+            self._busy += 1
+            try:
+                return await self._run_on(worker, fn, *args)
+            finally:
+                self._busy -= 1
+        finally:
+            self._in_flight -= 1
+
+    async def _acquire(self) -> _Worker:
+        idle = self._idle
+        worker = await idle.get()
+        if worker is None:  # пул остановлен — будим следующего ждущего
+            idle.put_nowait(None)
+            raise RuntimeError("extraction pool is shut down")
+        return worker
+
+    async def _run_on(self, worker: _Worker, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        fut = loop.run_in_executor(worker.executor, fn, *args)
+        try:
+            # shield: отмена вызывающего не освобождает воркер раньше задачи
+            result = await asyncio.wait_for(asyncio.shield(fut), self.timeout)
+        except asyncio.TimeoutError:
+            log.warning("extraction timed out, replacing worker %d", worker.pid)
+            fut.add_done_callback(_consume)
+            self._replace(worker)
+            raise TimeoutError(
+                f"Файл обрабатывается дольше {self.timeout:.0f} сек."
+            ) from None
+        except BrokenProcessPool:
+            # процесс упал на этом файле (OOM, segfault в парсере)
+            log.warning("extraction worker %d died, replacing", worker.pid)
+            self._replace(worker)
+            raise
+        except BaseException:
+            fut.add_done_callback(lambda f: (_consume(f), self._release(worker)))
+            raise
+        self._release(worker)
+        return result
+
+    def _release(self, worker: _Worker) -> None:
+        if worker in self._all:  # пул не остановлен
+            self._idle.put_nowait(worker)
+
+
+extraction_pool = ExtractionPool(
+    workers=setup.extract_workers,
+    timeout=setup.extract_timeout,
+    max_bytes=setup.extract_max_bytes,
+)
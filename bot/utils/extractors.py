@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+# pdfminer и python-docx импортируются при первом файле своего типа —
+# в процессе пула парсинга (его _warmup зовёт preload), а не в боте
+if TYPE_CHECKING:
+    from pdfminer.pdfpage import PDFPage
+
+_TXT_CHUNK = 64 * 1024
+
+
+def preload() -> None:
+    """Загрузить парсеры заранее (в воркерах пула при старте)."""
+    import docx  # noqa: F401
+    import pdfminer.converter  # noqa: F401
+    import pdfminer.pdfinterp  # noqa: F401
+    import pdfminer.pdfpage  # noqa: F401
+
+
+@dataclass
+class ExtractedText:
+    text: str
+    truncated: bool  # текст обрезан бюджетом символов, за ним ещё что-то было
+    units_read: int  # страниц PDF / абзацев DOCX / блоков TXT
+    units_total: int | None  # None — неизвестно (TXT)
+    skipped: int = 0  # страницы без текстового слоя (сканы)
+
+    @property
+    def has_skipped(self) -> bool:
+        """Часть страниц не прочитана как текст — независимо от бюджета."""
+        return self.skipped > 0
+
+    @property
+    def units_left(self) -> int | None:
+        if self.units_total is None:
+            return None
+        return max(0, self.units_total - self.units_read - self.skipped)
+
+
+class _Progress:
+    __slots__ = ("read", "total", "skipped")
+
+    def __init__(self) -> None:
+        self.read = 0
+        self.total: int | None = None
+        self.skipped = 0
+
+
+def _has_text_layer(page: PDFPage) -> bool:
+    """Без шрифтов и form-XObject'ов на странице текста нет — это скан."""
+    from pdfminer.pdftypes import PDFStream, resolve1
+
+    res = resolve1(page.resources) or {}
+    if resolve1(res.get("Font")):
+        return True
+    for ref in (resolve1(res.get("XObject")) or {}).values():
+        xobj = resolve1(ref)
+        if (
+            isinstance(xobj, PDFStream)
+            and getattr(xobj.get("Subtype"), "name", None) == "Form"
+        ):
+            return True
+    return False
+
+
+def _iter_pdf(path: Path, progress: _Progress) -> Iterator[str]:
+    from pdfminer.converter import PDFPageAggregator
+    from pdfminer.layout import LAParams, LTTextContainer
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdftypes import resolve1
+
+    with path.open("rb") as fh:
+        doc = PDFDocument(PDFParser(fh))
+        pages = resolve1(doc.catalog.get("Pages")) or {}
+        progress.total = resolve1(pages.get("Count"))
+
+        rsrc = PDFResourceManager()
+        device = PDFPageAggregator(rsrc, laparams=LAParams())
+        interpreter = PDFPageInterpreter(rsrc, device)
+
+        for page in PDFPage.create_pages(doc):
+            if not _has_text_layer(page):
+                progress.skipped += 1
+                continue
+            interpreter.process_page(page)
+            progress.read += 1
+            yield "".join(
+                el.get_text()
+                for el in device.get_result()
+                if isinstance(el, LTTextContainer)
+            )
+
+
+def _iter_docx(path: Path, progress: _Progress) -> Iterator[str]:
+    from docx import Document
+
+    paragraphs = Document(str(path)).paragraphs
+    progress.total = len(paragraphs)
+    for par in paragraphs:
+        progress.read += 1
+        yield par.text + "\n"
+
+
+def _iter_txt(path: Path, progress: _Progress) -> Iterator[str]:
+    with path.open("r", encoding="utf-8", errors="ignore") as fh:
+        while chunk := fh.read(_TXT_CHUNK):
+            progress.read += 1
+            yield chunk
+
+
+def iter_text(path: Path, progress: _Progress | None = None) -> Iterator[str]:
+    """Текст документа по кусочкам: страница PDF, абзац DOCX, блок TXT."""
+    progress = progress or _Progress()
+    match path.suffix.lower():
+        case ".txt":
+            yield from _iter_txt(path, progress)
+        case ".pdf":
+            yield from _iter_pdf(path, progress)
+        case ".doc" | ".docx":
+            yield from _iter_docx(path, progress)
+
+
+def extract(path: str | Path, max_chars: int) -> ExtractedText:
+    """
+    Читать документ, пока не наберётся ``max_chars`` символов: оставшиеся
+    страницы не парсятся вовсе, что ограничивает и CPU, и память.
+    """
+    progress = _Progress()
+    parts: list[str] = []
+    size = 0
+    truncated = False
+
+    with closing(iter_text(Path(path), progress)) as chunks:
+        for chunk in chunks:
+            parts.append(chunk)
+            size += len(chunk)
+            if size >= max_chars:
+                # ровно в бюджет: обрезано, только если дальше есть текст
+                truncated = size > max_chars or any(chunks)
+                break
+
+    text = "".join(parts)[:max_chars]
+    return ExtractedText(
+        text=text,
+        truncated=truncated,
+        units_read=progress.read,
+        units_total=progress.total,
+        skipped=progress.skipped,
+    )
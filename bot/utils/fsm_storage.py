@@ -0,0 +1,232 @@
+"""
+Хранилища FSM, общие для нескольких процессов бота.
+
+    fsm_storage=memory    — aiogram MemoryStorage (один процесс, теряется при рестарте)
+    fsm_storage=postgres  — таблица fsm_states в основной БД
+    fsm_storage=redis     — aiogram RedisStorage (нужен пакет redis и REDIS_URL)
+
+Ключ записи — DefaultKeyBuilder с bot_id и destiny: состояние одного
+пользователя в одном чате никогда не пересекается с чужим, а destiny
+позволяет хранить рядом служебные записи (например, токены советов).
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import logging
+from functools import partial
+from typing import Any, Dict
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import (
+    BaseEventIsolation,
+    BaseStorage,
+    DefaultKeyBuilder,
+    KeyBuilder,
+    StateType,
+    StorageKey,
+)
+from aiogram.fsm.storage.memory import DisabledEventIsolation, MemoryStorage
+from sqlalchemy import case, delete, func, null, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from db.connection import async_session
+from db.dialects import empty_json, insert, json_merge
+from db.models import FsmRecord
+from settings.config import setup
+
+log = logging.getLogger(__name__)
+
+key_builder = DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+
+_json_dumps = partial(json.dumps, ensure_ascii=False, separators=(",", ":"))
+
+
+def _state_name(state: StateType) -> str | None:
+    return state.state if isinstance(state, State) else state
+
+
+class PostgresStorage(BaseStorage):
+    """
+    Состояние и данные — одна строка fsm_states. Запись — один upsert,
+    ``update_data`` сливает словари на стороне БД (JSONB ``||``), так что
+    параллельные процессы не затирают изменения друг друга.
+    """
+
+    _PRUNE_EVERY = 500  # записей между чистками просроченных строк
+
+    def __init__(self, *, ttl: int, builder: KeyBuilder = key_builder) -> None:
+        self.ttl = ttl
+        self.key_builder = builder
+        self._writes = 0
+
+    def _expires_at(self) -> dt.datetime:
+        return dt.datetime.utcnow() + dt.timedelta(seconds=self.ttl)
+
+    @staticmethod
+    def _alive(column: Any) -> Any:
+        """Значение колонки, если строка не просрочена, иначе NULL."""
+        return case((FsmRecord.expires_at > dt.datetime.utcnow(), column), else_=None)
+
+    async def _upsert(
+        self, key: StorageKey, *, merge: bool = False, **values: Any
+    ) -> Dict[str, Any] | None:
+        k = self.key_builder.build(key)
+        stmt = insert(FsmRecord).values(key=k, expires_at=self._expires_at(), **values)
+        ex = stmt.excluded
+        update: Dict[str, Any] = {"expires_at": ex.expires_at}
+        if "state" in values:
+            update["state"] = ex.state
+            update["data"] = self._alive(FsmRecord.data)
+        else:
+            update["state"] = self._alive(FsmRecord.state)
+            update["data"] = (
+                json_merge(
+                    func.coalesce(self._alive(FsmRecord.data), empty_json()), ex.data
+                )
+                if merge
+                else ex.data
+            )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FsmRecord.key], set_=update
+        ).returning(FsmRecord.data)
+
+        async with async_session() as s:
+            data = (await s.execute(stmt)).scalar_one()
+            # пустая запись не нужна — сразу удаляем
+            await s.execute(
+                delete(FsmRecord).where(
+                    FsmRecord.key == k,
+                    FsmRecord.state.is_(None),
+                    func.coalesce(FsmRecord.data, empty_json()) == empty_json(),
+                )
+            )
+            await s.commit()
+
+        self._writes += 1
+        if self._writes % self._PRUNE_EVERY == 0:
+            await self.prune()
+        return data
+
+    async def _row(self, key: StorageKey) -> FsmRecord | None:
+        async with async_session() as s:
+            res = await s.execute(
+                select(FsmRecord).where(
+                    FsmRecord.key == self.key_builder.build(key),
+                    FsmRecord.expires_at > dt.datetime.utcnow(),
+                )
+            )
+            return res.scalar_one_or_none()
+
+    async def prune(self) -> None:
+        try:
+            async with async_session() as s:
+                await s.execute(
+                    delete(FsmRecord).where(
+                        FsmRecord.expires_at <= dt.datetime.utcnow()
+                    )
+                )
+                await s.commit()
+        except SQLAlchemyError:
+            log.warning("fsm storage: prune failed", exc_info=True)
+
+    # ─────────────── BaseStorage ───────────────
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._upsert(key, state=_state_name(state))
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        row = await self._row(key)
+        return row.state if row else None
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        # SQL NULL, а не JSON null: иначе пустая запись не удалится
+        await self._upsert(key, data=dict(data) or null())
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        row = await self._row(key)
+        return dict(row.data or {}) if row else {}
+
+    async def update_data(
+        self, key: StorageKey, data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if not data:
+            return await self.get_data(key)
+        merged = await self._upsert(key, data=dict(data), merge=True)
+        return dict(merged or {})
+
+    async def pop_data(self, key: StorageKey) -> Dict[str, Any] | None:
+        """Забрать данные и удалить запись одним ``DELETE … RETURNING``."""
+        async with async_session() as s:
+            res = await s.execute(
+                delete(FsmRecord)
+                .where(
+                    FsmRecord.key == self.key_builder.build(key),
+                    FsmRecord.expires_at > dt.datetime.utcnow(),
+                )
+                .returning(FsmRecord.data)
+            )
+            data = res.scalar_one_or_none()
+            await s.commit()
+        return dict(data) if data else None
+
+    async def close(self) -> None:
+        pass  # движок БД общий, его закрывает не хранилище
+
+
+def _redis_storage() -> BaseStorage:
+    try:
+        from aiogram.fsm.storage.redis import RedisStorage
+    except ImportError as exc:  # пакет redis не установлен
+        raise RuntimeError("fsm_storage=redis требует пакет redis") from exc
+    if not setup.redis_url:
+        raise RuntimeError("fsm_storage=redis требует REDIS_URL")
+
+    return RedisStorage.from_url(
+        setup.redis_url,
+        key_builder=key_builder,
+        state_ttl=setup.fsm_ttl,
+        data_ttl=setup.fsm_ttl,
+        json_dumps=_json_dumps,
+    )
+
+
+async def pop_data(storage: BaseStorage, key: StorageKey) -> Dict[str, Any] | None:
+    """
+    Атомарно прочитать и удалить данные записи: из двух процессов,
+    забирающих один ключ, данные получит только один.
+    """
+    if isinstance(storage, PostgresStorage):
+        return await storage.pop_data(key)
+    redis = getattr(storage, "redis", None)
+    if redis is not None:  # RedisStorage: GETDEL (Redis ≥ 6.2)
+        raw = await redis.getdel(storage.key_builder.build(key, "data"))
+        if raw is None:
+            return None
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        return storage.json_loads(raw) or None
+    raise TypeError(f"{type(storage).__name__} не поддерживает атомарный pop")
+
+
+def create_storage(kind: str | None = None) -> BaseStorage:
+    kind = (kind or setup.fsm_storage).lower()
+    match kind:
+        case "memory":
+            return MemoryStorage()
+        case "postgres":
+            return PostgresStorage(ttl=setup.fsm_ttl)
+        case "redis":
+            return _redis_storage()
+    raise ValueError(f"Неизвестное хранилище FSM: {kind}")
+
+
+def create_isolation(storage: BaseStorage) -> BaseEventIsolation:
+    """
+    Очерёдность апдейтов одного пользователя между процессами — только
+    с Redis (распределённая блокировка); иначе, как и раньше, без неё.
+    """
+    create = getattr(storage, "create_isolation", None)
+    if create is not None:
+        return create()
+    return DisabledEventIsolation()
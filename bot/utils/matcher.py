@@ -0,0 +1,128 @@
+"""
+Подбор вакансий под резюме: матрица hashed-признаков всех активных
+вакансий, ранжирование одним произведением матрицы на вектор.
+
+Матрица обновляется инкрементально по снимку каталога: пересчитываются
+только новые/изменённые строки, удалённые освобождаются.
+"""
+
+from __future__ import annotations
+
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from bot.utils.prefilter import tokenize, vacancy_text
+from services import VacancyService
+from services.read_models import VacancyCard
+from services.vacancy_service import CatalogSnapshot
+
+DIM = 512  # размер hashed-пространства признаков
+MIN_SCORE = 0.05
+
+
+@lru_cache(maxsize=65536)
+def _bucket(token: str) -> int:
+    # crc32 стабилен между процессами, в отличие от hash()
+    return zlib.crc32(token.encode("utf-8")) % DIM
+
+
+def _term_vector(text: str) -> np.ndarray:
+    tokens = tokenize(text)
+    idx = np.fromiter(map(_bucket, tokens), dtype=np.intp, count=len(tokens))
+    vec = np.bincount(idx, minlength=DIM).astype(np.float32)
+    return np.log1p(vec, out=vec)  # сублинейный tf
+
+
+def _normalize(vec: np.ndarray) -> np.ndarray:
+    n = float(np.linalg.norm(vec))
+    return vec / n if n > 0 else vec
+
+
+class VacancyMatcher:
+    def __init__(self, capacity: int = 256) -> None:
+        self._matrix = np.zeros((capacity, DIM), dtype=np.float32)
+        self._row_ids = np.full(capacity, -1, dtype=np.int64)  # -1 — свободная строка
+        self._rows: Dict[int, int] = {}  # vacancy_id → строка
+        self._cards: Dict[int, VacancyCard] = {}
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+        self._df = np.zeros(DIM, dtype=np.float32)  # в скольких вакансиях есть признак
+        self._snapshot: CatalogSnapshot | None = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ─────────────── обновление ───────────────
+    def _grow(self) -> None:
+        old = self._matrix.shape[0]
+        self._matrix = np.vstack([self._matrix, np.zeros_like(self._matrix)])
+        self._row_ids = np.concatenate(
+            [self._row_ids, np.full(old, -1, dtype=np.int64)]
+        )
+        self._free.extend(range(2 * old - 1, old - 1, -1))
+
+    def _drop(self, vacancy_id: int) -> None:
+        row = self._rows.pop(vacancy_id)
+        self._df -= self._matrix[row] > 0
+        self._matrix[row] = 0.0
+        self._row_ids[row] = -1
+        self._free.append(row)
+        del self._cards[vacancy_id]
+
+    def _put(self, card: VacancyCard) -> None:
+        if card.id in self._rows:
+            self._drop(card.id)
+        if not self._free:
+            self._grow()
+        row = self._free.pop()
+        self._matrix[row] = _normalize(_term_vector(vacancy_text(card)))
+        self._df += self._matrix[row] > 0
+        self._row_ids[row] = card.id
+        self._rows[card.id] = row
+        self._cards[card.id] = card
+
+    def sync(self, snap: CatalogSnapshot) -> None:
+        """Привести матрицу к снимку каталога, трогая только изменившиеся строки."""
+        if snap is self._snapshot:
+            return
+        for vid in [vid for vid in self._rows if vid not in snap.by_id]:
+            self._drop(vid)
+        for card in snap.vacancies:
+            if self._cards.get(card.id) != card:
+                self._put(card)
+        self._snapshot = snap
+
+    # ─────────────── ранжирование ───────────────
+    def rank(
+        self, text: str, *, k: int = 3, exclude: int | None = None
+    ) -> List[Tuple[VacancyCard, float]]:
+        if not self._rows:
+            return []
+
+        n = len(self._rows)
+        idf = np.log1p(n / (1.0 + self._df))
+        query = _normalize(_term_vector(text) * idf)
+        scores = self._matrix @ query
+        scores[self._row_ids < 0] = -1.0
+        if exclude is not None and exclude in self._rows:
+            scores[self._rows[exclude]] = -1.0
+
+        k = min(k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (self._cards[int(self._row_ids[i])], float(scores[i]))
+            for i in top
+            if scores[i] >= MIN_SCORE
+        ]
+
+    async def recommend(
+        self, text: str, *, k: int = 3, exclude: int | None = None
+    ) -> List[VacancyCard]:
+        self.sync(await VacancyService.snapshot())
+        return [card for card, _ in self.rank(text, k=k, exclude=exclude)]
+
+
+matcher = VacancyMatcher()
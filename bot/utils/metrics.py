@@ -0,0 +1,306 @@
+"""
+Метрики процесса в текстовом формате Prometheus.
+
+    with stage_seconds.time(stage="download"):
+        stored = await fetch_resume(bot, doc)
+
+Счётчики и гистограммы живут в памяти процесса; ``stats()`` уже
+существующих компонентов подключаются через ``registry.collector``.
+Отдаёт их локальный HTTP-сервер (``metrics_host:metrics_port``), при
+нескольких webhook-воркерах — по порту на воркер.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Tuple
+
+from aiohttp import web
+
+log = logging.getLogger(__name__)
+
+# от быстрых хендлеров меню до многосекундных ответов LLM
+LATENCY_BUCKETS = (
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    20.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _labels(names: Tuple[str, ...], values: LabelValues, **extra: str) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...]) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+
+    def _key(self, labels: Mapping[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: ожидаются метки {self.labelnames}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    @abstractmethod
+    def _samples(self) -> Iterator[str]:
+        """Строки значений метрики, без HELP/TYPE."""
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(),
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # по метке: счётчики корзин (последняя — +Inf), сумма
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Замерить блок; время учитывается и при исключении."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> Iterator[str]:
+        for key, counts in self._counts.items():
+            total = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                total += n
+                le = _labels(self.labelnames, key, le=_number(bound))
+                yield f"{self.name}_bucket{le} {total}"
+            labels = _labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_number(self._sums[key])}"
+            yield f"{self.name}_count{labels} {total}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[
+            str, Tuple[str, Callable[[], Mapping[str, Any]], str | None]
+        ] = {}
+
+    def counter(
+        self, name: str, help: str, labelnames: Tuple[str, ...] = ()
+    ) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def _add(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def collector(
+        self,
+        prefix: str,
+        help: str,
+        stats: Callable[[], Mapping[str, Any]],
+        *,
+        label: str | None = None,
+    ) -> None:
+        """
+        Числовые поля ``stats()`` — gauge'ами ``<prefix>_<поле>``
+        (повторная регистрация префикса заменяет источник). С ``label``
+        поле может быть словарём ``{значение метки: число}``.
+        """
+        self._collectors[prefix] = (help, stats, label)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for prefix, (help, stats, label) in self._collectors.items():
+            try:
+                values = stats()
+            except Exception:
+                log.warning("metrics: collector %s failed", prefix, exc_info=True)
+                continue
+            for field, value in values.items():
+                if label is not None and isinstance(value, Mapping):
+                    samples = [
+                        (_labels((label,), (str(lv),)), v) for lv, v in value.items()
+                    ]
+                else:
+                    samples = [("", value)]
+                samples = [
+                    (labels, v)
+                    for labels, v in samples
+                    if isinstance(v, (int, float)) and not isinstance(v, bool)
+                ]
+                if not samples:
+                    continue
+                name = f"{prefix}_{field}"
+                lines.append(f"# HELP {name} {help}: {field}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(f"{name}{labels} {_number(v)}" for labels, v in samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+#  метрики бота
+
+handler_seconds = registry.histogram(
+    "bot_handler_seconds",
+    "Время обработки апдейта хендлером",
+    ("router", "event"),
+)
+handler_errors = registry.counter(
+    "bot_handler_errors_total",
+    "Исключения, вылетевшие из хендлеров",
+    ("router", "event"),
+)
+stage_seconds = registry.histogram(
+    "resume_stage_seconds",
+    "Этапы обработки резюме",
+    ("stage",),
+)
+openai_seconds = registry.histogram(
+    "openai_request_seconds",
+    "Длительность одного запроса к OpenAI (без ожидания в планировщике)",
+)
+openai_requests = registry.counter(
+    "openai_requests_total",
+    "Запросы к OpenAI по исходу: ok | rate_limited | error",
+    ("outcome",),
+)
+openai_tokens = registry.counter(
+    "openai_tokens_total",
+    "Токены из usage ответов OpenAI: prompt | completion | cached",
+    ("kind",),
+)
+analysis_cache_lookups = registry.counter(
+    "analysis_cache_lookups_total",
+    "Поиск анализа в кэше: memory | db | inflight | miss",
+    ("result",),
+)
+
+
+def record_usage(usage: Any) -> None:
+    """Учесть ``usage`` ответа OpenAI в счётчиках токенов."""
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    for kind, value in (
+        ("prompt", getattr(usage, "prompt_tokens", None)),
+        ("completion", getattr(usage, "completion_tokens", None)),
+        ("cached", getattr(details, "cached_tokens", None)),
+    ):
+        if value:
+            openai_tokens.inc(value, kind=kind)
+
+
+#  HTTP
+
+
+async def _metrics(request: web.Request) -> web.Response:
+    return web.Response(
+        body=registry.render().encode("utf-8"),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
+
+async def start_server(host: str, port: int) -> web.AppRunner | None:
+    """Поднять ``GET /metrics``; занятый порт не мешает работе бота."""
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+    except OSError:
+        log.exception("metrics: cannot listen on %s:%s", host, port)
+        await runner.cleanup()
+        return None
+    log.info("metrics: http://%s:%s/metrics", host, port)
+    return runner
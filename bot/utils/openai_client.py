@@ -0,0 +1,44 @@
+"""
+Общий клиент OpenAI на процесс. SDK импортируется, а клиент создаётся
+при первом запросе к модели, а не при импорте бота: ``import openai``
+заметно удлиняет холодный старт, а меню и списки вакансий он не нужен.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from settings.config import setup
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+_client: AsyncOpenAI | None = None
+
+
+def openai_client() -> AsyncOpenAI:
+    global _client
+    if _client is None:
+        from openai import AsyncOpenAI
+
+        # повторы 429 делает openai_scheduler, а не SDK
+        _client = AsyncOpenAI(
+            api_key=setup.openai_api_key,
+            base_url=setup.openai_base_url,
+            timeout=setup.openai_timeout,
+            max_retries=0,
+        )
+    return _client
+
+
+def set_openai_client(client: Any) -> None:
+    """Подменить клиент (заглушка в tools.bench)."""
+    global _client
+    _client = client
+
+
+async def close_openai_client() -> None:
+    global _client
+    if _client is not None and hasattr(_client, "close"):
+        await _client.close()
+    _client = None
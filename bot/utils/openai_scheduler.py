@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, TypeVar
+
+from bot.utils.metrics import openai_requests, openai_seconds, record_usage
+from settings.config import setup
+
+if TYPE_CHECKING:
+    from openai import RateLimitError
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# запас под ответ модели: JSON анализа укладывается в ~600 токенов
+COMPLETION_RESERVE = 800
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # кандидат ждёт ответа в чате
+    BACKGROUND = 1  # пересчёт рейтингов, отчёты
+
+
+def estimate_tokens(*texts: str) -> int:
+    """
+    Грубая оценка токенов промпта без токенайзера: для смеси
+    кириллицы и латиницы у gpt-4o выходит ~3 символа на токен.
+    """
+    return sum(len(t) for t in texts) // 3 + 10 * len(texts)
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount  # может уйти в минус после сверки с usage
+
+    def give(self, amount: float) -> None:
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+    def drain(self) -> None:
+        self._refill()
+        self.level = min(self.level, 0.0)
+
+
+class Reservation:
+    __slots__ = ("_scheduler", "tokens")
+
+    def __init__(self, scheduler: OpenAIScheduler, tokens: int) -> None:
+        self._scheduler = scheduler
+        self.tokens = tokens
+
+    def reconcile(self, usage: Any) -> None:
+        """Поправить TPM-бакет по фактическому ``usage`` из ответа."""
+        actual = getattr(usage, "total_tokens", None)
+        if actual is None:
+            return
+        diff = actual - self.tokens
+        if diff > 0:
+            self._scheduler.tpm.take(diff)
+        elif diff < 0:
+            self._scheduler.tpm.give(-diff)
+        self._scheduler.tokens_used += actual
+        self.tokens = actual
+
+
+class OpenAIScheduler:
+    """
+    Общий планировщик запросов к OpenAI: бакеты RPM и TPM,
+    строгий приоритет кандидатских запросов над фоновыми.
+    """
+
+    def __init__(self, *, rpm: int, tpm: int, attempts: int = 3) -> None:
+        self.rpm = TokenBucket(rpm)
+        self.tpm = TokenBucket(tpm)
+        self.attempts = attempts
+
+        self._waiters: list[tuple[int, int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._paused_until = 0.0
+
+        self.tokens_used = 0
+        self.rate_limited = 0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    # ─────────────── резервирование ───────────────
+    async def acquire(self, tokens: int, priority: Priority) -> Reservation:
+        tokens = min(tokens, int(self.tpm.capacity))
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), tokens, fut))
+        self._dispatch()
+        await fut
+        return Reservation(self, tokens)
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiters:
+            _, _, tokens, fut = self._waiters[0]
+            if fut.done():  # запрос отменили, пока ждал
+                heapq.heappop(self._waiters)
+                continue
+
+            wait = max(
+                self._paused_until - time.monotonic(),
+                self.rpm.wait_time(1),
+                self.tpm.wait_time(tokens),
+            )
+            if wait > 0:
+                # голова очереди ждёт — остальные тоже (строгий приоритет)
+                loop = asyncio.get_running_loop()
+                self._timer = loop.call_later(wait, self._dispatch)
+                return
+
+            heapq.heappop(self._waiters)
+            self.rpm.take(1)
+            self.tpm.take(tokens)
+            fut.set_result(None)
+
+    def penalize(self, retry_after: float) -> None:
+        """OpenAI ответил 429: опустошаем бакеты и ставим паузу."""
+        self.rate_limited += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        self.rpm.drain()
+        self.tpm.drain()
+        self._dispatch()
+
+    # ─────────────── выполнение ───────────────
+    async def run(
+        self,
+        request: Callable[[], Awaitable[T]],
+        *,
+        tokens: int,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> T:
+        """
+        Выполнить запрос в пределах лимитов. 429 и сетевые сбои
+        повторяются здесь же, через планировщик, а не вслепую в SDK.
+        """
+        # SDK не тянем при импорте бота — только к первому запросу
+        from openai import APIConnectionError, InternalServerError, RateLimitError
+
+        for attempt in range(1, self.attempts + 1):
+            reservation = await self.acquire(tokens, priority)
+            try:
+                with openai_seconds.time():
+                    response = await request()
+            except RateLimitError as exc:
+                openai_requests.inc(outcome="rate_limited")
+                self.penalize(_retry_after(exc, attempt))
+                if attempt == self.attempts:
+                    raise
+                log.warning("openai 429, retry %d/%d", attempt, self.attempts)
+            except (APIConnectionError, InternalServerError):
+                openai_requests.inc(outcome="error")
+                if attempt == self.attempts:
+                    raise
+                await asyncio.sleep(2**attempt)
+            except Exception:
+                openai_requests.inc(outcome="error")
+                raise
+            else:
+                openai_requests.inc(outcome="ok")
+                usage = getattr(response, "usage", None)
+                reservation.reconcile(usage)
+                record_usage(usage)
+                return response
+        raise AssertionError("unreachable")
+
+
+def _retry_after(exc: RateLimitError, attempt: int) -> float:
+    try:
+        return float(exc.response.headers.get("retry-after", ""))
+    except (AttributeError, ValueError):
+        return float(2**attempt)
+
+
+openai_scheduler = OpenAIScheduler(rpm=setup.openai_rpm, tpm=setup.openai_tpm)
@@ -0,0 +1,232 @@
+"""
+Локальный предфильтр резюме перед LLM: структурные проверки + BM25
+по тексту вакансии (description, requirements, duties).
+
+IDF считается по каталогу активных вакансий: слова, которые есть почти
+в каждой вакансии («опыт», «работа»), почти ничего не весят.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import re
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+
+from services import VacancyService
+from services.errors import InvalidResumeError
+from services.read_models import VacancyCard
+from services.vacancy_service import CatalogSnapshot
+from settings.config import setup
+
+log = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-zа-яё][a-zа-яё0-9+#]*", re.I)
+_URL = re.compile(r"(https?://|www\.)\S+|\S+@\S+", re.I)
+_STEM = 6  # грубый стемминг: обрезаем слово до 6 символов
+
+# BM25
+K1 = 1.2
+B = 0.75
+AVG_RESUME_TOKENS = 400.0
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        t[:_STEM]
+        for t in (m.group(0).lower() for m in _TOKEN.finditer(text or ""))
+        if len(t) > 1
+    ]
+
+
+def vacancy_text(v: VacancyCard) -> str:
+    return "\n".join(
+        part for part in (v.title, v.description, v.requirements, v.duties) if part
+    )
+
+
+def validate_resume(text: str) -> None:
+    """Структурные проверки; ``InvalidResumeError`` — не похоже на резюме."""
+    stripped = (text or "").strip()
+    if len(stripped) < setup.prefilter_min_chars:
+        raise InvalidResumeError("Слишком мало текста — похоже, это не резюме.")
+
+    without_links = _URL.sub(" ", stripped)
+    letters = sum(ch.isalpha() for ch in without_links)
+    if letters < setup.prefilter_min_chars // 2:
+        raise InvalidResumeError("Файл содержит только ссылки или контакты.")
+    if letters / len(stripped) < 0.3:
+        raise InvalidResumeError("Не удалось распознать текст резюме.")
+
+
+@dataclass(frozen=True)
+class Verdict:
+    score: float  # 0..1 — доля «веса» вакансии, найденная в резюме
+    passed: bool
+
+
+class LexicalPrefilter:
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self._snapshot: CatalogSnapshot | None = None
+        self._df: Dict[str, int] = {}
+        self._n_docs = 0
+
+    def _refresh(self, snap: CatalogSnapshot) -> None:
+        if snap is self._snapshot:
+            return
+        df: Counter[str] = Counter()
+        for v in snap.vacancies:
+            df.update(set(tokenize(vacancy_text(v))))
+        self._df = dict(df)
+        self._n_docs = len(snap.vacancies)
+        self._snapshot = snap
+
+    def _idf(self, terms: Sequence[str]) -> np.ndarray:
+        n = self._n_docs
+        df = np.fromiter((self._df.get(t, 0) for t in terms), dtype=np.float64)
+        return np.log1p((n - df + 0.5) / (df + 0.5))
+
+    def score(self, resume: str, vacancy: str) -> float:
+        q_terms = np.unique(np.asarray(tokenize(vacancy), dtype=str))
+        r_tokens = np.asarray(tokenize(resume), dtype=str)
+        if q_terms.size == 0 or r_tokens.size == 0:
+            return 0.0
+
+        # частоты терминов вакансии в резюме — одним проходом через unique/searchsorted
+        r_terms, r_counts = np.unique(r_tokens, return_counts=True)
+        pos = np.searchsorted(r_terms, q_terms)
+        pos_c = np.minimum(pos, r_terms.size - 1)
+        found = r_terms[pos_c] == q_terms
+        tf = np.where(found, r_counts[pos_c], 0).astype(np.float64)
+
+        idf = self._idf(q_terms.tolist())
+        norm = K1 * (1 - B + B * r_tokens.size / AVG_RESUME_TOKENS)
+        sat = tf * (K1 + 1) / (tf + norm)
+        best = idf.sum() * (K1 + 1)
+        return float((idf * sat).sum() / best) if best > 0 else 0.0
+
+    async def check(self, resume: str, vacancy: VacancyCard) -> Verdict:
+        validate_resume(resume)
+        self._refresh(await VacancyService.snapshot())
+        score = self.score(resume, vacancy_text(vacancy))
+        return Verdict(score=score, passed=score >= self.threshold)
+
+
+class PrefilterStats:
+    """
+    Согласие предфильтра с LLM по последним N резюме: (score, rating, вес).
+
+    Прошедшие фильтр резюме попадают сюда после обычного анализа. Из
+    отклонённых доля ``audit_rate`` всё равно уходит в модель — в фоне,
+    с приоритетом BACKGROUND, — и учитывается с весом ``1 / audit_rate``.
+    Без этой выборки «согласие» при пороге > 0 было бы просто долей
+    прошедших LLM и ничего не говорило о ложных отказах.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: int = 1000,
+        llm_pass: float = 40.0,
+        audit_rate: float = 0.0,
+        max_audits: int = 4,
+    ) -> None:
+        self.llm_pass = llm_pass
+        self.audit_rate = audit_rate
+        self.max_audits = max_audits  # одновременных фоновых проверок
+        self._pairs: Deque[Tuple[float, float, float]] = deque(maxlen=window)
+        self._audits: Set[asyncio.Task] = set()
+        self.rejected = 0
+        self.invalid = 0
+        self.audited = 0
+
+    def record(self, score: float, rating: float, weight: float = 1.0) -> None:
+        self._pairs.append((score, rating, weight))
+        if len(self._pairs) % 100 == 0:
+            log.info("prefilter: %s", self.stats())
+
+    def audit(
+        self, score: float, analyse: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> bool:
+        """Отклонённое резюме: с вероятностью ``audit_rate`` проверить моделью."""
+        if (
+            self.audit_rate <= 0
+            or len(self._audits) >= self.max_audits
+            or random.random() >= self.audit_rate
+        ):
+            return False
+        task = asyncio.create_task(self._audit(score, analyse))
+        self._audits.add(task)
+        task.add_done_callback(self._audits.discard)
+        return True
+
+    async def _audit(
+        self, score: float, analyse: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> None:
+        try:
+            result = await analyse()
+        except Exception:
+            log.warning("prefilter audit failed", exc_info=True)
+            return
+        self.audited += 1
+        self.record(score, float(result.get("rating", 0)), 1 / self.audit_rate)
+
+    async def shutdown(self) -> None:
+        for task in self._audits:
+            task.cancel()
+        await asyncio.gather(*self._audits, return_exceptions=True)
+
+    def _weighted(self) -> np.ndarray:
+        return np.asarray(self._pairs, dtype=np.float64).reshape(-1, 3)
+
+    def agreement(self, threshold: float) -> float:
+        pairs = self._weighted()
+        if not pairs.size:
+            return 0.0
+        pre = pairs[:, 0] >= threshold
+        llm = pairs[:, 1] >= self.llm_pass
+        return float(np.average(pre == llm, weights=pairs[:, 2]))
+
+    def false_reject_rate(self, threshold: float) -> float:
+        """Доля отклонённых порогом, которые LLM пропустила бы."""
+        pairs = self._weighted()
+        rejected = pairs[pairs[:, 0] < threshold]
+        if not rejected.size:
+            return 0.0
+        llm = rejected[:, 1] >= self.llm_pass
+        return float(np.average(llm, weights=rejected[:, 2]))
+
+    def sweep(self, thresholds: Iterable[float]) -> Dict[float, float]:
+        """Согласие для набора порогов — для подбора ``prefilter_threshold``."""
+        return {t: self.agreement(t) for t in thresholds}
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "samples": len(self._pairs),
+            "rejected": self.rejected,
+            "invalid": self.invalid,
+            "audited": self.audited,
+            "agreement": self.agreement(prefilter.threshold),
+            "false_reject_rate": self.false_reject_rate(prefilter.threshold),
+        }
+
+
+prefilter = LexicalPrefilter(threshold=setup.prefilter_threshold)
+prefilter_stats = PrefilterStats(audit_rate=setup.prefilter_audit_rate)
@@ -0,0 +1,145 @@
+"""
+Версионированные промпты.
+
+Порядок частей рассчитан на prompt caching OpenAI (кэшируется общий префикс
+от 1024 токенов): неизменные инструкции → вакансия → резюме. Все кандидаты
+одной вакансии получают побайтно одинаковый префикс, меняется только хвост.
+Любая правка текста — новая версия: от неё зависят ключи кэша анализов.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from settings.config import setup
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    version: str
+    system: str
+    vacancy_block: str  # формат с {vacancy}
+    resume_block: str  # формат с {resume}
+
+    @property
+    def id(self) -> str:
+        return f"{self.name}/v{self.version}"
+
+    def messages(self, *, vacancy: str, resume: str) -> list[dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system},
+            {
+                "role": "user",
+                "content": self.vacancy_block.format(vacancy=vacancy)
+                + self.resume_block.format(resume=resume),
+            },
+        ]
+
+
+ANALYSIS = PromptTemplate(
+    name="analysis",
+    version="2",
+    system="""\
+Ты – опытный IT-HR. Проанализируй резюме и сравни его с вакансией и верни JSON строго этого формата:
+{
+  "rating": 0-100,                       # целое число, рейтинг общего соответствия резюме и вакансии
+  "strong": "ключевые сильные стороны кандидата",
+  "weak": "главные слабые стороны кандидата",
+  "matched_experience": "что из опыта соответствует роли",
+  "missing_experience": "что из опыта не соответствует роли",
+  "water": "есть ли лишняя 'вода' в резюме (коротко)",
+  "mismatches": "несоответствия",
+  "suspicious": "подозрительные моменты",
+  "interview_questions": ["вопрос 1", "вопрос 2", "вопрос 3"],
+  "interview_tips": "конкретные рекомендации к собеседованию (указать конкретные вопросы, которые стоит подготовить, вопросов дожно быть 6, минимум 35 слов )  (≤500 симв.)"
+}
+
+Вакансия и резюме идут в следующем сообщении.""",
+    vacancy_block="Вакансия:\n{vacancy}\n\n",
+    resume_block="Резюме:\n{resume}",
+)
+
+SCORE = PromptTemplate(
+    name="score",
+    version="2",
+    system=(
+        "Ты — HR-бот. Нужно оценить, насколько резюме подходит под вакансию.\n\n"
+        "Сначала оцени соответствие в процентах (0-100), затем одним словом тег "
+        "из списка: Junior, Middle, Senior, Lead. Верни JSON: "
+        '{"rating": 85, "tag": "Middle"}.'
+    ),
+    vacancy_block="=== ВАКАНСИЯ ===\n{vacancy}\n\n",
+    resume_block="=== РЕЗЮМЕ КАНДИДАТА ===\n{resume}",
+)
+
+
+def vacancy_key(vacancy: str) -> str:
+    """Короткий стабильный ключ вакансии для статистики."""
+    return hashlib.sha1(vacancy.encode("utf-8")).hexdigest()[:12]
+
+
+class PrefixCacheStats:
+    """
+    Сколько токенов промпта пришло из кэша OpenAI — по каждой вакансии.
+    Держим ``max_keys`` недавних вакансий (LRU): ключ — хэш текста, и
+    каждая правка вакансии порождает новый. Общие суммы не теряются
+    при вытеснении.
+    """
+
+    def __init__(self, *, max_keys: int) -> None:
+        self.max_keys = max_keys
+        # ключ вакансии → [вызовы, токены промпта, из кэша]
+        self._by_key: OrderedDict[str, list[int]] = OrderedDict()
+        self._total = [0, 0, 0]
+
+    def record(self, key: str, usage: Any) -> int:
+        """Учесть ``usage`` ответа; вернуть число закэшированных токенов."""
+        prompt = getattr(usage, "prompt_tokens", None) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or 0
+
+        row = self._by_key.get(key)
+        if row is None:
+            row = self._by_key[key] = [0, 0, 0]
+            if len(self._by_key) > self.max_keys:
+                self._by_key.popitem(last=False)
+        self._by_key.move_to_end(key)
+        for acc in (row, self._total):
+            acc[0] += 1
+            acc[1] += prompt
+            acc[2] += cached
+        return cached
+
+    @staticmethod
+    def _rate(row: list[int]) -> float:
+        return row[2] / row[1] if row[1] else 0.0
+
+    def hit_rate(self, key: str | None = None) -> float:
+        if key is None:
+            return self._rate(self._total)
+        row = self._by_key.get(key)
+        return self._rate(row) if row else 0.0
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {
+            k: {
+                "calls": row[0],
+                "prompt_tokens": row[1],
+                "cached_tokens": row[2],
+                "hit_rate": self._rate(row),
+            }
+            for k, row in self._by_key.items()
+        }
+
+    def by_vacancy(self) -> Dict[str, Dict[str, float]]:
+        """Поле → {ключ вакансии: значение} — для меток в /metrics."""
+        snap = self.snapshot()
+        fields = ("calls", "prompt_tokens", "cached_tokens", "hit_rate")
+        return {f: {k: row[f] for k, row in snap.items()} for f in fields}
+
+
+prefix_cache_stats = PrefixCacheStats(max_keys=setup.prefix_stats_vacancies)
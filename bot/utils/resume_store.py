@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from aiogram import Bot
+from aiogram.types import Document
+
+from bot.utils.resume_tools import extract_text_async
+from services.resume_file_service import ResumeFileService
+from settings.config import setup
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredResume:
+    id: int
+    path: Path
+    sha256: str
+    text: str | None  # None — файл ещё не распарсен
+    reused: bool  # True — файл уже был в хранилище, скачивание пропущено
+
+
+def _store_path(sha256: str, ext: str) -> Path:
+    # content-addressed: data/resumes/files/ab/abcdef….pdf
+    return Path(setup.data_dir) / "files" / sha256[:2] / f"{sha256}{ext}"
+
+
+def _write_once(path: Path, data: bytes) -> None:
+    if path.exists():
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+async def fetch_resume(bot: Bot, doc: Document) -> StoredResume:
+    """
+    Получить файл резюме. Уже виденный ``file_unique_id`` или тот же
+    sha256 не скачивается и не пишется на диск повторно.
+    """
+    rec = await ResumeFileService.by_unique_id(doc.file_unique_id)
+    if rec is not None and Path(rec.path).exists():
+        return StoredResume(rec.id, Path(rec.path), rec.sha256, rec.text, True)
+
+    tg_file = await bot.get_file(doc.file_id)
+    buf = await bot.download_file(tg_file.file_path)
+    data = buf.getvalue()
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    rec = await ResumeFileService.by_sha256(sha256)
+    if rec is not None and Path(rec.path).exists():
+        await ResumeFileService.link(doc.file_unique_id, rec.id)
+        return StoredResume(rec.id, Path(rec.path), sha256, rec.text, True)
+
+    # запись есть, а файл с диска пропал — восстанавливаем по старому пути
+    ext = Path(doc.file_name or "").suffix.lower()
+    path = Path(rec.path) if rec is not None else _store_path(sha256, ext)
+    await asyncio.to_thread(_write_once, path, data)
+
+    if rec is None:
+        rec = await ResumeFileService.add(sha256=sha256, path=str(path), size=len(data))
+    await ResumeFileService.link(doc.file_unique_id, rec.id)
+    return StoredResume(rec.id, Path(rec.path), sha256, rec.text, False)
+
+
+async def resume_text(stored: StoredResume) -> str:
+    """Текст резюме: из индекса, а при первом обращении — парсинг и запись."""
+    if stored.text is not None:
+        return stored.text
+
+    text = await extract_text_async(stored.path)
+    await ResumeFileService.set_text(stored.id, text)
+    stored.text = text
+    return text
@@ -1,73 +1,100 @@
 from __future__ import annotations
 
 import json
+import logging
 import re
 from pathlib import Path
 from typing import Any
 
-from docx import Document
-from openai import AsyncOpenAI, OpenAIError
-from pdfminer.high_level import extract_text as pdf_text
-
+from bot.utils.analysis_cache import analysis_cache, make_key
+from bot.utils.extract_pool import extraction_pool
+from bot.utils.extractors import ExtractedText, extract
+from bot.utils.openai_client import openai_client
+from bot.utils.openai_scheduler import (
+    COMPLETION_RESERVE,
+    Priority,
+    estimate_tokens,
+    openai_scheduler,
+)
+from bot.utils.prompts import ANALYSIS, prefix_cache_stats, vacancy_key
 from settings.config import setup
 
-openai_client = AsyncOpenAI(api_key=setup.openai_api_key, timeout=60)
+log = logging.getLogger(__name__)
+
 ALLOWED_EXT = {".txt", ".pdf", ".doc", ".docx"}
 
-PROMPT_TEMPLATE = """
-Ты – опытный IT-HR. Проанализируй резюме и сравни его с вакансией и верни JSON строго этого формата:
-{{
-  "rating": 0-100,                       # целое число, рейтинг общего соответствия резюме и вакансии
-  "strong": "ключевые сильные стороны кандидата",
-  "weak": "главные слабые стороны кандидата",
-  "matched_experience": "что из опыта соответствует роли",
-  "missing_experience": "что из опыта не соответствует роли",
-  "water": "есть ли лишняя 'вода' в резюме (коротко)",
-  "mismatches": "несоответствия",
-  "suspicious": "подозрительные моменты",
-  "interview_questions": ["вопрос 1", "вопрос 2", "вопрос 3"],
-  "interview_tips": "конкретные рекомендации к собеседованию (указать конкретные вопросы, которые стоит подготовить, вопросов дожно быть 6, минимум 35 слов )  (≤500 симв.)"
-}}
-
-Вакансия:
-{vacancy}
-
-Резюме:
-{resume}
-"""
+MODEL = "gpt-4o-mini"
+PROMPT_TEMPLATE = ANALYSIS
+PROMPT_VERSION = PROMPT_TEMPLATE.id  # входит в ключ кэша анализов
 
 
-def extract_text(file_path: str | Path) -> str:
+def extract_resume(file_path: str | Path) -> ExtractedText:
+    """Текст резюме в пределах ``setup.extract_max_chars`` + отчёт об усечении."""
     p = Path(file_path)
     if p.suffix.lower() not in ALLOWED_EXT:
         raise ValueError("Неподдерживаемый тип файла")
+    return extract(p, setup.extract_max_chars)
 
-    match p.suffix.lower():
-        case ".txt":
-            return p.read_text(encoding="utf-8", errors="ignore")
-        case ".pdf":
-            return pdf_text(str(p))
-        case ".doc" | ".docx":
-            doc = Document(str(p))
-            return "\n".join(par.text for par in doc.paragraphs)
-        case _:
-            return ""
 
+def extract_text(file_path: str | Path) -> str:
+    return extract_resume(file_path).text
 
-async def analyse_resume(text: str, vacancy: str) -> dict[str, Any]:
-    prompt = PROMPT_TEMPLATE.format(vacancy=vacancy, resume=text)
 
-    try:
-        response = await openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.3,
-            response_format={"type": "json_object"},
-            messages=[{"role": "user", "content": prompt}],
+async def extract_text_async(file_path: str | Path) -> str:
+    """То же, что ``extract_text``, но в пуле процессов."""
+    p = Path(file_path)
+    if p.suffix.lower() not in ALLOWED_EXT:
+        raise ValueError("Неподдерживаемый тип файла")
+    if p.stat().st_size > extraction_pool.max_bytes:
+        raise ValueError(f"Файл больше {extraction_pool.max_bytes // (1024 * 1024)} МБ")
+
+    res = await extraction_pool.run(extract_resume, str(p))
+    if res.truncated or res.has_skipped:
+        log.info(
+            "%s: %d chars, read %d/%s units, skipped %d, not parsed %s",
+            p.name,
+            len(res.text),
+            res.units_read,
+            res.units_total if res.units_total is not None else "?",
+            res.skipped,
+            res.units_left if res.units_left is not None else "?",
         )
-        raw = response.choices[0].message.content
-    except OpenAIError as exc:
-        raise RuntimeError(f"OpenAI error: {exc}")
+    return res.text
+
+
+async def cached_analysis(text: str, vacancy: str) -> dict[str, Any] | None:
+    """Готовый анализ из кэша без запроса к OpenAI (или None)."""
+    key = make_key(text, vacancy, prompt_version=PROMPT_VERSION, model=MODEL)
+    return await analysis_cache.get(key)
+
 
+async def analyse_resume(
+    text: str,
+    vacancy: str,
+    *,
+    priority: Priority = Priority.INTERACTIVE,
+    lookup: bool = True,
+) -> dict[str, Any]:
+    """``lookup=False`` — кэш уже проверен ``cached_analysis``."""
+    key = make_key(text, vacancy, prompt_version=PROMPT_VERSION, model=MODEL)
+    return await analysis_cache.get_or_compute(
+        key, lambda: _request_analysis(text, vacancy, priority), lookup=lookup
+    )
+
+
+def request_body(text: str, vacancy: str) -> dict[str, Any]:
+    """Тело chat.completions-запроса — общее для онлайн-анализа и Batch API."""
+    return {
+        "model": MODEL,
+        "temperature": 0.3,
+        "response_format": {"type": "json_object"},
+        "messages": PROMPT_TEMPLATE.messages(vacancy=vacancy, resume=text),
+    }
+
+
+def parse_analysis(raw: str | None) -> dict[str, Any]:
+    """JSON анализа из ответа модели (с запасным поиском ``{...}`` в тексте)."""
+    raw = raw or ""
     try:
         return json.loads(raw)
     except json.JSONDecodeError:
@@ -78,3 +105,27 @@ async def analyse_resume(text: str, vacancy: str) -> dict[str, Any]:
             except json.JSONDecodeError:
                 pass
         raise ValueError(f"Не удалось разобрать JSON из ответа OpenAI:\n{raw[:400]}...")
+
+
+async def _request_analysis(
+    text: str, vacancy: str, priority: Priority
+) -> dict[str, Any]:
+    from openai import OpenAIError  # SDK уже загружен клиентом
+
+    body = request_body(text, vacancy)
+
+    try:
+        response = await openai_scheduler.run(
+            lambda: openai_client().chat.completions.create(**body),
+            tokens=estimate_tokens(*(m["content"] for m in body["messages"]))
+            + COMPLETION_RESERVE,
+            priority=priority,
+        )
+        raw = response.choices[0].message.content
+    except OpenAIError as exc:
+        raise RuntimeError(f"OpenAI error: {exc}")
+
+    cached = prefix_cache_stats.record(vacancy_key(vacancy), response.usage)
+    log.debug("analysis: %s cached prompt tokens", cached)
+
+    return parse_analysis(raw)
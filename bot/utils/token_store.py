@@ -0,0 +1,141 @@
+"""
+Одноразовые токены для callback-кнопок («📋 Получить советы»).
+
+Локально — ограниченный LRU с TTL. Если подключено общее хранилище FSM
+(postgres/redis), токен пишется и туда: кнопку может обработать любой
+процесс бота, а не только тот, что выдал токен.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict
+
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from bot.utils.fsm_storage import pop_data
+from settings.config import setup
+
+log = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "shared")
+
+    def __init__(self, value: str, expires_at: float) -> None:
+        self.value = value
+        self.expires_at = expires_at
+        self.shared = False  # запись в общее хранилище удалась
+
+
+class TokenStore:
+    def __init__(self, *, namespace: str, max_items: int, ttl: float) -> None:
+        self.namespace = namespace
+        self.max_items = max_items
+        self.ttl = ttl
+        self._items: OrderedDict[str, _Entry] = OrderedDict()
+        self._shared: BaseStorage | None = None
+
+        self.evictions = 0
+        self.expired = 0
+        self.shared_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def attach(self, storage: BaseStorage) -> None:
+        """Подключить общее хранилище; MemoryStorage ничего не добавляет."""
+        self._shared = None if isinstance(storage, MemoryStorage) else storage
+
+    def _key(self, token: str, bot_id: int, user_id: int) -> StorageKey:
+        return StorageKey(
+            bot_id=bot_id,
+            chat_id=user_id,
+            user_id=user_id,
+            destiny=f"{self.namespace}:{token}",
+        )
+
+    # ─────────────── память ───────────────
+    def _evict(self, now: float) -> None:
+        # сначала просроченные с головы, потом самые старые сверх лимита
+        while self._items:
+            token, entry = next(iter(self._items.items()))
+            if entry.expires_at > now:
+                break
+            del self._items[token]
+            self.expired += 1
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def _local_pop(self, token: str) -> _Entry | None:
+        entry = self._items.pop(token, None)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self.expired += 1
+            return None
+        return entry
+
+    # ─────────────── API ───────────────
+    async def put(self, value: str, *, bot_id: int, user_id: int) -> str:
+        token = uuid.uuid4().hex
+        now = time.time()
+        expires_at = now + self.ttl
+        entry = self._items[token] = _Entry(value, expires_at)
+        self._evict(now)
+
+        if self._shared is not None:
+            try:
+                await self._shared.set_data(
+                    self._key(token, bot_id, user_id),
+                    {"v": value, "exp": expires_at},
+                )
+                entry.shared = True
+            except Exception:
+                log.warning("token store: shared write failed", exc_info=True)
+        return token
+
+    async def pop(self, token: str, *, bot_id: int, user_id: int) -> str | None:
+        """Забрать значение токена; повторный вызов вернёт None."""
+        entry = self._local_pop(token)
+        local = entry.value if entry is not None else None
+        if self._shared is None:
+            return local
+
+        # забираем из обоих хранилищ: локальная запись уже снята выше
+        key = self._key(token, bot_id, user_id)
+        try:
+            data = await pop_data(self._shared, key)
+        except Exception:
+            log.warning("token store: shared read failed", exc_info=True)
+            return local
+
+        if not data:
+            # записи нет: если она туда попадала — токен забрал другой процесс,
+            # иначе (запись не удалась) отвечаем из памяти
+            return local if entry is not None and not entry.shared else None
+        if data.get("exp", 0) <= time.time():
+            return None
+        if entry is None:
+            self.shared_hits += 1
+        return data.get("v")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._items),
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "shared_hits": self.shared_hits,
+        }
+
+
+tips_store = TokenStore(
+    namespace="tips",
+    max_items=setup.tips_store_size,
+    ttl=setup.tips_ttl,
+)
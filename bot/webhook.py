@@ -0,0 +1,136 @@
+"""
+Webhook-режим: aiohttp-сервер на ``webhook_port`` в ``webhook_workers``
+процессах (SO_REUSEPORT — ядро раскидывает соединения между ними).
+
+    WEBHOOK_URL=https://bot.example.com WEBHOOK_SECRET=... python main.py
+
+Родитель один раз регистрирует вебхук в Telegram и запускает воркеров;
+каждый воркер собирает свой Bot/Dispatcher. ``/healthz`` — для балансировщика.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import secrets
+from typing import Callable
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from settings.config import setup
+
+log = logging.getLogger(__name__)
+
+BotFactory = Callable[[], Bot]
+DispatcherFactory = Callable[[], Dispatcher]
+
+
+async def healthz(request: web.Request) -> web.Response:
+    dp: Dispatcher = request.app["dispatcher"]
+    limiter = dp.get("concurrency")
+    return web.json_response(
+        {
+            "status": "ok",
+            "pid": os.getpid(),
+            "updates": limiter.stats() if limiter else None,
+        }
+    )
+
+
+def build_app(dp: Dispatcher, bot: Bot, *, secret: str | None) -> web.Application:
+    app = web.Application()
+    app["dispatcher"] = dp
+    app.router.add_get("/healthz", healthz)
+
+    # handle_in_background: Telegram сразу получает 200, апдейт
+    # обрабатывается задачей (число одновременных — ConcurrencyLimitMiddleware)
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=secret,
+        handle_in_background=True,
+    ).register(app, path=setup.webhook_path)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+def _run_app(dp: Dispatcher, bot: Bot, secret: str) -> None:
+    web.run_app(
+        build_app(dp, bot, secret=secret),
+        host=setup.webhook_host,
+        port=setup.webhook_port,
+        reuse_port=setup.webhook_workers > 1,
+        print=None,
+    )
+
+
+def _run_worker(
+    create_bot: BotFactory,
+    build_dispatcher: DispatcherFactory,
+    secret: str,
+    index: int,
+) -> None:
+    logging.basicConfig(level=logging.INFO)
+    dp = build_dispatcher()
+    dp["worker_index"] = index  # свой порт метрик у каждого воркера
+    _run_app(dp, create_bot(), secret)
+
+
+async def _register(bot: Bot, dp: Dispatcher, secret: str) -> None:
+    async with bot:  # сессия привязана к этому event loop — закрываем
+        await bot.set_webhook(
+            url=setup.webhook_url.rstrip("/") + setup.webhook_path,
+            secret_token=secret,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+
+
+def serve(create_bot: BotFactory, build_dispatcher: DispatcherFactory) -> None:
+    workers = setup.webhook_workers
+    if workers > 1 and setup.fsm_storage == "memory":
+        raise RuntimeError(
+            "webhook_workers > 1 требует общего хранилища FSM "
+            "(fsm_storage=postgres или redis)"
+        )
+
+    secret = setup.webhook_secret or secrets.token_urlsafe(32)
+    dp, bot = build_dispatcher(), create_bot()
+    asyncio.run(_register(bot, dp, secret))
+    log.info(
+        "webhook: %s:%s%s, %d worker(s)",
+        setup.webhook_host,
+        setup.webhook_port,
+        setup.webhook_path,
+        workers,
+    )
+
+    if workers == 1:
+        _run_app(dp, bot, secret)
+        return
+
+    ctx = mp.get_context("spawn")
+    procs = [
+        ctx.Process(
+            target=_run_worker,
+            args=(create_bot, build_dispatcher, secret, i),
+            name=f"bot-worker-{i}",
+        )
+        for i in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        for p in procs:
+            p.join()
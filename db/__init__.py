@@ -1,2 +1,11 @@
-from db.models import Company, CompanyMember, Vacancy
+from db.models import (
+    AnalysisCacheEntry,
+    Application,
+    Company,
+    CompanyMember,
+    FsmRecord,
+    ResumeFile,
+    ResumeFileAlias,
+    Vacancy,
+)
 from db.connection import Base
@@ -0,0 +1,63 @@
+"""
+Конструкции SQL, которые пишутся по-разному в Postgres (прод) и SQLite
+(тесты, ``tools.bench``).
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import JSON
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+from db.connection import engine
+
+
+def insert(table: Any) -> Any:
+    """
+    ``INSERT`` с ``on_conflict_do_update`` / ``on_conflict_do_nothing``
+    под диалект текущего движка.
+    """
+    if engine.dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+
+class json_merge(FunctionElement):
+    """
+    Слияние JSON-объектов верхнего уровня: ``a || b`` для JSONB,
+    ``json_patch(a, b)`` в SQLite.
+    """
+
+    type = JSON()
+    inherit_cache = True
+
+
+@compiles(json_merge)
+def _json_merge(element: json_merge, compiler: Any, **kw: Any) -> str:
+    left, right = element.clauses
+    return f"({compiler.process(left, **kw)} || {compiler.process(right, **kw)})"
+
+
+@compiles(json_merge, "sqlite")
+def _json_merge_sqlite(element: json_merge, compiler: Any, **kw: Any) -> str:
+    return f"json_patch({compiler.process(element.clauses, **kw)})"
+
+
+class empty_json(FunctionElement):
+    """Пустой JSON-объект: ``'{}'::jsonb`` / ``'{}'``."""
+
+    type = JSON()
+    inherit_cache = True
+
+
+@compiles(empty_json)
+def _empty_json(element: empty_json, compiler: Any, **kw: Any) -> str:
+    return "'{}'::jsonb"
+
+
+@compiles(empty_json, "sqlite")
+def _empty_json_sqlite(element: empty_json, compiler: Any, **kw: Any) -> str:
+    return "'{}'"
@@ -8,9 +8,14 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    JSON,
+    SmallInteger,
     String,
+    Text,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
 from db.connection import Base
@@ -32,8 +37,10 @@ class Company(Base):
         nullable=False,
     )
 
-    vacancies = relationship("Vacancy", back_populates="company", lazy="selectin")
-    members = relationship("CompanyMember", back_populates="company", lazy="selectin")
+    # связи не грузятся неявно: нужное подключается в запросе
+    # (selectinload / joinedload), списки и меню читают колонки напрямую
+    vacancies = relationship("Vacancy", back_populates="company", lazy="raise")
+    members = relationship("CompanyMember", back_populates="company", lazy="raise")
 
 
 #  вакансии
@@ -43,7 +50,9 @@ class Vacancy(Base):  # type: ignore[misc]
     __tablename__ = "vacancies"
 
     id: int = Column(Integer, primary_key=True)
-    company_id: int = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    company_id: int = Column(
+        Integer, ForeignKey("companies.id"), nullable=False, index=True
+    )
     title: str = Column(String(255), nullable=False)
 
     description: str = Column(String, default="")
@@ -52,7 +61,17 @@ class Vacancy(Base):  # type: ignore[misc]
     conditions: str = Column(String, default="")
     is_active: bool = Column(Boolean, default=True)
 
-    company = relationship("Company", back_populates="vacancies")
+    company = relationship("Company", back_populates="vacancies", lazy="raise")
+
+
+# список вакансий для кандидата: только активные, по компании и id
+# (сортировка по companies.title идёт уже после join)
+Index(
+    "ix_vacancies_active_company",
+    Vacancy.company_id,
+    Vacancy.id,
+    postgresql_where=Vacancy.is_active.is_(True),
+)
 
 
 #  сотрудники компании (HR-ы, владельцы…)
@@ -69,4 +88,105 @@ class CompanyMember(Base):
     user_id: int = Column(BigInteger, primary_key=True)  # Telegram-ID сотрудника
     role: str = Column(String(50), default="hr")  # 'hr', 'owner', …
 
-    company = relationship("Company", back_populates="members")
+    company = relationship("Company", back_populates="members", lazy="raise")
+
+
+#  кэш анализов резюме (ключ — sha256 резюме + вакансии + версии промпта + модели)
+
+
+class AnalysisCacheEntry(Base):
+    __tablename__ = "analysis_cache"
+
+    key: str = Column(String(64), primary_key=True)
+    result: dict = Column(JSON, nullable=False)
+    created_at: dt.datetime = Column(
+        DateTime,
+        default=dt.datetime.utcnow,
+        nullable=False,
+        index=True,
+    )
+
+
+#  загруженные файлы резюме (дедупликация по sha256 и file_unique_id)
+
+
+class ResumeFile(Base):
+    __tablename__ = "resume_files"
+
+    id: int = Column(Integer, primary_key=True)
+    sha256: str = Column(String(64), unique=True, nullable=False)
+    path: str = Column(String(512), nullable=False)
+    size: int = Column(Integer, nullable=False)
+    text: str | None = Column(Text, nullable=True)  # None — ещё не распарсен
+
+    created_at: dt.datetime = Column(
+        DateTime,
+        default=dt.datetime.utcnow,
+        nullable=False,
+    )
+
+
+class ResumeFileAlias(Base):
+    """Telegram file_unique_id → файл в хранилище."""
+
+    __tablename__ = "resume_file_aliases"
+
+    file_unique_id: str = Column(String(64), primary_key=True)
+    resume_file_id: int = Column(
+        Integer,
+        ForeignKey("resume_files.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+
+#  состояния FSM (общие для всех процессов бота)
+
+
+class FsmRecord(Base):
+    __tablename__ = "fsm_states"
+
+    # DefaultKeyBuilder: fsm:<bot_id>:<chat_id>:<user_id>:<destiny>
+    key: str = Column(String(255), primary_key=True)
+    state: str | None = Column(String(255), nullable=True)
+    data: dict | None = Column(
+        JSON().with_variant(JSONB(), "postgresql"), nullable=True
+    )
+    expires_at: dt.datetime = Column(DateTime, nullable=False, index=True)
+
+
+#  отклики кандидатов с результатом анализа
+
+
+class Application(Base):
+    __tablename__ = "applications"
+
+    id: int = Column(Integer, primary_key=True)
+    vacancy_id: int = Column(
+        Integer,
+        ForeignKey("vacancies.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    user_id: int = Column(BigInteger, nullable=False, index=True)  # Telegram-ID
+    username: str | None = Column(String(64), nullable=True)
+    resume_file_id: int | None = Column(
+        Integer,
+        ForeignKey("resume_files.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    rating: int = Column(SmallInteger, nullable=False)  # 0–100
+    result: dict = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+
+    created_at: dt.datetime = Column(
+        DateTime,
+        default=dt.datetime.utcnow,
+        nullable=False,
+    )
+
+
+# «лучшие кандидаты вакансии» — чтение индекса по порядку, без сортировки
+Index(
+    "ix_applications_vacancy_rating",
+    Application.vacancy_id,
+    Application.rating.desc(),
+    Application.created_at,
+)
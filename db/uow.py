@@ -0,0 +1,128 @@
+"""
+Unit of work: одна сессия (и одно соединение) на апдейт.
+
+    async with UnitOfWork():        # DbSessionMiddleware делает это сам
+        await CompanyService.create_company(...)
+        await commit()              # до «✅ создана»: подтверждаем сохранённое
+        await hr_main_kb(...)       # та же сессия и identity map
+
+Сервисы берут сессию через ``use_session``: переданную явно, текущую UoW
+или, вне UoW, свою собственную — как раньше.
+
+Перед каждым запросом к Telegram ``release_connection()`` коммитит открытую
+транзакцию UoW: соединение возвращается в пул и не ждёт сетевой ответ.
+Следующий запрос к БД в том же хендлере возьмёт соединение заново.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from typing import AsyncIterator, Callable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.connection import async_session
+
+_current: ContextVar[Optional["UnitOfWork"]] = ContextVar("uow", default=None)
+
+
+class UnitOfWork:
+    def __init__(self) -> None:
+        self.session: AsyncSession = async_session()
+        self._after_commit: List[Callable[[], None]] = []
+        self._token: Token | None = None
+        self._owner: asyncio.Task | None = None
+
+    @staticmethod
+    def current() -> Optional["UnitOfWork"]:
+        return _current.get()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        self._after_commit.append(callback)
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self._token = _current.set(self)
+        self._owner = asyncio.current_task()
+        return self
+
+    async def commit(self) -> None:
+        """Закоммитить сейчас; UoW остаётся открытой для следующих запросов."""
+        await self.session.commit()
+        self._run_after_commit()
+
+    def _run_after_commit(self) -> None:
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self._token)
+        try:
+            if exc_type is None:
+                await self.session.commit()
+            else:
+                await self.session.rollback()
+        finally:
+            await self.session.close()
+
+        if exc_type is None:
+            self._run_after_commit()
+
+
+@asynccontextmanager
+async def use_session(
+    session: AsyncSession | None = None,
+) -> AsyncIterator[AsyncSession]:
+    """
+    Сессия для одного вызова сервиса. Чужую (явную или UoW) только
+    flush'им — коммитит владелец; свою коммитим и закрываем.
+    """
+    if session is None:
+        uow = _current.get()
+        session = uow.session if uow is not None else None
+
+    if session is not None:
+        yield session
+        await session.flush()
+        return
+
+    async with async_session() as s:
+        yield s
+        await s.commit()
+
+
+async def commit() -> None:
+    """
+    Закоммитить текущую UoW до ответа пользователю: иначе «✅ создана»
+    уходит раньше коммита, и ошибка коммита остаётся незамеченной.
+    Вне UoW сервисы коммитят сами — ничего не делаем.
+    """
+    uow = _current.get()
+    if uow is not None:
+        await uow.commit()
+
+
+async def release_connection() -> None:
+    """
+    Закоммитить открытую транзакцию текущей UoW перед сетевым вызовом.
+    Задачи, запущенные из хендлера, наследуют UoW через контекст, но
+    сессией не владеют — для них ничего не делаем.
+    """
+    uow = _current.get()
+    if (
+        uow is not None
+        and uow._owner is asyncio.current_task()
+        and uow.session.in_transaction()
+    ):
+        await uow.commit()
+
+
+def on_commit(callback: Callable[[], None]) -> None:
+    """Выполнить после коммита текущей UoW (вне UoW — сразу)."""
+    uow = _current.get()
+    if uow is None:
+        callback()
+    else:
+        uow.after_commit(callback)
@@ -3,9 +3,27 @@ from __future__ import annotations
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.base import BaseSession
 from aiogram.enums import ParseMode
 
 from settings.config import setup
+from bot.middlewares import (
+    ConcurrencyLimitMiddleware,
+    DbSessionMiddleware,
+    HandlerTimingMiddleware,
+    ReleaseDbConnection,
+)
+from bot.utils import metrics
+from bot.utils.analysis_cache import analysis_cache
+from bot.utils.analysis_queue import analysis_queue
+from bot.utils.audit import audit_sink
+from bot.utils.extract_pool import extraction_pool
+from bot.utils.fsm_storage import create_isolation, create_storage
+from bot.utils.openai_client import close_openai_client
+from bot.utils.openai_scheduler import openai_scheduler
+from bot.utils.prefilter import prefilter_stats
+from bot.utils.prompts import prefix_cache_stats
+from bot.utils.token_store import tips_store
 from bot.handlers import (
     candidate,
     company_admin,
@@ -14,19 +32,123 @@ from bot.handlers import (
     noop,  # ← новый роутер-«заглушка»
 )
 
-bot = Bot(
-    token=setup.telegram_token,
-    default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-)
 
-dp = Dispatcher()
+def create_bot(session: BaseSession | None = None) -> Bot:
+    # session — подменная HTTP-сессия (tools.bench гоняет бота без Telegram)
+    bot = Bot(
+        token=setup.telegram_token,
+        session=session,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
+    # соединение с БД не держим, пока ждём ответа Telegram
+    bot.session.middleware(ReleaseDbConnection())
+    return bot
+
+
+async def on_startup(dispatcher: Dispatcher) -> None:
+    # побочные эффекты — здесь, а не при импорте настроек
+    setup.data_dir.mkdir(parents=True, exist_ok=True)
+    # поднимаем процессы парсинга заранее, а не на первом резюме
+    await extraction_pool.start()
+    analysis_queue.start()
+    audit_sink.start(dispatcher.get("worker_index"))
+    if setup.metrics_port:
+        port = setup.metrics_port + dispatcher.get("worker_index", 0)
+        dispatcher["metrics_server"] = await metrics.start_server(
+            setup.metrics_host, port
+        )
+
+
+async def on_shutdown(dispatcher: Dispatcher) -> None:
+    if runner := dispatcher.get("metrics_server"):
+        await runner.cleanup()
+    await analysis_queue.shutdown()
+    await prefilter_stats.shutdown()
+    await analysis_cache.shutdown()  # вычисления, брошенные отменёнными откликами
+    await audit_sink.shutdown()  # после очереди: её задачи ещё пишут аудит
+    await close_openai_client()
+    await extraction_pool.shutdown()
+    # хранилище FSM и изоляцию закрывает сам Dispatcher (fsm.close)
+
+
+def _register_collectors(limiter: ConcurrencyLimitMiddleware) -> None:
+    """Счётчики, которые компоненты уже ведут сами, — в /metrics."""
+    collect = metrics.registry.collector
+    collect("bot_updates", "Апдейты в обработке", limiter.stats)
+    collect("analysis_cache", "Кэш анализов", analysis_cache.stats)
+    collect("extraction_pool", "Пул парсинга резюме", extraction_pool.stats)
+    collect(
+        "analysis_queue",
+        "Очередь анализа",
+        lambda: {"depth": analysis_queue.depth, "workers": analysis_queue.workers},
+    )
+    collect(
+        "openai_scheduler",
+        "Планировщик OpenAI",
+        lambda: {
+            "waiting": openai_scheduler.waiting,
+            "tokens_used": openai_scheduler.tokens_used,
+            "rate_limited": openai_scheduler.rate_limited,
+        },
+    )
+    collect(
+        "openai_prefix_cache",
+        "Доля промпта из кэша OpenAI",
+        lambda: {"hit_rate": prefix_cache_stats.hit_rate()},
+    )
+    collect(
+        "openai_prefix_cache_vacancy",
+        "Prefix-кэш OpenAI по вакансиям (хэш текста, последние N)",
+        prefix_cache_stats.by_vacancy,
+        label="vacancy",
+    )
+    collect("prefilter", "Предфильтр", prefilter_stats.stats)
+    collect("tips_store", "Токены советов", tips_store.stats)
+    collect("audit_sink", "Журнал аудита", audit_sink.stats)
+
+
+def build_dispatcher() -> Dispatcher:
+    """Один раз на процесс: роутеры — модульные синглтоны."""
+    # состояния FSM: memory | postgres | redis (setup.fsm_storage)
+    storage = create_storage()
+    dp = Dispatcher(storage=storage, events_isolation=create_isolation(storage))
+    tips_store.attach(storage)  # токены советов видны всем процессам
+
+    limiter = ConcurrencyLimitMiddleware(setup.max_concurrent_updates)
+    dp.update.outer_middleware(limiter)
+    dp["concurrency"] = limiter
+    _register_collectors(limiter)
+
+    # одна сессия БД на апдейт — для HR-меню и списков вакансий
+    db_session = DbSessionMiddleware()
+    for r in (company_admin.router, candidate.router, start.router):
+        r.message.middleware(db_session)
+        r.callback_query.middleware(db_session)
+
+    # порядок не критичен, но оставим группами
+    routers = (
+        company_admin.router,
+        candidate.router,
+        resume_fsm.router,
+        start.router,
+        noop.router,  # ← добавили
+    )
+    for r in routers:
+        r.message.outer_middleware(HandlerTimingMiddleware(r.name, "message"))
+        r.callback_query.outer_middleware(
+            HandlerTimingMiddleware(r.name, "callback_query")
+        )
+        dp.include_router(r)
+
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    return dp
 
-# порядок не критичен, но оставим группами
-dp.include_router(company_admin.router)
-dp.include_router(candidate.router)
-dp.include_router(resume_fsm.router)
-dp.include_router(start.router)
-dp.include_router(noop.router)  # ← добавили
 
 if __name__ == "__main__":
-    dp.run_polling(bot)
+    if setup.webhook_url:
+        from bot.webhook import serve
+
+        serve(create_bot, build_dispatcher)
+    else:
+        build_dispatcher().run_polling(create_bot())
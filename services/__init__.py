@@ -1,5 +1,13 @@
 from .company_service import CompanyService
 from .vacancy_service import VacancyService
+from .resume_file_service import ResumeFileService
+from .application_service import ApplicationService
 from .resume_service import ResumeService
 
-__all__ = ["CompanyService", "VacancyService", "ResumeService"]
+__all__ = [
+    "CompanyService",
+    "VacancyService",
+    "ResumeFileService",
+    "ApplicationService",
+    "ResumeService",
+]
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import Application
+from db.uow import use_session
+
+
+class ApplicationService:
+    """Отклики с результатом анализа: запись и отчёты для HR."""
+
+    # ─────────────── запись ───────────────
+    @staticmethod
+    async def add(
+        *,
+        vacancy_id: int,
+        user_id: int,
+        result: Dict[str, Any],
+        username: str | None = None,
+        resume_file_id: int | None = None,
+        session: AsyncSession | None = None,
+    ) -> Application:
+        async with use_session(session) as s:
+            app = Application(
+                vacancy_id=vacancy_id,
+                user_id=user_id,
+                username=username,
+                resume_file_id=resume_file_id,
+                rating=_rating(result),
+                result=result,
+            )
+            s.add(app)
+        return app
+
+    @staticmethod
+    async def add_many(
+        rows: Sequence[Dict[str, Any]], *, session: AsyncSession | None = None
+    ) -> int:
+        """
+        Пакетная вставка одним executemany. Строка — те же поля, что у
+        ``add``; rating берётся из ``result``, если не задан.
+        """
+        if not rows:
+            return 0
+        now = dt.datetime.utcnow()
+        values = [
+            {
+                "vacancy_id": r["vacancy_id"],
+                "user_id": r["user_id"],
+                "username": r.get("username"),
+                "resume_file_id": r.get("resume_file_id"),
+                "rating": r.get("rating", _rating(r["result"])),
+                "result": r["result"],
+                "created_at": r.get("created_at", now),
+            }
+            for r in rows
+        ]
+        async with use_session(session) as s:
+            await s.execute(insert(Application), values)
+        return len(values)
+
+    # ─────────────── отчёты ───────────────
+    @staticmethod
+    async def top_for_vacancy(
+        vacancy_id: int,
+        *,
+        limit: int = 10,
+        since: Optional[dt.datetime] = None,
+        session: AsyncSession | None = None,
+    ) -> List[Application]:
+        """Лучшие отклики вакансии (по индексу vacancy_id, rating DESC, created_at)."""
+        stmt = select(Application).where(Application.vacancy_id == vacancy_id)
+        if since is not None:
+            stmt = stmt.where(Application.created_at >= since)
+        # тот же порядок, что в индексе, — при равном рейтинге раньше откликнувшиеся
+        stmt = stmt.order_by(
+            Application.rating.desc(), Application.created_at.asc()
+        ).limit(limit)
+        async with use_session(session) as s:
+            return (await s.execute(stmt)).scalars().all()
+
+    @staticmethod
+    async def count_for_vacancy(
+        vacancy_id: int,
+        *,
+        min_rating: int = 0,
+        since: Optional[dt.datetime] = None,
+        session: AsyncSession | None = None,
+    ) -> int:
+        stmt = select(func.count()).where(
+            Application.vacancy_id == vacancy_id,
+            Application.rating >= min_rating,
+        )
+        if since is not None:
+            stmt = stmt.where(Application.created_at >= since)
+        async with use_session(session) as s:
+            return (await s.execute(stmt)).scalar_one()
+
+
+def _rating(result: Dict[str, Any]) -> int:
+    try:
+        return max(0, min(100, round(float(result.get("rating", 0)))))
+    except (TypeError, ValueError):
+        return 0
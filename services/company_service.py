@@ -1,12 +1,22 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from dataclasses import dataclass
+from typing import List, Optional
 
-from sqlalchemy import select, update  # ← update добавлен
-from sqlalchemy.orm import selectinload
+from sqlalchemy import exists, func, select, update  # ← update добавлен
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import Exists
 
-from db.connection import async_session
 from db.models import Company, Vacancy
+from db.uow import on_commit, use_session
+from services.read_models import COMPANY_SUMMARY_COLUMNS, CompanySummary
+from services.vacancy_service import catalog
+
+
+@dataclass(frozen=True, slots=True)
+class HrMenuState:
+    has_company: bool
+    has_active_vacancy: bool
 
 
 class CompanyService:
@@ -14,44 +24,91 @@ class CompanyService:
 
     # ─────────────── CRUD ───────────────
     @staticmethod
-    async def create_company(owner_id: int, title: str) -> Company:
-        async with async_session() as s:
+    async def create_company(
+        owner_id: int, title: str, *, session: AsyncSession | None = None
+    ) -> Company:
+        async with use_session(session) as s:
             comp = Company(owner_id=owner_id, title=title.strip())
             s.add(comp)
-            await s.commit()
-            await s.refresh(comp)
-            return comp
+        return comp
 
     @staticmethod
-    async def update_title(company_id: int, title: str) -> None:
+    async def update_title(
+        company_id: int, title: str, *, session: AsyncSession | None = None
+    ) -> None:
         """Переименовать компанию."""
-        async with async_session() as s:
+        async with use_session(session) as s:
             await s.execute(
                 update(Company)
                 .where(Company.id == company_id)
                 .values(title=title.strip())
             )
-            await s.commit()
+        on_commit(catalog.invalidate)  # название компании входит в карточки вакансий
+
+    # ─────────────── агрегаты (без загрузки ORM-графа) ───────────────
+    @staticmethod
+    def _owned_active_vacancy(owner_id: int) -> Exists:
+        return exists().where(
+            Vacancy.company_id == Company.id,
+            Company.owner_id == owner_id,
+            Vacancy.is_active.is_(True),
+        )
+
+    @staticmethod
+    async def menu_state(
+        owner_id: int, *, session: AsyncSession | None = None
+    ) -> HrMenuState:
+        """Есть ли компании и активные вакансии — один запрос из двух EXISTS."""
+        stmt = select(
+            exists().where(Company.owner_id == owner_id),
+            CompanyService._owned_active_vacancy(owner_id),
+        )
+        async with use_session(session) as s:
+            has_company, has_vacancy = (await s.execute(stmt)).one()
+        return HrMenuState(bool(has_company), bool(has_vacancy))
+
+    @staticmethod
+    async def company_count(
+        owner_id: int, *, session: AsyncSession | None = None
+    ) -> int:
+        async with use_session(session) as s:
+            res = await s.execute(
+                select(func.count()).where(Company.owner_id == owner_id)
+            )
+            return res.scalar_one()
+
+    @staticmethod
+    async def has_active_vacancy(
+        owner_id: int, *, session: AsyncSession | None = None
+    ) -> bool:
+        async with use_session(session) as s:
+            res = await s.execute(
+                select(CompanyService._owned_active_vacancy(owner_id))
+            )
+            return bool(res.scalar_one())
+
+    @staticmethod
+    async def first_company_id(
+        owner_id: int, *, session: AsyncSession | None = None
+    ) -> Optional[int]:
+        async with use_session(session) as s:
+            res = await s.execute(
+                select(Company.id)
+                .where(Company.owner_id == owner_id)
+                .order_by(Company.id.asc())
+                .limit(1)
+            )
+            return res.scalar_one_or_none()
 
-    # ─────────────── выборки ───────────────
     @staticmethod
-    async def companies_for_user(owner_id: int) -> List[Company]:
-        async with async_session() as s:
+    async def summaries_for_user(
+        owner_id: int, *, session: AsyncSession | None = None
+    ) -> List[CompanySummary]:
+        """Компании владельца для меню — колоночная выборка, без ORM-объектов."""
+        async with use_session(session) as s:
             res = await s.execute(
-                select(Company)
+                select(*COMPANY_SUMMARY_COLUMNS)
                 .where(Company.owner_id == owner_id)
-                .options(selectinload(Company.vacancies))
                 .order_by(Company.id.asc())
             )
-            return res.scalars().all()
-
-    @staticmethod
-    async def companies_with_vacancies(owner_id: int) -> Dict[str, List[Vacancy]]:
-        """Название компании → список активных вакансий."""
-        companies = await CompanyService.companies_for_user(owner_id)
-        mapping: Dict[str, List[Vacancy]] = {}
-        for c in companies:
-            active = [v for v in c.vacancies if v.is_active]
-            if active:
-                mapping[c.title] = active
-        return mapping
+            return [CompanySummary(*row) for row in res]
@@ -0,0 +1,73 @@
+"""
+Read-модели: неизменяемые ``__slots__``-датаклассы для списков и меню.
+
+Строятся из колоночных выборок (``select(*VACANCY_CARD_COLUMNS)``), без
+ORM-объектов, identity map и подгрузки связей.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Select, select
+
+from db.models import Company, Vacancy
+
+
+@dataclass(frozen=True, slots=True)
+class CompanySummary:
+    id: int
+    title: str
+    owner_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class VacancyCard:
+    id: int
+    company_id: int
+    title: str
+    description: str
+    requirements: str
+    duties: str
+    conditions: str
+    is_active: bool
+    company: CompanySummary
+
+    @classmethod
+    def from_row(cls, row: Any) -> VacancyCard:
+        """Строка выборки ``vacancy_cards()``."""
+        return cls(
+            id=row.id,
+            company_id=row.company_id,
+            title=row.title,
+            description=row.description or "",
+            requirements=row.requirements or "",
+            duties=row.duties or "",
+            conditions=row.conditions or "",
+            is_active=bool(row.is_active),
+            company=CompanySummary(
+                id=row.company_id, title=row.company_title, owner_id=row.owner_id
+            ),
+        )
+
+
+COMPANY_SUMMARY_COLUMNS = (Company.id, Company.title, Company.owner_id)
+
+VACANCY_CARD_COLUMNS = (
+    Vacancy.id,
+    Vacancy.company_id,
+    Vacancy.title,
+    Vacancy.description,
+    Vacancy.requirements,
+    Vacancy.duties,
+    Vacancy.conditions,
+    Vacancy.is_active,
+    Company.title.label("company_title"),
+    Company.owner_id,
+)
+
+
+def vacancy_cards() -> Select:
+    """Колонки карточки вакансии вместе с компанией (JOIN, без ORM)."""
+    return select(*VACANCY_CARD_COLUMNS).join(Company, Company.id == Vacancy.company_id)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import ResumeFile, ResumeFileAlias
+from db.uow import use_session
+
+
+class ResumeFileService:
+    """Индекс загруженных резюме: sha256 / file_unique_id → файл и его текст."""
+
+    # ─────────────── выборки ───────────────
+    @staticmethod
+    async def by_unique_id(
+        file_unique_id: str, *, session: AsyncSession | None = None
+    ) -> Optional[ResumeFile]:
+        async with use_session(session) as s:
+            res = await s.execute(
+                select(ResumeFile)
+                .join(ResumeFileAlias, ResumeFileAlias.resume_file_id == ResumeFile.id)
+                .where(ResumeFileAlias.file_unique_id == file_unique_id)
+            )
+            return res.scalar_one_or_none()
+
+    @staticmethod
+    async def by_sha256(
+        sha256: str, *, session: AsyncSession | None = None
+    ) -> Optional[ResumeFile]:
+        async with use_session(session) as s:
+            res = await s.execute(select(ResumeFile).where(ResumeFile.sha256 == sha256))
+            return res.scalar_one_or_none()
+
+    @staticmethod
+    async def with_text(
+        limit: int | None = None, *, session: AsyncSession | None = None
+    ) -> List[ResumeFile]:
+        """Распарсенные резюме, новые первыми (для пакетного пересчёта)."""
+        async with use_session(session) as s:
+            res = await s.execute(
+                select(ResumeFile)
+                .where(ResumeFile.text.is_not(None))
+                .order_by(ResumeFile.id.desc())
+                .limit(limit)
+            )
+            return res.scalars().all()
+
+    # ─────────────── запись ───────────────
+    @staticmethod
+    async def add(
+        sha256: str, path: str, size: int, *, session: AsyncSession | None = None
+    ) -> ResumeFile:
+        """Добавить файл; если такой sha256 уже есть (гонка) — вернуть его."""
+        async with use_session(session) as s:
+            rec = ResumeFile(sha256=sha256, path=path, size=size)
+            try:
+                # savepoint: в общей сессии ошибка не должна ломать всю транзакцию
+                async with s.begin_nested():
+                    s.add(rec)
+            except IntegrityError:
+                res = await s.execute(
+                    select(ResumeFile).where(ResumeFile.sha256 == sha256)
+                )
+                rec = res.scalar_one()
+        return rec
+
+    @staticmethod
+    async def link(
+        file_unique_id: str,
+        resume_file_id: int,
+        *,
+        session: AsyncSession | None = None,
+    ) -> None:
+        """Запомнить file_unique_id для файла (повторная привязка игнорируется)."""
+        async with use_session(session) as s:
+            try:
+                async with s.begin_nested():
+                    s.add(
+                        ResumeFileAlias(
+                            file_unique_id=file_unique_id,
+                            resume_file_id=resume_file_id,
+                        )
+                    )
+            except IntegrityError:
+                pass
+
+    @staticmethod
+    async def set_text(
+        resume_file_id: int, text: str, *, session: AsyncSession | None = None
+    ) -> None:
+        async with use_session(session) as s:
+            await s.execute(
+                update(ResumeFile)
+                .where(ResumeFile.id == resume_file_id)
+                .values(text=text.replace("\x00", ""))  # Postgres не хранит NUL
+            )
@@ -1,35 +1,33 @@
 from __future__ import annotations
 
-import uuid
-from pathlib import Path
 from typing import Dict
 
-from aiogram.types import Document, Message
+from aiogram.types import Message
 
-from bot.handlers.resume import extract_text, process_resume
-from settings.config import setup
-from services import VacancyService
+from .application_service import ApplicationService
+from .vacancy_service import VacancyService
 
 
 class ResumeService:
     """
     Загрузка файла из Telegram, парсинг текста и запуск ChatGPT-анализа.
-    """
 
-    uploads_dir = Path(setup.data_dir) / "uploads"
-    uploads_dir.mkdir(parents=True, exist_ok=True)
+    Повторные загрузки того же файла отдаёт индекс ``ResumeFileService``
+    (через ``bot.utils.resume_store``) — без скачивания и парсинга.
+    Модули ``bot.*`` импортируются при вызове: ``resume_store`` сам
+    импортирует ``services``, и на уровне модуля это был бы цикл.
+    """
 
     @staticmethod
     async def process_telegram_file(message: Message, *, vacancy_id: int) -> Dict:
-        doc: Document = message.document
-        ext = Path(doc.file_name or "").suffix.lower()
-        file_path = ResumeService.uploads_dir / f"{uuid.uuid4().hex}{ext}"
+        from bot.handlers.resume import process_resume
+        from bot.utils.resume_store import fetch_resume, resume_text
 
-        # скачиваем файл
-        await doc.download(destination=file_path)
+        # скачиваем файл (повторные загрузки берутся из хранилища)
+        stored = await fetch_resume(message.bot, message.document)
 
         # читаем текст
-        resume_text = extract_text(str(file_path))
+        text = await resume_text(stored)
 
         vacancy = await VacancyService.by_id(vacancy_id)
         vacancy_name = vacancy.title if vacancy else "Vacancy"
@@ -39,10 +37,19 @@ class ResumeService:
 
         # анализ ChatGPT
         analysis = await process_resume(
-            file_path=str(file_path),
-            resume_text=resume_text,
+            file_path=str(stored.path),
+            resume_text=text,
+            vacancy_id=vacancy_id,
             vacancy_name=vacancy_name,
             vacancy_text=vacancy_text,
             user_id=message.from_user.id,
         )
+        if vacancy:
+            await ApplicationService.add(
+                vacancy_id=vacancy.id,
+                user_id=message.from_user.id,
+                username=message.from_user.username,
+                resume_file_id=stored.id,
+                result=analysis,
+            )
         return analysis
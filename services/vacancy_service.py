@@ -1,89 +1,249 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import asyncio
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 
-from sqlalchemy import select, update, delete
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.connection import async_session
-from db.models import Vacancy
+from db.models import Company, Vacancy
+from db.uow import on_commit, use_session
+from services.read_models import VacancyCard, vacancy_cards
+from settings.config import setup
+
+
+#  неизменяемые снимки для кэша каталога
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogSnapshot:
+    version: int
+    vacancies: Tuple[VacancyCard, ...]  # новые первыми
+    by_id: Mapping[int, VacancyCard]
+    by_company: Mapping[int, Tuple[VacancyCard, ...]]
+
+    @classmethod
+    def build(cls, version: int, cards: Tuple[VacancyCard, ...]) -> CatalogSnapshot:
+        by_company: Dict[int, List[VacancyCard]] = {}
+        for card in cards:
+            by_company.setdefault(card.company_id, []).append(card)
+        return cls(
+            version=version,
+            vacancies=cards,
+            by_id=MappingProxyType({c.id: c for c in cards}),
+            by_company=MappingProxyType(
+                {cid: tuple(items) for cid, items in by_company.items()}
+            ),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class VacancyPage:
+    cards: Tuple[VacancyCard, ...]  # по (название компании, id вакансии)
+    has_prev: bool
+    has_next: bool
+
+
+class VacancyCatalog:
+    """
+    Кэш активных вакансий. Любая запись через VacancyService
+    поднимает ``version`` и сбрасывает снимок.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.version = 0
+        self._snapshot: CatalogSnapshot | None = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> CatalogSnapshot | None:
+        snap = self._snapshot
+        if (
+            snap is not None
+            and snap.version == self.version
+            and time.monotonic() - self._loaded_at < self.ttl
+        ):
+            return snap
+        return None
+
+    async def snapshot(self) -> CatalogSnapshot:
+        snap = self._fresh()
+        if snap is not None:
+            return snap
+
+        async with self._lock:
+            snap = self._fresh()
+            if snap is not None:
+                return snap
+
+            version = self.version
+            async with async_session() as s:
+                res = await s.execute(
+                    vacancy_cards()
+                    .where(Vacancy.is_active.is_(True))
+                    .order_by(Vacancy.id.desc())
+                )
+                cards = tuple(VacancyCard.from_row(r) for r in res)
+
+            snap = CatalogSnapshot.build(version, cards)
+            # если каталог успели изменить во время загрузки — снимок не кэшируем
+            if version == self.version:
+                self._snapshot = snap
+                self._loaded_at = time.monotonic()
+            return snap
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self._snapshot = None
+
+
+catalog = VacancyCatalog(ttl=setup.catalog_ttl)
 
 
 class VacancyService:
     """CRUD + вспомогательные методы по вакансиям."""
 
+    # снимок каталога активных вакансий
+    @staticmethod
+    async def snapshot() -> CatalogSnapshot:
+        return await catalog.snapshot()
+
+    @staticmethod
+    def invalidate_catalog() -> None:
+        catalog.invalidate()
+
     # получить вакансию по ID (с привязанной company)
     @staticmethod
-    async def by_id(vacancy_id: int) -> Optional[Vacancy]:
-        async with async_session() as s:
-            res = await s.execute(
-                select(Vacancy)
-                .options(selectinload(Vacancy.company))
-                .where(Vacancy.id == vacancy_id)
-            )
-            return res.scalar_one_or_none()
+    async def by_id(
+        vacancy_id: int, *, session: AsyncSession | None = None
+    ) -> Optional[VacancyCard]:
+        card = (await catalog.snapshot()).by_id.get(vacancy_id)
+        if card is not None:
+            return card
+
+        # неактивные вакансии в каталог не попадают — идём в БД
+        async with use_session(session) as s:
+            res = await s.execute(vacancy_cards().where(Vacancy.id == vacancy_id))
+            row = res.one_or_none()
+            return VacancyCard.from_row(row) if row else None
 
     # все активные вакансии (для кандидата)
     @staticmethod
-    async def all_active() -> List[Vacancy]:
-        async with async_session() as s:
-            stmt = (
-                select(Vacancy)
-                .options(joinedload(Vacancy.company))
-                .where(Vacancy.is_active.is_(True))
-                .order_by(Vacancy.id.desc())
-            )
-            res = await s.execute(stmt)
-            return res.scalars().all()
+    async def all_active() -> Tuple[VacancyCard, ...]:
+        return (await catalog.snapshot()).vacancies
+
+    # страница активных вакансий: keyset по (companies.title, vacancies.id)
+    @staticmethod
+    async def page(
+        *,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        limit: int = setup.vacancies_page_size,
+        session: AsyncSession | None = None,
+    ) -> VacancyPage:
+        """
+        Следующая страница после вакансии ``after`` или предыдущая перед
+        ``before``; без курсоров — первая. Позиция — пара (companies.title,
+        vacancies.id): у одной компании и у компаний с одинаковым названием
+        порядок задаёт id вакансии, он уникален, так что курсор однозначен.
+
+        Без OFFSET: запрос не перебирает уже показанные страницы. Но ключ
+        сортировки лежит в двух таблицах, поэтому это join companies с
+        частичным индексом активных вакансий и сортировка результата, а не
+        один проход по индексу; на текущих объёмах каталога этого хватает.
+        """
+        key = tuple_(Company.title, Vacancy.id)
+        stmt = vacancy_cards().where(Vacancy.is_active.is_(True))
+
+        cursor_id = after if after is not None else before
+        if cursor_id is not None:
+            cursor = await VacancyService.by_id(cursor_id, session=session)
+            if cursor is None:  # курсор удалён — начинаем сначала
+                return await VacancyService.page(limit=limit, session=session)
+            pos = tuple_(cursor.company.title, cursor.id)
+            stmt = stmt.where(key > pos if after is not None else key < pos)
+
+        backwards = before is not None
+        order = (
+            (Company.title.desc(), Vacancy.id.desc())
+            if backwards
+            else (Company.title.asc(), Vacancy.id.asc())
+        )
+        async with use_session(session) as s:
+            res = await s.execute(stmt.order_by(*order).limit(limit + 1))
+            rows = [VacancyCard.from_row(r) for r in res]
+
+        more = len(rows) > limit
+        rows = rows[:limit]
+        if backwards:
+            rows.reverse()
+            return VacancyPage(tuple(rows), has_prev=more, has_next=True)
+        return VacancyPage(tuple(rows), has_prev=after is not None, has_next=more)
 
     # создать вакансию
     @staticmethod
-    async def create(company_id: int, title: str, description: str = "") -> Vacancy:
-        async with async_session() as s:
+    async def create(
+        company_id: int,
+        title: str,
+        description: str = "",
+        *,
+        session: AsyncSession | None = None,
+    ) -> Vacancy:
+        async with use_session(session) as s:
             vac = Vacancy(
                 company_id=company_id,
                 title=title.strip(),
                 description=description.strip(),
             )
             s.add(vac)
-            await s.commit()
-            await s.refresh(vac)
-            return vac
+        on_commit(catalog.invalidate)
+        return vac
 
     # обновить название
     @staticmethod
-    async def update_title(vacancy_id: int, title: str) -> None:
-        async with async_session() as s:
+    async def update_title(
+        vacancy_id: int, title: str, *, session: AsyncSession | None = None
+    ) -> None:
+        async with use_session(session) as s:
             await s.execute(
                 update(Vacancy)
                 .where(Vacancy.id == vacancy_id)
                 .values(title=title.strip())
             )
-            await s.commit()
+        on_commit(catalog.invalidate)
 
     # обновить описание
     @staticmethod
-    async def update_description(vacancy_id: int, description: str) -> None:
-        async with async_session() as s:
+    async def update_description(
+        vacancy_id: int, description: str, *, session: AsyncSession | None = None
+    ) -> None:
+        async with use_session(session) as s:
             await s.execute(
                 update(Vacancy)
                 .where(Vacancy.id == vacancy_id)
                 .values(description=description.strip())
             )
-            await s.commit()
+        on_commit(catalog.invalidate)
 
     # пометить вакансию неактивной (мягкое удаление)
     @staticmethod
-    async def deactivate(vacancy_id: int) -> None:
-        async with async_session() as s:
+    async def deactivate(
+        vacancy_id: int, *, session: AsyncSession | None = None
+    ) -> None:
+        async with use_session(session) as s:
             await s.execute(
                 update(Vacancy).where(Vacancy.id == vacancy_id).values(is_active=False)
             )
-            await s.commit()
+        on_commit(catalog.invalidate)
 
     # жёсткое удаление записи из БД (использовать осторожно)
     @staticmethod
-    async def delete(vacancy_id: int) -> None:
-        async with async_session() as s:
+    async def delete(vacancy_id: int, *, session: AsyncSession | None = None) -> None:
+        async with use_session(session) as s:
             await s.execute(delete(Vacancy).where(Vacancy.id == vacancy_id))
-            await s.commit()
+        on_commit(catalog.invalidate)
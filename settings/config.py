@@ -15,16 +15,82 @@ class Settings(BaseSettings):
     data_dir: Path = Path("data") / "resumes"
     database_url: str | None = Field(None, env="DATABASE_URL")
 
+    # пул процессов для парсинга резюме (PDF/DOCX)
+    extract_workers: int = 2
+    extract_timeout: float = 30.0  # сек. на один файл
+    extract_max_bytes: int = 10 * 1024 * 1024
+    # бюджет текста резюме для промпта (~3 символа на токен)
+    extract_max_chars: int = 20_000
+
+    # кэш результатов анализа резюме
+    analysis_cache_size: int = 1024  # записей в памяти
+    analysis_cache_ttl: int = 30 * 24 * 3600  # сек.
+    analysis_cache_db_rows: int = 100_000
+
+    # каталог активных вакансий в памяти; TTL подстраховывает
+    # от изменений, сделанных другими процессами
+    catalog_ttl: float = 60.0
+    vacancies_page_size: int = 10  # вакансий на странице списка для кандидата
+
+    # очередь анализа: сколько запросов к OpenAI одновременно и сколько ждут
+    analysis_workers: int = 4
+    analysis_queue_size: int = 100
+
+    # OpenAI-совместимый сервер вместо api.openai.com (например,
+    # python -m tools.fake_openai) и таймаут одного запроса
+    openai_base_url: str | None = Field(None, env="OPENAI_BASE_URL")
+    openai_timeout: float = 60.0  # сек.
+
+    # лимиты аккаунта OpenAI (requests / tokens per minute)
+    openai_rpm: int = 500
+    openai_tpm: int = 200_000
+    # по скольким последним вакансиям вести долю prefix-кэша OpenAI
+    prefix_stats_vacancies: int = 200
+
+    # локальный предфильтр перед LLM; порог 0 — только считаем согласие с LLM
+    prefilter_threshold: float = 0.0
+    prefilter_min_chars: int = 200
+    # доля отклонённых резюме, которые всё же проверяются LLM в фоне, —
+    # без неё не видно ложных отказов
+    prefilter_audit_rate: float = 0.05
+
+    # хранилище состояний FSM: memory | postgres | redis; с postgres/redis
+    # диалог переживает рестарт и доступен всем процессам бота
+    fsm_storage: str = "memory"
+    fsm_ttl: int = 3 * 24 * 3600  # сек. без активности, потом состояние забывается
+    redis_url: str | None = Field(None, env="REDIS_URL")
+
+    # одноразовые токены кнопки «Получить советы»
+    tips_store_size: int = 10_000
+    tips_ttl: int = 24 * 3600  # сек.
+
+    # webhook вместо long polling (если задан webhook_url)
+    webhook_url: str | None = Field(None, env="WEBHOOK_URL")  # публичный https://…
+    webhook_path: str = "/webhook"
+    webhook_secret: str | None = Field(None, env="WEBHOOK_SECRET")
+    webhook_host: str = "0.0.0.0"
+    webhook_port: int = 8080
+    webhook_workers: int = 1  # процессов с SO_REUSEPORT на одном порту
+    # апдейтов в обработке одновременно (на процесс), остальные ждут
+    max_concurrent_updates: int = 64
+
+    # журнал аудита (data_dir/resume_audit[.w<N>].log): пачки, ротация, gzip
+    audit_max_bytes: int = 50 * 1024 * 1024
+    audit_max_age: float = 24 * 3600  # сек.
+    audit_batch_size: int = 200
+    audit_flush_interval: float = 1.0  # сек. ожидания добора пачки
+    audit_queue_size: int = 10_000
+
+    # метрики Prometheus: GET /metrics, только локально; 0 — выключено.
+    # webhook-воркер N слушает metrics_port + N
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 9300
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
         extra="ignore",
     )
 
-    def __init__(self, **values):
-        # создаём data/resumes при запуске (если её нет)
-        super().__init__(**values)
-        self.data_dir.mkdir(parents=True, exist_ok=True)
-
 
 setup = Settings()
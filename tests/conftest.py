@@ -0,0 +1,41 @@
+"""
+Общие фикстуры: SQLite вместо Postgres и один event loop на весь прогон
+(движок БД и синглтоны бота создаются при импорте и живут в нём).
+
+Настройки читаются при импорте модулей бота, поэтому окружение
+задаётся здесь, до первого ``import settings``.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+_TMP = Path(tempfile.mkdtemp(prefix="hrbot-tests-"))
+
+os.environ.setdefault("TELEGRAM_TOKEN", "42:test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SUMMARY_CHAT_ID", "0")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP / 'test.db'}"
+os.environ["DATA_DIR"] = str(_TMP / "resumes")
+os.environ["METRICS_PORT"] = "0"
+os.environ["EXTRACT_WORKERS"] = "1"
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def db(anyio_backend):
+    import db.models  # noqa: F401  — регистрируем таблицы в metadata
+    from db.connection import Base, engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import uuid
+
+import pytest
+from sqlalchemy import update
+
+from bot.utils.analysis_cache import AnalysisCache, make_key
+from db.connection import async_session
+from db.models import AnalysisCacheEntry
+
+pytestmark = pytest.mark.anyio
+
+
+def _cache(**kw) -> AnalysisCache:
+    return AnalysisCache(**{"max_items": 16, "ttl": 3600, "db_max_rows": 1000, **kw})
+
+
+def _key() -> str:
+    return uuid.uuid4().hex
+
+
+def test_make_key_ignores_whitespace_but_not_version():
+    base = make_key("Python  dev\n", "Backend", prompt_version="1", model="m")
+    assert base == make_key(" Python dev", "Backend ", prompt_version="1", model="m")
+    assert base != make_key("Python dev", "Backend", prompt_version="2", model="m")
+    assert base != make_key("Python dev", "Backend", prompt_version="1", model="n")
+
+
+async def test_memory_eviction_falls_back_to_db(db):
+    cache = _cache(max_items=2)
+    keys = [_key() for _ in range(3)]
+    for i, key in enumerate(keys):
+        await cache.put(key, {"rating": i})
+
+    assert cache.evictions == 1
+    assert await cache.get(keys[0]) == {"rating": 0}
+    assert cache.db_hits == 1
+    assert await cache.get(keys[0]) == {"rating": 0}  # уже снова в памяти
+    assert cache.db_hits == 1
+
+
+async def test_put_revives_expired_row(db):
+    key = _key()
+    await _cache().put(key, {"rating": 1})
+    async with async_session() as s:
+        await s.execute(
+            update(AnalysisCacheEntry)
+            .where(AnalysisCacheEntry.key == key)
+            .values(created_at=dt.datetime.utcnow() - dt.timedelta(days=1))
+        )
+        await s.commit()
+
+    assert await _cache().get(key) is None
+
+    await _cache().put(key, {"rating": 2})
+    assert await _cache().get(key) == {"rating": 2}
+
+
+async def test_put_many_writes_all_rows(db):
+    rows = {_key(): {"rating": i} for i in range(5)}
+    await _cache().put_many(rows)
+
+    fresh = _cache()
+    assert {k: await fresh.get(k) for k in rows} == rows
+    assert fresh.db_hits == 5
+
+
+async def test_get_or_compute_shares_one_call(db):
+    cache = _cache()
+    key = _key()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"rating": 7}
+
+    results = await asyncio.gather(
+        *(cache.get_or_compute(key, compute) for _ in range(3))
+    )
+
+    assert results == [{"rating": 7}] * 3
+    assert calls == 1
+    assert cache.misses == 1  # второй и третий ждали первый вызов
+
+
+async def test_cancelled_caller_does_not_cancel_others(db):
+    cache = _cache()
+    key = _key()
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        return {"rating": 9}
+
+    first = asyncio.create_task(cache.get_or_compute(key, compute))
+    second = asyncio.create_task(cache.get_or_compute(key, compute))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == {"rating": 9}
+    assert first.cancelled()
+    assert await _cache().get(key) == {"rating": 9}
+
+
+async def test_lookup_false_skips_second_miss(db):
+    cache = _cache()
+    key = _key()
+
+    async def compute():
+        return {"rating": 3}
+
+    assert await cache.get(key) is None
+    await cache.get_or_compute(key, compute, lookup=False)
+    assert cache.misses == 1
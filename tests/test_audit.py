@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import gzip
+import json
+import time
+
+import pytest
+
+from bot.utils.audit import SEGMENT_KEY, AuditSink
+
+pytestmark = pytest.mark.anyio
+
+
+def _sink(path, **kw) -> AuditSink:
+    opts = dict(
+        max_bytes=10_000,
+        max_age=3600,
+        batch_size=100,
+        flush_interval=0.01,
+        queue_size=100,
+    )
+    opts.update(kw)
+    return AuditSink(path, **opts)
+
+
+def _lines(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def _records(path) -> list[dict]:
+    return [r for r in _lines(path) if SEGMENT_KEY not in r]
+
+
+async def _write(sink: AuditSink, *ids: int) -> None:
+    sink.start()
+    for i in ids:
+        await sink.write({"id": i})
+    await sink.shutdown()
+
+
+def _segments(path) -> list:
+    return sorted(path.parent.glob(f"{path.name}.*.gz"))
+
+
+async def test_segment_starts_with_header(tmp_path):
+    path = tmp_path / "audit.log"
+    before = time.time()
+
+    await _write(_sink(path), 1, 2)
+
+    header, *records = _lines(path)
+    assert header[SEGMENT_KEY]["started_at"] >= before
+    assert records == [{"id": 1}, {"id": 2}]
+
+
+async def test_rotates_by_size(tmp_path):
+    path = tmp_path / "audit.log"
+    sink = _sink(path, max_bytes=200, batch_size=1)
+
+    await _write(sink, *range(20))
+
+    assert sink.rotations > 0
+    segments = _segments(path)
+    assert len(segments) == sink.rotations
+    rotated = [
+        json.loads(line)
+        for seg in segments
+        for line in gzip.decompress(seg.read_bytes()).decode().splitlines()
+    ]
+    ids = [r["id"] for r in rotated + _records(path) if SEGMENT_KEY not in r]
+    assert sorted(ids) == list(range(20))
+
+
+async def test_age_survives_restart(tmp_path):
+    path = tmp_path / "audit.log"
+    await _write(_sink(path, max_age=60), 1)
+    # сегмент начат давно: рестарт и свежий mtime не должны сбросить возраст
+    header, *rest = path.read_text().splitlines(keepends=True)
+    old = json.dumps({SEGMENT_KEY: {"started_at": time.time() - 120}}) + "\n"
+    path.write_text(old + "".join(rest))
+
+    restarted = _sink(path, max_age=60)
+    await _write(restarted, 2)
+
+    assert restarted.rotations == 1
+    assert _records(path) == [{"id": 2}]
+
+
+async def test_young_segment_is_not_rotated_after_restart(tmp_path):
+    path = tmp_path / "audit.log"
+    await _write(_sink(path, max_age=60), 1)
+
+    restarted = _sink(path, max_age=60)
+    await _write(restarted, 2)
+
+    assert restarted.rotations == 0
+    assert _records(path) == [{"id": 1}, {"id": 2}]
+    assert sum(SEGMENT_KEY in r for r in _lines(path)) == 1
+
+
+async def test_file_without_header_is_appended(tmp_path):
+    path = tmp_path / "audit.log"
+    path.write_text(json.dumps({"id": 1}) + "\n")
+
+    sink = _sink(path, max_age=60)
+    await _write(sink, 2)
+
+    assert sink.rotations == 0
+    assert _lines(path) == [{"id": 1}, {"id": 2}]
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from bot.utils.batch_scoring import ScoringItem, parse_output, split_batches
+
+
+def _line(custom_id: str, **row) -> str:
+    return json.dumps({"custom_id": custom_id, **row}, ensure_ascii=False)
+
+
+def _ok(custom_id: str, content: str) -> str:
+    body = {"choices": [{"message": {"content": content}}]}
+    return _line(custom_id, response={"status_code": 200, "body": body})
+
+
+def test_parse_output_results_and_errors():
+    data = "\n".join(
+        [
+            _ok("a", '{"rating": 80, "strong": "asyncio"}'),
+            _ok("b", 'Вот ответ: {"rating": 55} — готово'),  # JSON внутри текста
+            "",
+            _ok("c", "не JSON"),
+            _line("d", response={"status_code": 429, "body": {"error": "limit"}}),
+            _line("e", error={"code": "expired", "message": "не успели"}),
+        ]
+    ).encode("utf-8")
+
+    report = parse_output(data)
+
+    assert report.results == {
+        "a": {"rating": 80, "strong": "asyncio"},
+        "b": {"rating": 55},
+    }
+    assert set(report.errors) == {"c", "d", "e"}
+    assert "limit" in report.errors["d"]
+    assert "expired" in report.errors["e"]
+
+
+def test_parse_output_empty_choices_is_error():
+    body = {"choices": []}
+    data = _line("a", response={"status_code": 200, "body": body}).encode()
+
+    report = parse_output(data)
+
+    assert report.results == {}
+    assert "a" in report.errors
+
+
+def test_parse_output_truncates_long_errors():
+    data = _line("a", error={"message": "x" * 5000}).encode()
+
+    assert len(parse_output(data).errors["a"]) == 400
+
+
+def _items(n: int, size: int = 100) -> list[ScoringItem]:
+    return [ScoringItem(f"id-{i}", "r" * size, "vacancy") for i in range(n)]
+
+
+def test_split_batches_by_count_and_bytes():
+    items = _items(10)
+    by_count = [chunk for chunk, _ in split_batches(items, max_requests=4)]
+    assert [len(c) for c in by_count] == [4, 4, 2]
+
+    one = next(split_batches(items[:1]))[1]
+    by_bytes = list(split_batches(items, max_bytes=3 * len(one)))
+    assert [len(c) for c, _ in by_bytes] == [3, 3, 3, 1]
+    assert all(len(jsonl) <= 3 * len(one) for _, jsonl in by_bytes)
+    assert [it.custom_id for c, _ in by_bytes for it in c] == [
+        it.custom_id for it in items
+    ]
+
+
+def test_split_batches_rejects_oversized_request():
+    with pytest.raises(ValueError):
+        list(split_batches(_items(1, size=10_000), max_bytes=1000))
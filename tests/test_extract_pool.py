@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from bot.utils.extract_pool import ExtractionPool
+
+pytestmark = pytest.mark.anyio
+
+
+# задачи пула — функции верхнего уровня модуля (pickle)
+def nap(seconds: float) -> int:
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def boom() -> None:
+    raise ValueError("bad file")
+
+
+@pytest.fixture
+async def pool(request):
+    workers, timeout = request.param
+    pool = ExtractionPool(workers=workers, timeout=timeout, max_bytes=1024)
+    await pool.start()
+    yield pool
+    await pool.shutdown()
+
+
+async def _outcomes(*jobs):
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+    return ["ok" if isinstance(r, int) else type(r).__name__ for r in results]
+
+
+@pytest.mark.parametrize("pool", [(1, 1.0)], indirect=True)
+async def test_queued_burst_does_not_time_out(pool):
+    jobs = [asyncio.ensure_future(pool.run(nap, 0.6)) for _ in range(3)]
+    await asyncio.sleep(0.1)
+    assert pool.stats()["in_flight"] == 3
+    assert pool.stats()["queue_depth"] == 2
+
+    assert await _outcomes(*jobs) == ["ok", "ok", "ok"]
+    assert pool.recycled == 0
+    assert pool.stats()["queue_depth"] == 0
+
+
+@pytest.mark.parametrize("pool", [(2, 0.5)], indirect=True)
+async def test_hung_job_replaces_only_its_worker(pool):
+    hung = asyncio.ensure_future(pool.run(nap, 30))
+    await asyncio.sleep(0.05)
+    quick = [pool.run(nap, 0.1) for _ in range(3)]
+
+    outcomes = await _outcomes(hung, *quick)
+
+    assert outcomes == ["TimeoutError", "ok", "ok", "ok"]
+    assert pool.recycled == 1
+    # замена поднимается в фоне — дождавшись её, пул снова в полном составе
+    await asyncio.gather(*pool._spawning)
+    pids = await asyncio.gather(*(pool.run(nap, 0.3) for _ in range(2)))
+    assert len(set(pids)) == 2
+
+
+@pytest.mark.parametrize("pool", [(1, 5.0)], indirect=True)
+async def test_job_error_keeps_worker(pool):
+    before = await pool.run(nap, 0)
+    with pytest.raises(ValueError):
+        await pool.run(boom)
+
+    assert await pool.run(nap, 0) == before
+    assert pool.recycled == 0
+
+
+@pytest.mark.parametrize("pool", [(1, 5.0)], indirect=True)
+async def test_shutdown_wakes_waiters(pool):
+    busy = asyncio.ensure_future(pool.run(nap, 0.5))
+    waiting = asyncio.ensure_future(pool.run(nap, 0))
+    await asyncio.sleep(0.05)
+
+    await pool.shutdown()
+
+    with pytest.raises(RuntimeError):
+        await waiting
+    busy.cancel()
+    await asyncio.gather(busy, return_exceptions=True)
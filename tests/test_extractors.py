@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from docx import Document
+
+from bot.utils.extractors import _TXT_CHUNK, extract
+
+
+def write_pdf(path: Path, pages: list[str | None]) -> Path:
+    """
+    Минимальный PDF: строка — страница с текстом (Helvetica),
+    None — страница без шрифтов, как у скана.
+    """
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b""]
+    font = 3
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    kids = []
+    for text in pages:
+        content = (
+            b"" if text is None else f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+        )
+        resources = b"<< >>" if text is None else b"<< /Font << /F1 %d 0 R >> >>" % font
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources %s /Contents %d 0 R >>" % (resources, len(objects))
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids),
+        len(kids),
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path.write_bytes(bytes(out))
+    return path
+
+
+def test_txt_within_budget_is_not_truncated(tmp_path):
+    path = tmp_path / "cv.txt"
+    path.write_text("python " * 10, encoding="utf-8")
+
+    res = extract(path, 1000)
+
+    assert res.text == "python " * 10
+    assert not res.truncated
+    assert not res.has_skipped
+
+
+def test_txt_exactly_at_budget_is_not_truncated(tmp_path):
+    path = tmp_path / "cv.txt"
+    path.write_text("x" * 500, encoding="utf-8")
+
+    res = extract(path, 500)
+
+    assert len(res.text) == 500
+    assert not res.truncated
+
+
+def test_txt_over_budget_stops_reading(tmp_path):
+    path = tmp_path / "cv.txt"
+    path.write_text("x" * (_TXT_CHUNK * 5), encoding="utf-8")
+
+    res = extract(path, 1000)
+
+    assert len(res.text) == 1000
+    assert res.truncated
+    assert res.units_read == 1  # остальные блоки не читались
+
+
+def test_pdf_skipped_pages_are_not_truncation(tmp_path):
+    path = write_pdf(tmp_path / "cv.pdf", ["Python developer", None, "Postgres"])
+
+    res = extract(path, 10_000)
+
+    assert "Python developer" in res.text and "Postgres" in res.text
+    assert not res.truncated
+    assert res.has_skipped
+    assert (res.units_read, res.skipped, res.units_total) == (2, 1, 3)
+    assert res.units_left == 0
+
+
+def test_pdf_stops_at_budget(tmp_path):
+    path = write_pdf(tmp_path / "cv.pdf", [f"page {i} " + "a" * 60 for i in range(5)])
+
+    res = extract(path, 30)
+
+    assert len(res.text) == 30
+    assert res.truncated
+    assert res.units_read == 1
+    assert res.units_left == 4
+
+
+def test_docx_stops_at_budget(tmp_path):
+    doc = Document()
+    for i in range(50):
+        doc.add_paragraph(f"Опыт {i}: " + "б" * 40)
+    path = tmp_path / "cv.docx"
+    doc.save(str(path))
+
+    res = extract(path, 100)
+
+    assert len(res.text) == 100
+    assert res.truncated
+    assert res.units_read < 5
+    assert res.units_total == 50
+
+
+@pytest.mark.parametrize("suffix", [".txt", ".docx"])
+def test_empty_document(tmp_path, suffix):
+    path = tmp_path / f"cv{suffix}"
+    if suffix == ".docx":
+        Document().save(str(path))
+    else:
+        path.write_text("")
+
+    res = extract(path, 100)
+
+    assert res.text == ""
+    assert not res.truncated
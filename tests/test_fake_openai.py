@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import random
+
+import openai
+import pytest
+from openai import AsyncOpenAI
+
+from tools.fake_openai import (
+    Cassette,
+    FakeOpenAI,
+    FaultConfig,
+    parse_latency,
+    prompt_key,
+)
+
+pytestmark = pytest.mark.anyio
+
+BODY = {
+    "model": "gpt-4o-mini",
+    "messages": [{"role": "user", "content": "Оцени резюме"}],
+}
+
+
+async def _ask(server: FakeOpenAI, content: str = "Оцени резюме") -> str:
+    client = AsyncOpenAI(api_key="x", base_url=server.url, max_retries=0)
+    try:
+        resp = await client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": content}]
+        )
+    finally:
+        await client.close()
+    return resp.choices[0].message.content
+
+
+async def test_synthetic_answer_is_deterministic():
+    async with FakeOpenAI() as server:
+        first, again = await _ask(server), await _ask(server)
+        await _ask(server, "Другое резюме")
+
+    assert first == again
+    assert json.loads(first)["rating"] == int(prompt_key(BODY)[:4], 16) % 101
+    assert server.stats.synthetic == 3
+    assert server.stats.by_key[prompt_key(BODY)] == 2
+    assert len(server.stats.by_key) == 2
+
+
+async def test_replays_cassette(tmp_path):
+    path = tmp_path / "openai.jsonl"
+    recorded = {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": '{"rating": 77}'},
+                "finish_reason": "stop",
+            }
+        ],
+    }
+    Cassette(path).put(prompt_key(BODY), recorded)
+
+    async with FakeOpenAI(cassette=path) as server:
+        assert await _ask(server) == '{"rating": 77}'
+
+    assert server.stats.replayed == 1
+
+
+@pytest.mark.parametrize(
+    "faults, error",
+    [
+        (FaultConfig(rate_429=1.0), openai.RateLimitError),
+        (FaultConfig(rate_5xx=1.0), openai.InternalServerError),
+        (FaultConfig(missing="404"), openai.NotFoundError),
+    ],
+)
+async def test_injected_errors(faults, error):
+    async with FakeOpenAI(faults) as server:
+        with pytest.raises(error) as info:
+            await _ask(server)
+
+    if error is openai.RateLimitError:
+        assert info.value.response.headers["retry-after"] == "1.0"
+        assert server.stats.rate_limited == 1
+
+
+async def test_malformed_content_is_cut_json():
+    async with FakeOpenAI(FaultConfig(malformed=1.0)) as server:
+        content = await _ask(server)
+
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(content)
+    assert server.stats.malformed == 1
+
+
+async def test_fault_rates_follow_seed():
+    faults = FaultConfig(rate_429=0.3, rate_5xx=0.2, seed=7)
+    outcomes = []
+    for _ in range(2):
+        async with FakeOpenAI(faults) as server:
+            for _ in range(20):
+                try:
+                    await _ask(server)
+                    outcomes.append("ok")
+                except openai.APIStatusError as e:
+                    outcomes.append(e.status_code)
+    first, second = outcomes[:20], outcomes[20:]
+
+    assert first == second
+    assert {"ok", 429, 500} == set(first)
+
+
+def test_parse_latency():
+    rng = random.Random(1)
+
+    assert parse_latency("fixed:1.5", rng)() == 1.5
+    assert 0.5 <= parse_latency("uniform:0.5,3", rng)() <= 3
+    assert parse_latency("lognormal:2,0.4", rng)() > 0
+    with pytest.raises(ValueError):
+        parse_latency("gamma:1", rng)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy import select
+
+from bot.utils.fsm_storage import PostgresStorage
+from db.connection import async_session
+from db.models import FsmRecord
+
+pytestmark = pytest.mark.anyio
+
+_users = itertools.count(1)
+
+
+@pytest.fixture
+def key() -> StorageKey:
+    user = next(_users)
+    return StorageKey(bot_id=42, chat_id=user, user_id=user)
+
+
+@pytest.fixture
+def storage() -> PostgresStorage:
+    return PostgresStorage(ttl=60)
+
+
+async def _row(storage: PostgresStorage, key: StorageKey) -> FsmRecord | None:
+    async with async_session() as s:
+        res = await s.execute(
+            select(FsmRecord).where(FsmRecord.key == storage.key_builder.build(key))
+        )
+        return res.scalar_one_or_none()
+
+
+async def test_update_data_merges(db, storage, key):
+    assert await storage.update_data(key, {"a": 1}) == {"a": 1}
+    assert await storage.update_data(key, {"b": 2, "a": 3}) == {"a": 3, "b": 2}
+    assert await storage.get_data(key) == {"a": 3, "b": 2}
+
+
+async def test_concurrent_updates_are_not_lost(db, storage, key):
+    await asyncio.gather(*(storage.update_data(key, {f"k{i}": i}) for i in range(10)))
+
+    assert await storage.get_data(key) == {f"k{i}": i for i in range(10)}
+
+
+async def test_update_data_keeps_state(db, storage, key):
+    await storage.set_state(key, "Form:name")
+    await storage.update_data(key, {"name": "Ann"})
+
+    assert await storage.get_state(key) == "Form:name"
+    assert await storage.get_data(key) == {"name": "Ann"}
+
+
+async def test_update_data_with_empty_dict_reads(db, storage, key):
+    await storage.set_data(key, {"a": 1})
+
+    assert await storage.update_data(key, {}) == {"a": 1}
+
+
+async def test_cleared_record_is_deleted(db, storage, key):
+    await storage.set_state(key, "Form:name")
+    await storage.update_data(key, {"a": 1})
+    await storage.set_data(key, {})
+    await storage.set_state(key, None)
+
+    assert await _row(storage, key) is None
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import pytest
+
+from bot import keyboards
+from bot.keyboards import vacancy_inline_kb, vacancy_page_kb
+from services import CompanyService, VacancyService
+
+pytestmark = pytest.mark.anyio
+
+OWNER = 777
+
+
+@pytest.fixture(scope="module")
+async def vacancy_ids(db):
+    company = await CompanyService.create_company(owner_id=OWNER, title="Keyboards")
+    return [(await VacancyService.create(company.id, f"kb {i}")).id for i in range(3)]
+
+
+def _callbacks(kb) -> list[str]:
+    return [b.callback_data for row in kb.inline_keyboard for b in row]
+
+
+async def test_pages_are_cached_per_snapshot(vacancy_ids):
+    first = await vacancy_page_kb()
+    assert await vacancy_page_kb() is first
+
+    cursor = vacancy_ids[0]
+    assert await vacancy_page_kb(after=cursor) is await vacancy_page_kb(after=cursor)
+
+
+async def test_unknown_cursors_are_not_cached(vacancy_ids):
+    await vacancy_page_kb()
+    size = len(keyboards._vacancy_kb_cache)
+
+    for cursor in range(10**9, 10**9 + 50):
+        kb = await vacancy_page_kb(after=cursor)
+        assert kb.inline_keyboard  # курсора нет — отдаём первую страницу
+
+    assert len(keyboards._vacancy_kb_cache) == size
+
+
+async def test_catalog_change_drops_cache(vacancy_ids):
+    before = await vacancy_page_kb()
+
+    company_id = (await VacancyService.by_id(vacancy_ids[0])).company_id
+    new = await VacancyService.create(company_id, "kb new")
+
+    assert await vacancy_page_kb() is not before
+    hr = await vacancy_inline_kb(owner_id=OWNER, mode="edit")
+    assert f"edit_{new.id}" in _callbacks(hr)
+
+
+async def test_hr_keyboard_lists_own_vacancies(vacancy_ids):
+    kb = await vacancy_inline_kb(owner_id=OWNER, mode="edit")
+
+    assert await vacancy_inline_kb(owner_id=OWNER, mode="edit") is kb
+    assert {f"edit_{i}" for i in vacancy_ids} <= set(_callbacks(kb))
+    other = await vacancy_inline_kb(owner_id=OWNER + 1, mode="edit")
+    assert not any(c.startswith("edit_") for c in _callbacks(other))
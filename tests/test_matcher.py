@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+import pytest
+
+from bot.utils.matcher import VacancyMatcher
+from services.read_models import CompanySummary, VacancyCard
+from services.vacancy_service import CatalogSnapshot
+
+
+def _card(vid: int, title: str, description: str) -> VacancyCard:
+    return VacancyCard(
+        id=vid,
+        company_id=1,
+        title=title,
+        description=description,
+        requirements="",
+        duties="",
+        conditions="",
+        is_active=True,
+        company=CompanySummary(id=1, title="Acme", owner_id=1),
+    )
+
+
+BACKEND = _card(1, "Python backend", "python asyncio postgres docker")
+FRONTEND = _card(2, "Frontend", "react typescript css webpack")
+DATA = _card(3, "Data engineer", "python spark airflow hadoop")
+PYTHON_CV = "Пишу на Python: asyncio, Postgres, Docker."
+
+
+@pytest.fixture
+def matcher() -> VacancyMatcher:
+    m = VacancyMatcher(capacity=2)
+    m.sync(CatalogSnapshot.build(1, (BACKEND, FRONTEND, DATA)))
+    return m
+
+
+def _ids(ranked) -> list[int]:
+    return [card.id for card, _ in ranked]
+
+
+def test_rank_orders_by_similarity(matcher):
+    ranked = matcher.rank(PYTHON_CV, k=3)
+
+    assert _ids(ranked) == [1, 3]  # фронтенд ниже MIN_SCORE
+    assert ranked[0][1] > ranked[1][1]
+
+
+def test_rank_excludes_current_vacancy(matcher):
+    assert _ids(matcher.rank(PYTHON_CV, k=3, exclude=1)) == [3]
+
+
+def test_rank_on_empty_matcher():
+    assert VacancyMatcher().rank(PYTHON_CV) == []
+
+
+def test_grows_past_capacity(matcher):
+    assert len(matcher) == 3
+    assert matcher._matrix.shape[0] == 4
+
+
+def test_sync_touches_only_changed_rows(matcher):
+    rows = dict(matcher._rows)
+    changed = replace(FRONTEND, description="python asyncio postgres docker")
+
+    matcher.sync(CatalogSnapshot.build(2, (BACKEND, changed)))
+
+    assert len(matcher) == 2
+    assert matcher._rows[1] == rows[1]
+    assert 3 not in matcher._rows
+    assert set(_ids(matcher.rank(PYTHON_CV, k=3))) == {1, 2}
+
+
+def test_dropped_rows_are_reused(matcher):
+    matcher.sync(CatalogSnapshot.build(2, (BACKEND,)))
+    size = matcher._matrix.shape[0]
+
+    matcher.sync(CatalogSnapshot.build(3, (BACKEND, FRONTEND, DATA)))
+
+    assert matcher._matrix.shape[0] == size
+    assert (matcher._df == (matcher._matrix > 0).sum(axis=0)).all()
+    assert _ids(matcher.rank(PYTHON_CV, k=3)) == [1, 3]
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import pytest
+
+from bot.utils.metrics import Registry, _Metric
+
+
+@pytest.fixture
+def registry() -> Registry:
+    return Registry()
+
+
+def _body(text: str) -> list[str]:
+    return [line for line in text.splitlines() if not line.startswith("#")]
+
+
+def test_counter_with_labels(registry):
+    errors = registry.counter("errors_total", "Ошибки", ("router",))
+    errors.inc(router="menu")
+    errors.inc(2, router='a"b\\c')
+
+    text = registry.render()
+
+    assert "# HELP errors_total Ошибки\n# TYPE errors_total counter\n" in text
+    assert _body(text) == [
+        'errors_total{router="menu"} 1',
+        'errors_total{router="a\\"b\\\\c"} 2',
+    ]
+    assert errors.value(router="menu") == 1
+
+
+def test_labels_must_match(registry):
+    errors = registry.counter("errors_total", "Ошибки", ("router",))
+
+    with pytest.raises(ValueError):
+        errors.inc(stage="x")
+    with pytest.raises(ValueError):
+        registry.counter("errors_total", "Дубль")
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    seconds = registry.histogram("op_seconds", "Время", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        seconds.observe(value)
+
+    assert _body(registry.render()) == [
+        'op_seconds_bucket{le="0.1"} 2',
+        'op_seconds_bucket{le="1.0"} 3',
+        'op_seconds_bucket{le="+Inf"} 4',
+        "op_seconds_sum 3.65",
+        "op_seconds_count 4",
+    ]
+
+
+def test_histogram_times_failed_block(registry):
+    seconds = registry.histogram("op_seconds", "Время", ("stage",))
+
+    with pytest.raises(RuntimeError):
+        with seconds.time(stage="parse"):
+            raise RuntimeError
+
+    assert 'op_seconds_count{stage="parse"} 1' in registry.render()
+
+
+def test_collectors(registry):
+    registry.collector(
+        "pool",
+        "Пул",
+        lambda: {"size": 3, "ratio": 0.5, "ok": True, "name": "x", "by": {"a": 1}},
+    )
+    registry.collector(
+        "queue", "Очередь", lambda: {"depth": {"high": 2, "low": 0}}, label="prio"
+    )
+    registry.collector("broken", "Сломан", lambda: 1 / 0)
+
+    text = registry.render()
+
+    assert "# TYPE pool_size gauge" in text
+    assert _body(text) == [
+        "pool_size 3",
+        "pool_ratio 0.5",
+        'queue_depth{prio="high"} 2',
+        'queue_depth{prio="low"} 0',
+    ]
+
+
+def test_metric_base_is_abstract():
+    with pytest.raises(TypeError):
+        _Metric("x", "x", ())
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from bot.utils import openai_scheduler as sched
+from bot.utils.openai_scheduler import (
+    OpenAIScheduler,
+    Priority,
+    Reservation,
+    TokenBucket,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Ручные часы вместо time.monotonic в планировщике."""
+    now = [1000.0]
+    monkeypatch.setattr(sched, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_bucket_refills_at_rate(clock):
+    bucket = TokenBucket(60)  # 1 в секунду
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+
+    clock[0] += 0.5
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+
+    clock[0] += 3600
+    assert bucket.wait_time(60) == 0.0
+    assert bucket.level == pytest.approx(60)  # не больше ёмкости
+
+
+def test_bucket_drain_and_give(clock):
+    bucket = TokenBucket(60)
+    bucket.take(100)  # сверка с usage может увести в минус
+    bucket.drain()
+    assert bucket.level == pytest.approx(-40)
+
+    bucket.give(1000)
+    assert bucket.level == pytest.approx(60)
+
+
+@pytest.mark.parametrize(
+    ("actual", "level", "tokens_used"),
+    [
+        (100, 900, 100),  # потратили меньше резерва — остаток вернулся
+        (500, 500, 500),  # больше резерва — добрали из бакета
+        (300, 700, 300),
+    ],
+)
+def test_reconcile_adjusts_tpm(clock, actual, level, tokens_used):
+    scheduler = OpenAIScheduler(rpm=60, tpm=1000)
+    scheduler.tpm.take(300)
+    reservation = Reservation(scheduler, 300)
+
+    reservation.reconcile(SimpleNamespace(total_tokens=actual))
+
+    assert scheduler.tpm.level == pytest.approx(level)
+    assert scheduler.tokens_used == tokens_used
+    assert reservation.tokens == actual
+
+
+def test_reconcile_without_usage_keeps_reservation(clock):
+    scheduler = OpenAIScheduler(rpm=60, tpm=1000)
+    scheduler.tpm.take(300)
+    Reservation(scheduler, 300).reconcile(None)
+
+    assert scheduler.tpm.level == pytest.approx(700)
+    assert scheduler.tokens_used == 0
+
+
+@pytest.mark.anyio
+async def test_interactive_goes_before_background(clock):
+    scheduler = OpenAIScheduler(rpm=60, tpm=100_000)
+    scheduler.rpm.drain()
+    order = []
+
+    async def acquire(name, priority):
+        await scheduler.acquire(10, priority)
+        order.append(name)
+
+    background = asyncio.create_task(acquire("background", Priority.BACKGROUND))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(acquire("interactive", Priority.INTERACTIVE))
+    await asyncio.sleep(0)
+    assert scheduler.waiting == 2
+
+    for _ in range(2):
+        clock[0] += 1
+        scheduler._dispatch()
+        await asyncio.sleep(0)
+    await asyncio.gather(background, interactive)
+
+    assert order == ["interactive", "background"]
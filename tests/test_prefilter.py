@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from bot.utils import prefilter as prefilter_module
+from bot.utils.prefilter import (
+    LexicalPrefilter,
+    PrefilterStats,
+    tokenize,
+    validate_resume,
+)
+from services.errors import InvalidResumeError
+from services.read_models import CompanySummary, VacancyCard
+from services.vacancy_service import CatalogSnapshot
+
+
+def _card(vid: int, title: str, description: str) -> VacancyCard:
+    return VacancyCard(
+        id=vid,
+        company_id=1,
+        title=title,
+        description=description,
+        requirements="",
+        duties="",
+        conditions="",
+        is_active=True,
+        company=CompanySummary(id=1, title="Acme", owner_id=1),
+    )
+
+
+CATALOG = (
+    _card(1, "Python backend", "Опыт работы с python, asyncio, postgres, docker"),
+    _card(2, "Frontend", "Опыт работы с react, typescript, css"),
+    _card(3, "Data engineer", "Опыт работы с python, spark, airflow"),
+)
+PYTHON_CV = (
+    "Backend-разработчик. Пять лет пишу на Python: asyncio, aiohttp, "
+    "Postgres, Docker, Kubernetes. Опыт работы в командах по 5-10 человек."
+)
+DESIGN_CV = "Графический дизайнер: фирменный стиль, иллюстрации, полиграфия."
+
+
+@pytest.fixture
+def prefilter() -> LexicalPrefilter:
+    pf = LexicalPrefilter(threshold=0.2)
+    pf._refresh(CatalogSnapshot.build(1, CATALOG))
+    return pf
+
+
+def test_tokenize_stems_and_drops_short_tokens():
+    assert tokenize("Python-разработчик, C# и k8s!") == [
+        "python",
+        "разраб",
+        "c#",
+        "k8s",
+    ]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "короткий текст",
+        "https://github.com/user " * 20,
+        "1234567890 -- // " * 30,
+    ],
+)
+def test_validate_resume_rejects_non_resumes(text):
+    with pytest.raises(InvalidResumeError):
+        validate_resume(text)
+
+
+def test_validate_resume_accepts_text():
+    validate_resume(PYTHON_CV * 2)
+
+
+def test_relevant_resume_scores_higher(prefilter):
+    vacancy = "\n".join([CATALOG[0].title, CATALOG[0].description])
+
+    relevant = prefilter.score(PYTHON_CV, vacancy)
+    irrelevant = prefilter.score(DESIGN_CV, vacancy)
+
+    assert 0.0 <= irrelevant < 0.2 <= relevant <= 1.0
+
+
+def test_common_words_weigh_less(prefilter):
+    # «опыт работы» есть во всех вакансиях, «asyncio» — только в одной
+    vacancy = CATALOG[0].description
+    common = prefilter.score("опыт работы " * 5, vacancy)
+    rare = prefilter.score("asyncio " * 5, vacancy)
+
+    assert rare > common
+
+
+def test_empty_texts_score_zero(prefilter):
+    assert prefilter.score("", "python") == 0.0
+    assert prefilter.score("python", "") == 0.0
+
+
+def test_agreement_and_false_rejects():
+    stats = PrefilterStats(llm_pass=40)
+    stats.record(0.5, 80)  # прошёл, LLM согласна
+    stats.record(0.1, 20)  # отклонён, LLM согласна
+    stats.record(0.1, 70, weight=2)  # отклонён зря, вес выборки аудита
+
+    assert stats.agreement(0.3) == pytest.approx(2 / 4)
+    assert stats.false_reject_rate(0.3) == pytest.approx(2 / 3)
+    assert stats.sweep([0.0])[0.0] == pytest.approx(3 / 4)
+
+
+@pytest.mark.anyio
+async def test_audit_records_weighted_sample(monkeypatch):
+    monkeypatch.setattr(prefilter_module.random, "random", lambda: 0.1)
+    stats = PrefilterStats(llm_pass=40, audit_rate=0.25)
+    stats.record(0.1, 20)
+    stats.record(0.1, 20)
+
+    async def analyse():
+        return {"rating": 90}
+
+    assert stats.audit(0.05, analyse)
+    await asyncio.gather(*stats._audits)
+
+    # аудит представляет 1 / audit_rate = 4 отклонённых резюме
+    assert stats.audited == 1
+    assert stats.false_reject_rate(0.3) == pytest.approx(4 / 6)
+
+
+@pytest.mark.anyio
+async def test_audit_is_capped_and_survives_errors():
+    stats = PrefilterStats(audit_rate=1.0, max_audits=2)
+    gate = asyncio.Event()
+
+    async def slow():
+        await gate.wait()
+        raise RuntimeError("openai down")
+
+    assert [stats.audit(0.0, slow) for _ in range(3)] == [True, True, False]
+    gate.set()
+    await asyncio.gather(*stats._audits)
+
+    assert stats.audited == 0
+    assert stats.stats()["samples"] == 0
+
+
+@pytest.mark.anyio
+async def test_audit_disabled_and_shutdown():
+    async def never():
+        await asyncio.Event().wait()
+
+    assert not PrefilterStats(audit_rate=0.0).audit(0.0, never)
+
+    stats = PrefilterStats(audit_rate=1.0)
+    stats.audit(0.0, never)
+    await stats.shutdown()
+    assert not stats._audits
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+
+def test_services_import_without_bot():
+    # services — слой над БД: импорт пакета не должен тянуть bot.*
+    # (bot.utils.resume_store сам импортирует services — был бы цикл)
+    code = (
+        "import sys, services; "
+        "from services import ResumeService, ResumeFileService; "
+        "assert not [m for m in sys.modules if m.split('.')[0] == 'bot'], "
+        "sorted(m for m in sys.modules if m.startswith('bot'))"
+    )
+    root = Path(__file__).resolve().parents[1]
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=root)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from bot.utils.fsm_storage import PostgresStorage
+from bot.utils.token_store import TokenStore
+
+pytestmark = pytest.mark.anyio
+
+USER = dict(bot_id=42, user_id=4242)
+
+
+class BrokenStorage(PostgresStorage):
+    """Общее хранилище, которое лежит: любая запись/чтение падает."""
+
+    async def set_data(self, key, data) -> None:
+        raise ConnectionError("db is down")
+
+    async def pop_data(self, key):
+        raise ConnectionError("db is down")
+
+
+def _store(storage=None, **kw) -> TokenStore:
+    store = TokenStore(namespace="test", max_items=kw.pop("max_items", 100), ttl=60)
+    if storage is not None:
+        store.attach(storage)
+    return store
+
+
+async def test_local_only():
+    store = _store()
+    token = await store.put("tips", **USER)
+
+    assert await store.pop(token, **USER) == "tips"
+    assert await store.pop(token, **USER) is None
+
+
+async def test_lru_and_ttl():
+    store = _store(max_items=2)
+    tokens = [await store.put(str(i), **USER) for i in range(3)]
+    assert store.evictions == 1
+    assert await store.pop(tokens[0], **USER) is None
+
+    store._items[tokens[1]].expires_at = time.time() - 1
+    assert await store.pop(tokens[1], **USER) is None
+    assert store.expired == 1
+
+
+async def test_shared_token_is_redeemed_once_across_processes(db):
+    issuer, other = _store(PostgresStorage(ttl=60)), _store(PostgresStorage(ttl=60))
+    token = await issuer.put("tips", **USER)
+
+    results = await asyncio.gather(
+        other.pop(token, **USER), other.pop(token, **USER), issuer.pop(token, **USER)
+    )
+
+    assert results.count("tips") == 1 and results.count(None) == 2
+
+
+async def test_other_process_reads_shared_token(db):
+    issuer, other = _store(PostgresStorage(ttl=60)), _store(PostgresStorage(ttl=60))
+    token = await issuer.put("tips", **USER)
+
+    assert await other.pop(token, **USER) == "tips"
+    assert other.shared_hits == 1
+    # токен уже забран — память выдавшего процесса его не воскрешает
+    assert await issuer.pop(token, **USER) is None
+
+
+async def test_failed_shared_write_falls_back_to_memory(db):
+    shared = PostgresStorage(ttl=60)
+    store = _store(shared)
+    store._shared = BrokenStorage(ttl=60)
+    token = await store.put("tips", **USER)
+
+    store._shared = shared  # хранилище поднялось, но записи в нём нет
+    assert await store.pop(token, **USER) == "tips"
+    assert await store.pop(token, **USER) is None
+
+
+async def test_shared_read_error_falls_back_to_memory(db):
+    store = _store(PostgresStorage(ttl=60))
+    token = await store.put("tips", **USER)
+
+    store._shared = BrokenStorage(ttl=60)
+    assert await store.pop(token, **USER) == "tips"
+    assert len(store) == 0
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from db.connection import async_session
+from db.models import Company
+from db.uow import UnitOfWork, release_connection
+from services import CompanyService
+from tools.bench import FakeBotSession
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingSession(FakeBotSession):
+    """Запоминает, была ли открыта транзакция UoW в момент запроса."""
+
+    def __init__(self) -> None:
+        super().__init__(latency=0, files={})
+        self.in_transaction: list[bool] = []
+
+    async def make_request(self, bot, method, timeout=None):
+        uow = UnitOfWork.current()
+        self.in_transaction.append(uow is not None and uow.session.in_transaction())
+        return await super().make_request(bot, method, timeout)
+
+
+async def _titles(owner_id: int) -> list[str]:
+    async with async_session() as s:
+        res = await s.execute(select(Company.title).where(Company.owner_id == owner_id))
+        return list(res.scalars())
+
+
+async def test_send_commits_and_releases_connection(db):
+    from main import create_bot
+
+    session = RecordingSession()
+    bot = create_bot(session=session)
+
+    async with UnitOfWork() as uow:
+        await CompanyService.create_company(owner_id=9001, title="Before send")
+        assert uow.session.in_transaction()
+
+        await bot.send_message(9001, "✅ создана")
+
+        assert session.in_transaction == [False]
+        assert await _titles(9001) == ["Before send"]  # видно другим сессиям
+
+        await CompanyService.create_company(owner_id=9001, title="After send")
+
+    assert sorted(await _titles(9001)) == ["After send", "Before send"]
+
+
+async def test_tasks_started_from_handler_do_not_commit(db):
+    async with UnitOfWork() as uow:
+        await CompanyService.create_company(owner_id=9002, title="Pending")
+
+        await asyncio.create_task(release_connection())
+
+        assert uow.session.in_transaction()
+        assert await _titles(9002) == []
+
+        await release_connection()
+        assert not uow.session.in_transaction()
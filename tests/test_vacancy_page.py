@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import select
+
+from db.connection import async_session
+from db.models import Company, Vacancy
+from services import CompanyService, VacancyService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(scope="module")
+async def catalog(db):
+    """
+    Компании с совпадающими названиями и неактивная вакансия: порядок
+    внутри одного названия задаёт только id вакансии.
+    """
+    for title, vacancies in (("Beta", 3), ("Alpha", 2), ("Beta", 2), ("Gamma", 1)):
+        company = await CompanyService.create_company(owner_id=1, title=title)
+        for i in range(vacancies):
+            await VacancyService.create(company.id, f"{title} {i}")
+    hidden = await VacancyService.create(company.id, "closed")
+    await VacancyService.deactivate(hidden.id)
+
+    async with async_session() as s:
+        res = await s.execute(
+            select(Vacancy.id)
+            .join(Company)
+            .where(Vacancy.is_active.is_(True))
+            .order_by(Company.title, Vacancy.id)
+        )
+        return [row.id for row in res]
+
+
+def _ids(page) -> list[int]:
+    return [card.id for card in page.cards]
+
+
+async def test_forward_walk_covers_catalog_once(catalog):
+    page = await VacancyService.page(limit=3)
+    assert not page.has_prev
+    seen = _ids(page)
+    while page.has_next:
+        page = await VacancyService.page(after=seen[-1], limit=3)
+        assert page.has_prev
+        seen += _ids(page)
+
+    assert seen == catalog
+
+
+async def test_backward_walk_mirrors_forward(catalog):
+    last = await VacancyService.page(after=catalog[-4], limit=3)
+    assert _ids(last) == catalog[-3:]
+    assert not last.has_next
+
+    page = await VacancyService.page(before=catalog[-3], limit=3)
+    assert _ids(page) == catalog[-6:-3]
+    assert page.has_next
+
+    first = await VacancyService.page(before=catalog[2], limit=3)
+    assert _ids(first) == catalog[:2]
+    assert not first.has_prev
+
+
+async def test_inactive_vacancies_are_skipped(catalog):
+    async with async_session() as s:
+        hidden = (
+            await s.execute(select(Vacancy.id).where(Vacancy.is_active.is_(False)))
+        ).scalars()
+        hidden = set(hidden)
+
+    assert hidden
+    assert not hidden & set(catalog)
+
+
+async def test_missing_cursor_restarts(catalog):
+    page = await VacancyService.page(after=10**9, limit=3)
+
+    assert _ids(page) == catalog[:3]
+    assert not page.has_prev
@@ -0,0 +1,101 @@
+"""
+Webhook целиком: aiohttp-приложение из ``bot.webhook`` с настоящим
+Dispatcher, апдейты шлёт ``tools.fake_telegram``, ответы Telegram
+отдаёт подменная сессия из ``tools.bench``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from aiohttp import ClientSession
+from aiohttp.test_utils import TestServer
+
+from bot.webhook import build_app
+from settings.config import setup
+from tools.bench import FakeBotSession
+from tools.fake_telegram import FakeTelegram
+
+pytestmark = pytest.mark.anyio
+
+SECRET = "test-secret"
+
+
+@pytest.fixture(scope="session")
+async def server(db):
+    # роутеры — модульные синглтоны: Dispatcher один на весь прогон
+    from main import build_dispatcher, create_bot
+
+    session = FakeBotSession(latency=0, files={})
+    app = build_app(build_dispatcher(), create_bot(session=session), secret=SECRET)
+    async with TestServer(app) as srv:
+        yield srv, session
+
+
+async def _wait_for(predicate, timeout: float = 5.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "бот не ответил"
+        await asyncio.sleep(0.01)
+
+
+async def test_start_is_answered(server):
+    srv, session = server
+    before = session.calls["SendMessage"]
+
+    async with FakeTelegram(str(srv.make_url(setup.webhook_path)), secret=SECRET) as tg:
+        assert await tg.post(tg.message(1001, "/start")) == 200
+
+    await _wait_for(lambda: session.calls["SendMessage"] > before)
+
+
+async def test_concurrent_users(server):
+    srv, session = server
+    before = session.calls["SendMessage"]
+
+    async with FakeTelegram(str(srv.make_url(setup.webhook_path)), secret=SECRET) as tg:
+        updates = [tg.message(2000 + i, "/info") for i in range(20)]
+        statuses = await asyncio.gather(*(tg.post(u) for u in updates))
+
+    assert statuses == [200] * 20
+    await _wait_for(lambda: session.calls["SendMessage"] >= before + 20)
+
+
+@pytest.mark.parametrize(
+    "data", ["vpage_next_abc", "vpage_up_1", "vpage_", "vpage_next_-1"]
+)
+async def test_stale_page_button_is_answered(server, data):
+    srv, session = server
+    answered = session.calls["AnswerCallbackQuery"]
+    edited = session.calls["EditMessageReplyMarkup"]
+
+    async with FakeTelegram(str(srv.make_url(setup.webhook_path)), secret=SECRET) as tg:
+        assert await tg.post(tg.callback(4001, data)) == 200
+
+    await _wait_for(lambda: session.calls["AnswerCallbackQuery"] > answered)
+    assert session.calls["EditMessageReplyMarkup"] == edited
+
+
+async def test_wrong_secret_is_rejected(server):
+    srv, session = server
+    before = dict(session.calls)
+
+    async with FakeTelegram(str(srv.make_url(setup.webhook_path)), secret="nope") as tg:
+        assert await tg.post(tg.message(3001, "/start")) == 401
+
+    await asyncio.sleep(0.05)
+    assert dict(session.calls) == before
+
+
+async def test_healthz(server):
+    srv, _ = server
+
+    async with ClientSession() as http:
+        async with http.get(srv.make_url("/healthz")) as resp:
+            assert resp.status == 200
+            body = await resp.json()
+
+    assert body["status"] == "ok"
+    assert body["updates"] is not None
@@ -0,0 +1,483 @@
+"""
+Нагрузочный прогон бота без Telegram и OpenAI.
+
+Собирает настоящий Dispatcher из ``main.build_dispatcher`` и кормит его
+синтетическими апдейтами через ``feed_update``. Ответы Telegram отдаёт
+подменная сессия бота, ответы модели — заглушка с заданной задержкой.
+
+    python -m tools.bench --candidates 200 --hr 20 --concurrency 50 \\
+        --database-url sqlite+aiosqlite:///bench.db --out bench.json
+
+Сценарий соискателя: /start → «Я соискатель» → vac_ → respond_ → файл
+резюме → tips_; сценарий HR: «Я HR» → компания → вакансия → список
+вакансий на редактирование. В отчёте — пропускная способность,
+p50/p95/p99 по шагам и задержки event loop; JSON для сравнения прогонов.
+
+Для SQLite нужен ``aiosqlite`` (схема создаётся сама), для Postgres —
+база с применёнными миграциями.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Awaitable, Callable, Dict, List
+
+import numpy as np
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import GetFile, GetMe, TelegramMethod
+from aiogram.types import InlineKeyboardMarkup, Message, Update
+
+if TYPE_CHECKING:
+    from tools.fake_telegram import FakeTelegram
+
+RESUME_WORDS = (
+    "python asyncio postgres sql docker kubernetes aiogram fastapi django "
+    "redis kafka linux git ci/cd тестирование архитектура микросервисы "
+    "команда менторство аналитика высоконагруженные сервисы оптимизация"
+).split()
+
+
+#  подменный Telegram
+
+
+class FakeBotSession(BaseSession):
+    """
+    Отвечает на методы Bot API без сети. Ответ проходит обычный
+    ``check_response`` — хендлеры получают настоящие объекты aiogram.
+    """
+
+    def __init__(self, *, latency: float, files: Dict[str, bytes]) -> None:
+        super().__init__()
+        self.latency = latency
+        self.files = files  # file_id → содержимое резюме
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.tips: Dict[int, str] = {}  # chat_id → последний токен советов
+        self._message_ids = iter(range(1, 1 << 62))
+
+    def _payload(self, bot: Bot, method: TelegramMethod) -> Any:
+        if isinstance(method, GetMe):
+            return {"id": bot.id, "is_bot": True, "first_name": "bench"}
+        if isinstance(method, GetFile):
+            return {
+                "file_id": method.file_id,
+                "file_unique_id": method.file_id[-16:],
+                "file_path": f"documents/{method.file_id}",
+            }
+        if Message in getattr(method.__returning__, "__args__", ()) or (
+            method.__returning__ is Message
+        ):
+            chat_id = getattr(method, "chat_id", None) or 0
+            return {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": getattr(method, "text", None) or "…",
+            }
+        return True
+
+    def _remember_tips(self, method: TelegramMethod) -> None:
+        markup = getattr(method, "reply_markup", None)
+        if not isinstance(markup, InlineKeyboardMarkup):
+            return
+        for row in markup.inline_keyboard:
+            for button in row:
+                data = button.callback_data or ""
+                if data.startswith("tips_") and not data.startswith("tips_no_"):
+                    self.tips[int(method.chat_id)] = data
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod, timeout: int | None = None
+    ) -> Any:
+        self.calls[type(method).__name__] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self._remember_tips(method)
+        content = json.dumps({"ok": True, "result": self._payload(bot, method)})
+        response = self.check_response(
+            bot=bot, method=method, status_code=200, content=content
+        )
+        return response.result
+
+    async def stream_content(
+        self,
+        url: str,
+        headers: Dict[str, Any] | None = None,
+        timeout: int = 30,
+        chunk_size: int = 65536,
+        raise_for_status: bool = True,
+    ) -> AsyncGenerator[bytes, None]:
+        data = self.files[url.rsplit("/", 1)[1]]
+        for i in range(0, len(data), chunk_size):
+            yield data[i : i + chunk_size]
+
+    async def close(self) -> None:
+        pass
+
+
+#  заглушка OpenAI
+
+
+class StubCompletions:
+    def __init__(self, *, latency: float, pass_rate: float) -> None:
+        self.latency = latency
+        self.pass_rate = pass_rate
+        self.calls = 0
+
+    async def create(self, **body: Any) -> SimpleNamespace:
+        self.calls += 1
+        # логнормальный разброс вокруг медианы latency — как у живой модели
+        await asyncio.sleep(self.latency * random.lognormvariate(0, 0.35))
+        rating = random.randint(40, 95) if random.random() < self.pass_rate else 20
+        content = json.dumps(
+            {
+                "rating": rating,
+                "strong": "опыт с asyncio",
+                "weak": "мало продакшена",
+                "matched_experience": "бэкенд на Python",
+                "missing_experience": "",
+                "water": "нет",
+                "mismatches": "",
+                "suspicious": "",
+                "interview_questions": ["вопрос 1", "вопрос 2", "вопрос 3"],
+                "interview_tips": "Подготовьте рассказ о проектах.",
+            },
+            ensure_ascii=False,
+        )
+        prompt = sum(len(m["content"]) for m in body.get("messages", ())) // 3
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt,
+                completion_tokens=300,
+                total_tokens=prompt + 300,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=0),
+            ),
+        )
+
+
+def stub_openai(completions: StubCompletions) -> None:
+    from bot.utils.openai_client import set_openai_client
+
+    set_openai_client(SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+
+
+#  замеры
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.skipped: Dict[str, int] = defaultdict(int)
+        self.updates = 0
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        steps = {}
+        for name in sorted({*self.latencies, *self.errors, *self.skipped}):
+            values = np.asarray(self.latencies.get(name, ()), dtype=np.float64)
+            row: Dict[str, float] = {
+                "count": int(values.size),
+                "errors": self.errors.get(name, 0),
+                "skipped": self.skipped.get(name, 0),
+            }
+            if values.size:
+                p50, p95, p99 = np.percentile(values, [50, 95, 99])
+                row.update(
+                    mean_ms=values.mean() * 1000,
+                    p50_ms=p50 * 1000,
+                    p95_ms=p95 * 1000,
+                    p99_ms=p99 * 1000,
+                    max_ms=values.max() * 1000,
+                )
+            steps[name] = row
+        return steps
+
+
+class LoopLag:
+    """Насколько event loop опаздывает разбудить задачу, спящую ``interval``."""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(time.perf_counter() - started - self.interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> Dict[str, float]:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        lag = np.asarray(self.samples or [0.0], dtype=np.float64) * 1000
+        p50, p99 = np.percentile(lag, [50, 99])
+        return {"p50_ms": p50, "p99_ms": p99, "max_ms": lag.max()}
+
+
+#  сценарии
+
+
+class Bench:
+    def __init__(
+        self,
+        dp: Dispatcher,
+        bot: Bot,
+        session: FakeBotSession,
+        tg: FakeTelegram,
+        run_id: str,
+    ) -> None:
+        self.dp = dp
+        self.bot = bot
+        self.session = session
+        self.run_id = run_id
+        self.tg = tg  # только конструкторы апдейтов, без HTTP
+        self.rec = Recorder()
+        self.vacancy_ids: List[int] = []
+
+    async def step(self, name: str, update: Dict[str, Any]) -> bool:
+        started = time.perf_counter()
+        try:
+            await self.dp.feed_update(
+                self.bot, Update.model_validate(update, context={"bot": self.bot})
+            )
+        except Exception:
+            self.rec.errors[name] += 1
+            return False
+        finally:
+            self.rec.updates += 1
+        self.rec.latencies[name].append(time.perf_counter() - started)
+        return True
+
+    async def seed(self, vacancies: int) -> None:
+        from services import CompanyService, VacancyService
+
+        owner = 3_000_000
+        company = await CompanyService.create_company(
+            owner_id=owner, title=f"Bench {self.run_id}"
+        )
+        for i in range(vacancies):
+            vac = await VacancyService.create(
+                company_id=company.id,
+                title=f"Python-разработчик {i}",
+                description="Ищем бэкенд-разработчика: " + " ".join(RESUME_WORDS),
+            )
+            self.vacancy_ids.append(vac.id)
+
+    def resume(self, user_id: int) -> str:
+        # у каждого кандидата свой текст: иначе сработают кэши файлов и анализов
+        words = random.choices(RESUME_WORDS, k=120)
+        return f"Кандидат {user_id} ({self.run_id})\n" + " ".join(words)
+
+    async def candidate(self, user_id: int) -> None:
+        tg = self.tg
+        vac_id = random.choice(self.vacancy_ids)
+        steps: List[tuple[str, Callable[[], Dict[str, Any]]]] = [
+            ("start", lambda: tg.message(user_id, "/start")),
+            ("role_candidate", lambda: tg.message(user_id, "Я соискатель")),
+            ("vacancy", lambda: tg.callback(user_id, f"vac_{vac_id}")),
+            ("respond", lambda: tg.callback(user_id, f"respond_{vac_id}")),
+        ]
+        for name, update in steps:
+            if not await self.step(name, update()):
+                return
+
+        file_id = f"bench-{self.run_id}-{user_id}.txt"
+        self.session.files[file_id] = self.resume(user_id).encode("utf-8")
+        size = len(self.session.files[file_id])
+        upload = tg.document(user_id, "cv.txt", file_id=file_id, file_size=size)
+        if not await self.step("upload", upload):
+            return
+
+        token = self.session.tips.pop(user_id, None)
+        if token is None:  # отказ — кнопки советов не было
+            self.rec.skipped["tips"] += 1
+            return
+        await self.step("tips", tg.callback(user_id, token))
+
+    async def hr(self, user_id: int) -> None:
+        tg = self.tg
+        steps = [
+            ("hr_role", "Я HR"),
+            ("hr_new_company", "🏢 Создать компанию"),
+            ("hr_company_title", f"Bench HR {self.run_id}-{user_id}"),
+            ("hr_new_vacancy", "➕ Создать вакансию"),
+            ("hr_vacancy_title", "Data Engineer"),
+            ("hr_vacancy_description", "Spark, Airflow, SQL"),
+            ("hr_edit_vacancies", "✏️ Редактировать вакансии"),
+        ]
+        for name, text in steps:
+            if not await self.step(name, tg.message(user_id, text)):
+                return
+
+
+async def _limited(sem: asyncio.Semaphore, flow: Awaitable[None]) -> None:
+    async with sem:
+        await flow
+
+
+async def _create_schema() -> None:
+    import db.models  # noqa: F401  — регистрируем таблицы в metadata
+    from db.connection import Base, engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    # модули бота читают настройки при импорте — только после main()
+    from bot.utils.analysis_cache import analysis_cache
+    from bot.utils.openai_scheduler import openai_scheduler
+    from db.connection import engine
+    from main import build_dispatcher, create_bot
+    from tools.fake_telegram import FakeTelegram
+
+    if args.create_schema:
+        await _create_schema()
+
+    completions = StubCompletions(latency=args.llm_latency, pass_rate=args.pass_rate)
+    if not args.openai_base_url:  # иначе — настоящий клиент и tools.fake_openai
+        stub_openai(completions)
+
+    session = FakeBotSession(latency=args.tg_latency, files={})
+    bot = create_bot(session=session)
+    dp = build_dispatcher()
+    bench = Bench(dp, bot, session, FakeTelegram(""), uuid.uuid4().hex[:8])
+
+    # как в start_polling: хуки получают dispatcher и workflow_data
+    hook_kwargs = {**dp.workflow_data, "dispatcher": dp, "bot": bot}
+    await dp.emit_startup(**hook_kwargs)
+    try:
+        await bench.seed(args.vacancies)
+
+        flows = [bench.candidate(4_000_000 + i) for i in range(args.candidates)]
+        flows += [bench.hr(5_000_000 + i) for i in range(args.hr)]
+        random.shuffle(flows)
+
+        sem = asyncio.Semaphore(args.concurrency)
+        lag = LoopLag()
+        lag.start()
+        started = time.perf_counter()
+        await asyncio.gather(*(_limited(sem, f) for f in flows))
+        elapsed = time.perf_counter() - started
+        loop_lag = await lag.stop()
+    finally:
+        await dp.emit_shutdown(**hook_kwargs)
+        await engine.dispose()
+
+    return {
+        "config": vars(args),
+        "duration_s": elapsed,
+        "flows": len(flows),
+        "flows_per_s": len(flows) / elapsed,
+        "updates": bench.rec.updates,
+        "updates_per_s": bench.rec.updates / elapsed,
+        "steps": bench.rec.summary(),
+        "loop_lag": loop_lag,
+        "telegram_calls": dict(session.calls),
+        "llm_calls": completions.calls,
+        "openai_tokens_used": openai_scheduler.tokens_used,
+        "analysis_cache": analysis_cache.stats(),
+    }
+
+
+def _print(report: Dict[str, Any]) -> None:
+    print(
+        f"{report['flows']} сценариев за {report['duration_s']:.1f} с: "
+        f"{report['flows_per_s']:.1f} сценариев/с, "
+        f"{report['updates_per_s']:.1f} апдейтов/с"
+    )
+    print(f"{'шаг':<24}{'n':>6}{'err':>5}{'p50':>9}{'p95':>9}{'p99':>9}  мс")
+    for name, row in report["steps"].items():
+        print(
+            f"{name:<24}{row['count']:>6}{row['errors']:>5}"
+            f"{row.get('p50_ms', 0):>9.1f}{row.get('p95_ms', 0):>9.1f}"
+            f"{row.get('p99_ms', 0):>9.1f}"
+        )
+    lag = report["loop_lag"]
+    print(
+        f"event loop lag: p50 {lag['p50_ms']:.1f} мс, p99 {lag['p99_ms']:.1f} мс, "
+        f"max {lag['max_ms']:.1f} мс"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон бота")
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--hr", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--vacancies", type=int, default=20)
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("DATABASE_URL"),
+        help="по умолчанию — временная SQLite (нужен aiosqlite)",
+    )
+    parser.add_argument(
+        "--create-schema",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="create_all перед прогоном (для SQLite включено)",
+    )
+    parser.add_argument("--llm-latency", type=float, default=2.0, help="сек.")
+    parser.add_argument("--pass-rate", type=float, default=0.7)
+    parser.add_argument("--tg-latency", type=float, default=0.0, help="сек.")
+    parser.add_argument(
+        "--openai-base-url",
+        default=None,
+        help="OpenAI-совместимый сервер (tools.fake_openai) вместо заглушки",
+    )
+    parser.add_argument("--openai-rpm", type=int, default=None)
+    parser.add_argument("--openai-tpm", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default=None, help="куда сохранить JSON-отчёт")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="hrbot-bench-")
+    if args.database_url is None:
+        args.database_url = f"sqlite+aiosqlite:///{workdir}/bench.db"
+    if args.create_schema is None:
+        args.create_schema = args.database_url.startswith("sqlite")
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    # настройки читаются при импорте модулей бота — окружение задаём до него
+    env = {
+        "DATABASE_URL": args.database_url,
+        "DATA_DIR": os.path.join(workdir, "resumes"),
+        "METRICS_PORT": "0",
+        "FSM_STORAGE": "memory",
+    }
+    if args.openai_base_url:
+        env["OPENAI_BASE_URL"] = args.openai_base_url
+    if args.openai_rpm:
+        env["OPENAI_RPM"] = str(args.openai_rpm)
+    if args.openai_tpm:
+        env["OPENAI_TPM"] = str(args.openai_tpm)
+    os.environ.update(env)
+    os.environ.setdefault("TELEGRAM_TOKEN", "123456:bench")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("SUMMARY_CHAT_ID", "0")
+
+    report = asyncio.run(run(args))
+    _print(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
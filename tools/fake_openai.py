@@ -0,0 +1,349 @@
+"""
+Локальный OpenAI-совместимый сервер для chat completions: воспроизводит
+записанные ответы по хэшу промпта и умеет «портить» апстрим — задержки,
+429, 5xx и битый JSON. Бот направляется на него через настройки:
+
+    python -m tools.fake_openai --port 8099 --cassette data/openai.jsonl \\
+        --latency lognormal:2,0.4 --rate-429 0.05 --malformed 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8099/v1 python main.py
+
+Запись кассеты — проксированием на настоящий OpenAI (нужен ключ):
+
+    python -m tools.fake_openai --record --cassette data/openai.jsonl
+
+Без записи под ключ отвечает синтетическим анализом (``--missing 404`` —
+ошибкой). Из кода — в том же процессе::
+
+    async with FakeOpenAI(FaultConfig(rate_429=0.1)) as server:
+        client = AsyncOpenAI(api_key="x", base_url=server.url)
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from aiohttp import ClientSession, web
+
+log = logging.getLogger(__name__)
+
+UPSTREAM = "https://api.openai.com/v1"
+
+
+#  задержки и сбои
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """
+    ``fixed:1.5`` | ``uniform:0.5,3`` | ``lognormal:<медиана>,<sigma>``
+    | ``exp:<среднее>`` — секунды.
+    """
+    kind, _, params = spec.partition(":")
+    args = [float(x) for x in params.split(",")] if params else []
+    if kind == "fixed":
+        return lambda: args[0]
+    if kind == "uniform":
+        return lambda: rng.uniform(args[0], args[1])
+    if kind == "lognormal":
+        return lambda: args[0] * rng.lognormvariate(0, args[1])
+    if kind == "exp":
+        return lambda: rng.expovariate(1 / args[0])
+    raise ValueError(f"неизвестное распределение задержки: {spec}")
+
+
+@dataclass
+class FaultConfig:
+    latency: str = "fixed:0"
+    rate_429: float = 0.0
+    retry_after: float = 1.0  # сек., заголовок retry-after у 429
+    rate_5xx: float = 0.0
+    malformed: float = 0.0  # доля ответов с обрезанным JSON в content
+    missing: str = "synthetic"  # нет записи под ключ: synthetic | 404
+    seed: int | None = None
+
+
+@dataclass
+class ServerStats:
+    requests: int = 0
+    replayed: int = 0
+    recorded: int = 0
+    synthetic: int = 0
+    rate_limited: int = 0
+    server_errors: int = 0
+    malformed: int = 0
+    by_key: Dict[str, int] = field(default_factory=dict)
+
+
+#  кассета
+
+
+def prompt_key(body: Dict[str, Any]) -> str:
+    """Ключ записи: модель + сообщения + формат ответа, без temperature и т. п."""
+    canonical = json.dumps(
+        {
+            "model": body.get("model"),
+            "messages": body.get("messages"),
+            "response_format": body.get("response_format"),
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """JSON Lines: ``{"key": …, "response": <ответ chat.completions>}``."""
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        if path is not None and path.exists():
+            with path.open(encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.responses[entry["key"]] = entry["response"]
+
+    def get(self, key: str) -> Dict[str, Any] | None:
+        return self.responses.get(key)
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        self.responses[key] = response
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps({"key": key, "response": response}) + "\n")
+
+
+def synthetic_response(body: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """Правдоподобный анализ резюме; рейтинг детерминирован ключом."""
+    rating = int(key[:4], 16) % 101
+    content = json.dumps(
+        {
+            "rating": rating,
+            "strong": "—",
+            "weak": "—",
+            "matched_experience": "—",
+            "missing_experience": "",
+            "water": "—",
+            "mismatches": "",
+            "suspicious": "",
+            "interview_questions": ["вопрос 1", "вопрос 2", "вопрос 3"],
+            "interview_tips": "Подготовьте рассказ о последних проектах.",
+        },
+        ensure_ascii=False,
+    )
+    prompt = sum(len(m.get("content") or "") for m in body.get("messages", ())) // 3
+    completion = len(content) // 3
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o-mini"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "total_tokens": prompt + completion,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        },
+    }
+
+
+def _error(status: int, message: str, code: str, **headers: str) -> web.Response:
+    body = {"error": {"message": message, "type": code, "code": code}}
+    return web.json_response(body, status=status, headers=headers)
+
+
+#  сервер
+
+
+class FakeOpenAI:
+    def __init__(
+        self,
+        faults: FaultConfig | None = None,
+        *,
+        cassette: Path | None = None,
+        record: bool = False,
+        upstream: str = UPSTREAM,
+        api_key: str | None = None,
+    ) -> None:
+        self.faults = faults or FaultConfig()
+        self.cassette = Cassette(cassette)
+        self.record = record
+        self.upstream = upstream.rstrip("/")
+        self.api_key = api_key
+        self.stats = ServerStats()
+
+        self._random = random.Random(self.faults.seed)
+        self._latency = parse_latency(self.faults.latency, self._random)
+        self._runner: web.AppRunner | None = None
+        self._http: ClientSession | None = None
+        self.url = ""
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        # base_url бывает и с /v1, и без
+        app.router.add_post("/v1/chat/completions", self._completions)
+        app.router.add_post("/chat/completions", self._completions)
+        app.router.add_get("/stats", self._stats)
+        return app
+
+    # ─────────────── жизненный цикл ───────────────
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Запустить сервер; вернуть base_url для AsyncOpenAI."""
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # порт 0 — выбирает ОС
+        self.url = f"http://{host}:{port}/v1"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> FakeOpenAI:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.stop()
+
+    # ─────────────── обработчики ───────────────
+    async def _stats(self, request: web.Request) -> web.Response:
+        stats = dict(vars(self.stats))
+        stats["by_key"] = len(self.stats.by_key)
+        return web.json_response(stats)
+
+    async def _completions(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        key = prompt_key(body)
+        self.stats.requests += 1
+        self.stats.by_key[key] = self.stats.by_key.get(key, 0) + 1
+
+        roll = self._random.random()
+        f = self.faults
+        if roll < f.rate_429:
+            self.stats.rate_limited += 1
+            return _error(
+                429,
+                "Rate limit reached (injected)",
+                "rate_limit_exceeded",
+                **{"retry-after": str(f.retry_after)},
+            )
+        if roll < f.rate_429 + f.rate_5xx:
+            self.stats.server_errors += 1
+            await asyncio.sleep(self._latency())
+            return _error(500, "The server had an error (injected)", "server_error")
+
+        await asyncio.sleep(self._latency())
+
+        response = self.cassette.get(key)
+        if response is not None:
+            self.stats.replayed += 1
+        elif self.record:
+            response = await self._forward(body)
+            self.cassette.put(key, response)
+            self.stats.recorded += 1
+        elif f.missing == "404":
+            return _error(404, f"no recording for prompt {key[:12]}", "not_found")
+        else:
+            response = synthetic_response(body, key)
+            self.stats.synthetic += 1
+
+        if self._random.random() < f.malformed:
+            self.stats.malformed += 1
+            response = json.loads(json.dumps(response))
+            content = response["choices"][0]["message"]["content"] or ""
+            response["choices"][0]["message"]["content"] = content[: len(content) // 2]
+        return web.json_response(response)
+
+    async def _forward(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        if self._http is None:
+            self._http = ClientSession()
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        async with self._http.post(
+            f"{self.upstream}/chat/completions", json=body, headers=headers
+        ) as resp:
+            resp.raise_for_status()
+            return await resp.json()
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    faults = FaultConfig(
+        latency=args.latency,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        rate_5xx=args.rate_5xx,
+        malformed=args.malformed,
+        missing=args.missing,
+        seed=args.seed,
+    )
+    api_key = None
+    if args.record:
+        from settings.config import setup
+
+        api_key = setup.openai_api_key
+    server = FakeOpenAI(
+        faults,
+        cassette=Path(args.cassette) if args.cassette else None,
+        record=args.record,
+        upstream=args.upstream,
+        api_key=api_key,
+    )
+    url = await server.start(args.host, args.port)
+    print(f"OPENAI_BASE_URL={url}  ({len(server.cassette.responses)} записей)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Локальный OpenAI для тестов")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--cassette", default=None, help="JSONL с записями")
+    parser.add_argument(
+        "--record", action="store_true", help="проксировать и записывать"
+    )
+    parser.add_argument("--upstream", default=UPSTREAM)
+    parser.add_argument("--latency", default="fixed:0", help="напр. lognormal:2,0.4")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--malformed", type=float, default=0.0)
+    parser.add_argument("--missing", choices=("synthetic", "404"), default="synthetic")
+    parser.add_argument("--seed", type=int, default=None)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Локальный «Telegram»: шлёт апдейты в webhook бота так же, как настоящий
+(POST JSON + заголовок X-Telegram-Bot-Api-Secret-Token).
+
+    python -m tools.fake_telegram --text /start --user 42
+    python -m tools.fake_telegram --callback vac_3 --user 42 --count 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import time
+from typing import Any, Dict
+
+from aiohttp import ClientSession
+
+from settings.config import setup
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class FakeTelegram:
+    def __init__(self, url: str, *, secret: str | None = None) -> None:
+        self.url = url
+        self.secret = secret
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._session: ClientSession | None = None
+
+    async def __aenter__(self) -> "FakeTelegram":
+        self._session = ClientSession()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+    # ─────────────── апдейты ───────────────
+    @staticmethod
+    def _user(user_id: int) -> Dict[str, Any]:
+        return {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"}
+
+    def _message(self, user_id: int, **fields: Any) -> Dict[str, Any]:
+        return {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": self._user(user_id),
+            **fields,
+        }
+
+    def message(self, user_id: int, text: str) -> Dict[str, Any]:
+        return {
+            "update_id": next(self._update_ids),
+            "message": self._message(user_id, text=text),
+        }
+
+    def document(
+        self, user_id: int, file_name: str, *, file_id: str, file_size: int = 1024
+    ) -> Dict[str, Any]:
+        doc = {
+            "file_id": file_id,
+            "file_unique_id": file_id[-16:],
+            "file_name": file_name,
+            "file_size": file_size,
+        }
+        return {
+            "update_id": next(self._update_ids),
+            "message": self._message(user_id, document=doc),
+        }
+
+    def callback(self, user_id: int, data: str) -> Dict[str, Any]:
+        return {
+            "update_id": next(self._update_ids),
+            "callback_query": {
+                "id": str(next(self._update_ids)),
+                "from": self._user(user_id),
+                "chat_instance": str(user_id),
+                "message": self._message(user_id, text="…"),
+                "data": data,
+            },
+        }
+
+    # ─────────────── отправка ───────────────
+    async def post(self, update: Dict[str, Any]) -> int:
+        """Отправить апдейт; вернуть HTTP-статус ответа бота."""
+        assert self._session is not None, "используйте async with FakeTelegram(...)"
+        headers = {SECRET_HEADER: self.secret} if self.secret else {}
+        async with self._session.post(self.url, json=update, headers=headers) as r:
+            await r.read()
+            return r.status
+
+
+async def _main(args: argparse.Namespace) -> None:
+    async with FakeTelegram(args.url, secret=args.secret) as tg:
+        started = time.perf_counter()
+        statuses = []
+        for _ in range(args.count):
+            update = (
+                tg.callback(args.user, args.callback)
+                if args.callback
+                else tg.message(args.user, args.text)
+            )
+            statuses.append(await tg.post(update))
+        elapsed = time.perf_counter() - started
+
+    ok = statuses.count(200)
+    print(f"{ok}/{len(statuses)} ok, {elapsed / len(statuses) * 1000:.1f} мс на апдейт")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Отправить апдейты в webhook бота")
+    parser.add_argument(
+        "--url",
+        default=f"http://127.0.0.1:{setup.webhook_port}{setup.webhook_path}",
+    )
+    parser.add_argument("--secret", default=setup.webhook_secret)
+    parser.add_argument("--user", type=int, default=1)
+    parser.add_argument("--text", default="/start")
+    parser.add_argument("--callback", default=None, help="callback_data вместо текста")
+    parser.add_argument("--count", type=int, default=1)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Время холодного старта: ``python -X importtime`` в свежих процессах.
+
+    python -m tools.importtime                      # import main + build_dispatcher
+    python -m tools.importtime --runs 10 --out startup.json
+    python -m tools.importtime --baseline startup.json
+
+Печатает медиану по прогонам: время до готового Dispatcher, самые
+дорогие пакеты (собственное время импорта) и модули (кумулятивное).
+Ненулевой код выхода — если при старте загрузился модуль из ``--forbid``
+(парсеры и SDK OpenAI должны грузиться при первом использовании).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+STATEMENT = "import main; main.build_dispatcher()"
+FORBID = ("openai", "pdfminer", "docx", "lxml")
+
+
+def _run_once(statement: str) -> Dict[str, Any]:
+    env = dict(os.environ)
+    # настройки обязательны при импорте; значения не важны — сеть не трогаем
+    env.setdefault("TELEGRAM_TOKEN", "123456:importtime")
+    env.setdefault("OPENAI_API_KEY", "sk-importtime")
+    env.setdefault("SUMMARY_CHAT_ID", "0")
+
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise SystemExit(f"{statement!r} упал:\n{proc.stderr[-2000:]}")
+
+    modules: Dict[str, tuple[int, int]] = {}  # имя → (self, cumulative), мкс
+    top_level = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():  # строка заголовка
+            continue
+        if not name[1:].startswith(" "):  # импорт верхнего уровня
+            top_level += int(cumulative)
+        modules[name.strip()] = (int(self_us), int(cumulative))
+    return {"wall_ms": wall * 1000, "import_ms": top_level / 1000, "modules": modules}
+
+
+def measure(statement: str, runs: int, top: int) -> Dict[str, Any]:
+    samples = [_run_once(statement) for _ in range(runs)]
+
+    by_module: Dict[str, List[int]] = defaultdict(list)
+    by_package: Dict[str, List[int]] = defaultdict(list)
+    for sample in samples:
+        packages: Dict[str, int] = defaultdict(int)
+        for name, (self_us, cumulative) in sample["modules"].items():
+            by_module[name].append(cumulative)
+            packages[name.split(".")[0]] += self_us
+        for package, self_us in packages.items():
+            by_package[package].append(self_us)
+
+    def median_ms(values: List[int]) -> float:
+        return statistics.median(values) / 1000
+
+    packages = sorted(by_package.items(), key=lambda kv: -median_ms(kv[1]))
+    modules = sorted(by_module.items(), key=lambda kv: -median_ms(kv[1]))
+    return {
+        "statement": statement,
+        "runs": runs,
+        "python": sys.version.split()[0],
+        "wall_ms": statistics.median(s["wall_ms"] for s in samples),
+        "import_ms": statistics.median(s["import_ms"] for s in samples),
+        "modules_loaded": len(by_module),
+        "packages": {name: median_ms(v) for name, v in packages[:top]},
+        "modules": {name: median_ms(v) for name, v in modules[:top]},
+        "loaded": sorted(by_module),
+    }
+
+
+def _print(report: Dict[str, Any], baseline: Dict[str, Any] | None) -> None:
+    def delta(key: str) -> str:
+        if baseline is None or key not in baseline:
+            return ""
+        return f" ({report[key] - baseline[key]:+.0f} мс)"
+
+    print(f"{report['statement']}  ×{report['runs']}, Python {report['python']}")
+    print(f"до готовности:   {report['wall_ms']:8.0f} мс{delta('wall_ms')}")
+    print(f"из них импорты:  {report['import_ms']:8.0f} мс{delta('import_ms')}")
+    print(f"модулей:         {report['modules_loaded']:8d}")
+    print("\nпакеты (собственное время):")
+    for name, ms in report["packages"].items():
+        print(f"  {name:<40}{ms:8.1f} мс")
+    print("\nмодули (кумулятивно):")
+    for name, ms in report["modules"].items():
+        print(f"  {name:<40}{ms:8.1f} мс")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Замер времени импорта бота")
+    parser.add_argument("--statement", default=STATEMENT)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--forbid",
+        default=",".join(FORBID),
+        help="пакеты, которых не должно быть при старте (через запятую)",
+    )
+    parser.add_argument("--baseline", default=None, help="JSON прошлого замера")
+    parser.add_argument("--out", default=None, help="куда сохранить JSON")
+    args = parser.parse_args()
+
+    report = measure(args.statement, args.runs, args.top)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    _print(report, baseline)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+
+    forbidden = {p for p in args.forbid.split(",") if p}
+    eager = sorted({name.split(".")[0] for name in report["loaded"]} & forbidden)
+    if eager:
+        print(f"\nзагружены при старте: {', '.join(eager)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()